@@ -0,0 +1,333 @@
+"""Headless benchmarks for the simulation and drawing hot paths.
+
+    python bench.py                          run every case, print a table
+    python bench.py nbody snake              only cases whose name contains a word
+    python bench.py --out base.json          save results (with machine metadata)
+    python bench.py --baseline base.json     compare; exit 1 on a regression
+    python bench.py --baseline base.json --threshold 0.15 -t draw.=0.3
+
+Each case builds fresh state from fixed seeds before every run, so runs are
+comparable across machines and commits. A run repeats the operation until
+--min-time has passed; the reported figure is the median time per operation.
+Draw cases build ImGui draw lists in an offscreen context, no window needed.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BENCH_REPEAT    = 5       # timed runs per case
+BENCH_MIN_TIME  = 0.2     # seconds per run, at least one operation
+BENCH_THRESHOLD = 0.10    # slowdown vs baseline that counts as a regression
+BENCH_SEED      = 1234
+
+NBODY_SIZES = [10, 100, 1000, 10000]
+SNAKE_LENGTHS = [3, 10, 100, 1000]
+
+
+# ╔══════════════════════════════════════════════════════════════╗
+# ║                          CASES                              ║
+# ╚══════════════════════════════════════════════════════════════╝
+# a case is (name, setup); setup() returns (op, extra) where op() runs one
+# operation and extra is a dict of facts worth recording next to the timing
+CASES = []
+
+def case(name):
+    def reg(fn): CASES.append((name, fn)); return fn
+    return reg
+
+
+def _physics(n, engine=None):
+    from sim.physics import PhysicsState, NBODY_ENGINE_DIRECT
+    from sim.scene import gen_plummer
+    ps = PhysicsState(clock=lambda: 0.0)
+    ps.set_arrays(*gen_plummer(n, 444.0, 384.0, 60.0, ps.G, seed=BENCH_SEED))
+    ps.engine = NBODY_ENGINE_DIRECT if engine is None else engine
+    ps.paused = False
+    return ps
+
+
+def _nbody_case(n, engine_name):
+    from sim.physics import NBODY_ENGINE_NAMES
+    engine = NBODY_ENGINE_NAMES.index(engine_name)
+    @case(f"nbody.step.{engine_name.lower()}.n{n}")
+    def setup():
+        ps = _physics(n, engine)
+        return (lambda: ps.update_nbody(1/60)), {"bodies": n}
+
+for _n in NBODY_SIZES: _nbody_case(_n, "Direct")
+_nbody_case(10000, "Barnes-Hut")
+
+
+def _snake(length):
+    """God-mode game whose body is laid out along the bot's Hamiltonian cycle,
+    so every length fits the board and a fixed heading never dies."""
+    from collections import deque
+    from sim.snake import SnakeState
+    from sim.bot import HAM_ORDER
+    from sim.config import COLS
+    gs = SnakeState(clock=lambda: 0.0, seed=BENCH_SEED, record=False)
+    gs.god_mode = True
+    for c, r in gs.snake: gs._vacate(r*COLS + c)
+    cells = [HAM_ORDER[-k] for k in range(1, length + 1)]
+    gs.snake = deque((ci % COLS, ci // COLS) for ci in cells)
+    for ci in cells: gs._occupy(ci)
+    gs.food = gs._spawn_food()
+    return gs
+
+
+def _snake_case(length):
+    @case(f"snake.tick.len{length}")
+    def setup():
+        gs = _snake(length)
+        def op():
+            for _ in range(100): gs.tick()
+        return op, {"ticks_per_op": 100, "length": length}
+
+for _l in SNAKE_LENGTHS: _snake_case(_l)
+
+
+@case("proj.update")
+def _proj_update():
+    from sim.physics import PhysicsState
+    ps = PhysicsState(clock=lambda: 0.0)
+    ps.proj_air_resist = 0.05
+    def op():
+        for _ in range(100):
+            if not ps.proj_running: ps.launch_projectile()
+            ps.update_projectile(1/120)
+    return op, {"updates_per_op": 100}
+
+
+@case("proj.sweep")
+def _proj_sweep():
+    from sim.physics import PhysicsState
+    ps = PhysicsState(clock=lambda: 0.0)
+    ps.proj_air_resist = 0.05
+    return ps.run_sweep, {"shots": ps.sweep_n[0] * ps.sweep_n[1]}
+
+
+@case("proj.best_angle")
+def _proj_best():
+    from sim.physics import PhysicsState
+    ps = PhysicsState(clock=lambda: 0.0)
+    ps.proj_air_resist = 0.05
+    return ps.find_best_angle, {}
+
+
+# ── draw-list construction ───────────────────────────────────────
+_imgui_ready = False
+
+def _ui():
+    """Offscreen ImGui context sized like the app window, built once."""
+    global _imgui_ready
+    import imgui
+    import main
+    if not _imgui_ready:
+        imgui.create_context()
+        io = imgui.get_io()
+        io.display_size = (main.WINDOW_W, main.WINDOW_H)
+        io.delta_time = 1/60
+        io.fonts.get_tex_data_as_rgba32()
+        _imgui_ready = True
+    return imgui, main
+
+
+def _frame_op(draw, viewport=True):
+    """op() builds one full ImGui frame around draw(); extra reports its size."""
+    imgui, main = _ui()
+    def op():
+        imgui.new_frame()
+        if viewport:
+            imgui.set_next_window_position(0, main.MENUBAR_H)
+            imgui.set_next_window_size(main.VIEW_W, main.WINDOW_H - main.MENUBAR_H)
+            imgui.begin("##viewport")
+            wp = imgui.get_window_position()
+            draw(wp.x, wp.y)
+            imgui.end()
+        else:
+            draw()
+        imgui.render()
+    for _ in range(2): op()             # windows appear on their second frame
+    dd = imgui.get_draw_data()
+    return op, {"vertices": dd.total_vtx_count, "indices": dd.total_idx_count}
+
+
+def _draw_nbody_case(n):
+    @case(f"draw.nbody.n{n}")
+    def setup():
+        _, main = _ui()
+        ps = _physics(n)
+        for _ in range(30): ps.update_nbody(1/60); ps.sample_trails()
+        return _frame_op(lambda x, y: main.draw_physics_sim(ps, x, y))
+
+for _n in (10, 100, 1000, 10000): _draw_nbody_case(_n)
+
+
+@case("draw.nbody.panel")
+def _draw_nbody_panel():
+    _, main = _ui()
+    ps = _physics(100)
+    return _frame_op(lambda: main.draw_physics_panel(ps), viewport=False)
+
+
+@case("draw.snake.len1000")
+def _draw_snake():
+    _, main = _ui()
+    gs = _snake(1000)
+    return _frame_op(lambda x, y: main.draw_snake_game(gs, x, y))
+
+
+@case("draw.snake.panel")
+def _draw_snake_panel():
+    _, main = _ui()
+    gs = _snake(100)
+    return _frame_op(lambda: main.draw_snake_panel(gs), viewport=False)
+
+
+@case("draw.projectile")
+def _draw_projectile():
+    _, main = _ui()
+    from sim.physics import SIM_MODE_PROJECTILE
+    ps = _physics(10)
+    ps.sim_mode = SIM_MODE_PROJECTILE
+    ps.launch_projectile()
+    for _ in range(60): ps.update_projectile(1/60)
+    ps.run_sweep()
+    return _frame_op(lambda x, y: main.draw_physics_sim(ps, x, y))
+
+
+# ╔══════════════════════════════════════════════════════════════╗
+# ║                        RUNNER                               ║
+# ╚══════════════════════════════════════════════════════════════╝
+def _reseed():
+    random.seed(BENCH_SEED); np.random.seed(BENCH_SEED)
+
+
+def run_case(setup, repeat=BENCH_REPEAT, min_time=BENCH_MIN_TIME):
+    """Time one case; returns its result record."""
+    _reseed()
+    op, extra = setup()
+    t0 = time.perf_counter(); op(); first = time.perf_counter() - t0     # warm-up and calibration
+    loops = max(1, math.ceil(min_time / max(first, 1e-9)))
+    runs = []
+    for _ in range(repeat):
+        _reseed()
+        op, _ = setup()
+        gc.collect(); gc.disable()
+        try:
+            t0 = time.perf_counter_ns()
+            for _ in range(loops): op()
+            runs.append((time.perf_counter_ns() - t0) / loops)
+        finally:
+            gc.enable()
+    return {"ns_per_op": float(np.median(runs)), "min_ns": float(min(runs)),
+            "runs_ns": runs, "loops": loops, "extra": extra}
+
+
+def machine_info():
+    def version(mod):
+        try: return __import__(mod).__version__
+        except Exception: return None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "machine": platform.machine(),
+            "processor": platform.processor(), "cpus": os.cpu_count(),
+            "numpy": np.__version__, "imgui": version("imgui"), "pygame": version("pygame"),
+            "commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "seed": BENCH_SEED}
+
+
+def threshold_for(name, default, overrides):
+    """Longest matching name prefix in overrides wins."""
+    best = None
+    for prefix, frac in overrides.items():
+        if name.startswith(prefix) and (best is None or len(prefix) > len(best)): best = prefix
+    return overrides[best] if best is not None else default
+
+
+def compare(results, baseline, default, overrides):
+    """Rows of (name, new ns, old ns, ratio, status); status is ok/REGRESSED/faster/new."""
+    rows = []
+    for name, r in results.items():
+        b = baseline.get("results", {}).get(name)
+        if b is None: rows.append((name, r["ns_per_op"], None, None, "new")); continue
+        ratio = r["ns_per_op"] / b["ns_per_op"]
+        limit = threshold_for(name, default, {**baseline.get("thresholds", {}), **overrides})
+        status = "REGRESSED" if ratio > 1 + limit else "faster" if ratio < 1 - limit else "ok"
+        rows.append((name, r["ns_per_op"], b["ns_per_op"], ratio, status))
+    return rows
+
+
+def _fmt_ns(ns):
+    for unit, div in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= div: return f"{ns/div:8.2f} {unit}"
+    return f"{ns:8.0f} ns"
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(description="Headless benchmarks (see module docstring).")
+    ap.add_argument("filter", nargs="*", help="only run cases whose name contains one of these")
+    ap.add_argument("--repeat", type=int, default=BENCH_REPEAT)
+    ap.add_argument("--min-time", type=float, default=BENCH_MIN_TIME)
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="compare against this results JSON")
+    ap.add_argument("--threshold", type=float, default=BENCH_THRESHOLD,
+                    help="allowed slowdown as a fraction (default %(default)s)")
+    ap.add_argument("-t", "--case-threshold", action="append", default=[], metavar="PREFIX=FRAC",
+                    help="per-case threshold by name prefix, repeatable")
+    ap.add_argument("--list", action="store_true", help="list case names and exit")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    todo = [(n, s) for n, s in CASES if not args.filter or any(f in n for f in args.filter)]
+    if args.list:
+        for n, _ in todo: print(n)
+        return 0
+    overrides = {}
+    for spec in args.case_threshold:
+        prefix, _, frac = spec.partition("=")
+        overrides[prefix] = float(frac)
+
+    results = {}
+    for name, setup in todo:
+        r = results[name] = run_case(setup, args.repeat, args.min_time)
+        spread = (max(r["runs_ns"]) - r["min_ns"]) / r["ns_per_op"]
+        print(f"  {name:<28} {_fmt_ns(r['ns_per_op'])}/op   ±{spread*50:4.1f}%   x{r['loops']}", flush=True)
+
+    doc = {"meta": machine_info(), "repeat": args.repeat, "min_time": args.min_time,
+           "thresholds": overrides, "results": results}
+    if args.out:
+        with open(args.out, "w") as f: json.dump(doc, f, indent=1)
+        print(f"results -> {args.out}")
+    if not args.baseline: return 0
+
+    with open(args.baseline) as f: base = json.load(f)
+    bm = base.get("meta", {})
+    print(f"\nvs {args.baseline} ({bm.get('commit') or '?'}, {bm.get('time', '?')}, "
+          f"python {bm.get('python', '?')} on {bm.get('machine', '?')})")
+    rows = compare(results, base, args.threshold, overrides)
+    for name, new, old, ratio, status in rows:
+        old_s = _fmt_ns(old) if old is not None else "         —"
+        ch = f"{(ratio - 1)*100:+6.1f}%" if ratio is not None else "       "
+        print(f"  {name:<28} {_fmt_ns(new)}  {old_s}  {ch}  {status}")
+    bad = [r for r in rows if r[4] == "REGRESSED"]
+    print(f"{len(bad)} regression(s)" if bad else "no regressions")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,31 +1,33 @@
-import pygame
-import imgui
 import os
+import sys
 import random
 import math
 import time
+import itertools
+# (phase ending here, perf_counter) marks for --startup-profile
+STARTUP = [("start", time.perf_counter())]
+STARTUP_CPU0 = time.process_time()
+# pygame.pkgdata imports pkg_resources (~100 ms) only to look up its bundled
+# default font, which the app never uses; it has a fallback when the import fails
+sys.modules.setdefault("pkg_resources", None)
+import numpy as np
+import pygame
+STARTUP.append(("import numpy, pygame", time.perf_counter()))
+import imgui
 from imgui.integrations.pygame import PygameRenderer
 import OpenGL.GL as gl
-
-# ╔══════════════════════════════════════════════════════════════╗
-# ║                     WINDOW / LAYOUT                         ║
-# ╚══════════════════════════════════════════════════════════════╝
-WINDOW_W  = 1300
-WINDOW_H  = 800
-PANEL_W   = 400          # right debug/control panel width
-VIEW_W    = WINDOW_W - PANEL_W   # 900  — shared by both modes
-MENUBAR_H = 20           # estimated menu bar height
-
-# ── Snake grid ──────────────────────────────────────────────────
-CELL_SIZE = 24
-COLS      = VIEW_W  // CELL_SIZE   # 37
-ROWS      = (WINDOW_H - MENUBAR_H) // CELL_SIZE   # 32
-
-GAME_W = COLS * CELL_SIZE
-GAME_H = ROWS * CELL_SIZE
-
-UP    = (0, -1);  DOWN  = (0, 1)
-LEFT  = (-1, 0);  RIGHT = (1, 0)
+STARTUP.append(("import imgui, OpenGL", time.perf_counter()))
+
+from sim.config import (WINDOW_W, WINDOW_H, PANEL_W, VIEW_W, MENUBAR_H,
+                        CELL_SIZE, COLS, ROWS, GAME_W, GAME_H, UP, DOWN, LEFT, RIGHT)
+from sim.snake import SnakeState, Action
+from sim.physics import (PhysicsState, BODY_COLORS, SIM_MODE_NBODY, SIM_MODE_PROJECTILE,
+                         NBODY_ENGINE_DIRECT, NBODY_ENGINE_BH, NBODY_ENGINE_NAMES,
+                         INTEG_RK45, INTEG_NAMES, PARALLEL_MIN_N, TRAIL_MAX_BODIES,
+                         COLLIDE_OFF, COLLIDE_NAMES)
+from sim.profiler import FrameProfiler, PROFILE_QS
+from sim.eventlog import EV_INFO, EV_GAME, EV_BONUS, EV_LEVEL, EV_ALERT, EV_SCENE, EV_NAMES
+STARTUP.append(("import sim", time.perf_counter()))
 
 # ── Shared palette ───────────────────────────────────────────────
 C_BG         = (0.06, 0.06, 0.08, 1.0)
@@ -35,149 +37,179 @@ C_SNAKE_BODY = (0.10, 0.72, 0.28, 1.0)
 C_FOOD       = (0.95, 0.25, 0.30, 1.0)
 C_FOOD_BONUS = (0.95, 0.80, 0.10, 1.0)
 
+# ── Event log viewer ─────────────────────────────────────────────
+EV_COLORS = [(0.70, 0.70, 0.70, 1.0),   # by event kind, see sim.eventlog.EV_NAMES
+             (0.80, 0.80, 0.80, 1.0),
+             (0.95, 0.80, 0.10, 1.0),
+             (0.40, 0.90, 0.40, 1.0),
+             (0.95, 0.30, 0.30, 1.0),
+             (0.55, 0.75, 0.95, 1.0)]
+
+
+class EventLogView:
+    """Newest-first, kind-filtered view of an EventLog. Only rows inside the
+    scrolled region are formatted and drawn; pyimgui has no ImGuiListClipper,
+    so the visible range comes from the scroll offset and the row height."""
+    def __init__(self, kinds):
+        self.kinds = list(kinds)             # offered as filter checkboxes
+        self.show  = set(kinds)
+        self._key  = None                    # (log, shown kinds) that _sel was selected for
+        self._sel  = np.zeros(0, np.int64)   # matching sequence numbers, oldest first
+        self._upto = 0                       # log.total when _sel was last brought up to date
+
+    def _rows(self, log):
+        key = (log, frozenset(self.show))
+        if key != self._key:
+            self._key, self._sel = key, log.select(self.show)
+        elif self._upto != log.total:        # only the new events need classifying
+            self._sel = np.concatenate([self._sel, log.select(self.show, self._upto)])
+        self._upto = log.total
+        if len(self._sel) and self._sel[0] < log.first:     # overwritten or cleared
+            self._sel = self._sel[np.searchsorted(self._sel, log.first):]
+        return self._sel
+
+    def draw(self, log, id, height):
+        imgui.push_style_color(imgui.COLOR_TEXT, 0.95,0.55,0.25,1)
+        imgui.text(f"EVENT LOG  ({len(log):,})"); imgui.pop_style_color()
+        imgui.separator()
+        if imgui.button(f"Clear##{id}"): log.clear()
+        for k in self.kinds:
+            imgui.same_line()
+            ch, on = imgui.checkbox(f"{EV_NAMES[k]}##{id}", k in self.show)
+            if ch: (self.show.add if on else self.show.discard)(k)
+        rows = self._rows(log)
+        n = len(rows)
+        imgui.push_style_color(imgui.COLOR_CHILD_BACKGROUND, 0.04,0.04,0.06,1)
+        with imgui.begin_child(id, 0, height, border=True):
+            lh = imgui.get_text_line_height_with_spacing()
+            y0 = imgui.get_cursor_pos_y()
+            lo = min(max(int((imgui.get_scroll_y() - y0) // lh), 0), n)
+            hi = min(n, lo + int(imgui.get_window_height() // lh) + 2)
+            imgui.set_cursor_pos_y(y0 + lo * lh)
+            for r in range(lo, hi):
+                q = int(rows[n - 1 - r])
+                imgui.text_colored(log.line(q), *EV_COLORS[log.kind_of(q)])
+            imgui.set_cursor_pos_y(y0 + n * lh)      # full height, so the scrollbar spans every row
+        imgui.pop_style_color()
+
+snake_log_view   = EventLogView([EV_INFO, EV_GAME, EV_BONUS, EV_LEVEL, EV_ALERT])
+physics_log_view = EventLogView([EV_INFO, EV_GAME, EV_SCENE, EV_ALERT])
+
 # ╔══════════════════════════════════════════════════════════════╗
 # ║                      SNAKE GAME                             ║
 # ╚══════════════════════════════════════════════════════════════╝
-class SnakeState:
+SNAKE_KEYS = {
+    pygame.K_UP: Action.UP,       pygame.K_w: Action.UP,
+    pygame.K_DOWN: Action.DOWN,   pygame.K_s: Action.DOWN,
+    pygame.K_LEFT: Action.LEFT,   pygame.K_a: Action.LEFT,
+    pygame.K_RIGHT: Action.RIGHT, pygame.K_d: Action.RIGHT,
+    pygame.K_p: Action.PAUSE,     pygame.K_SPACE: Action.PAUSE,
+    pygame.K_r: Action.RESTART,
+}
+
+SNAKE_FADE_LEN = 35   # body colour stops fading after this many segments
+SNAKE_BODY_SHRINK = 0.82
+
+
+class SnakeRenderCache:
+    """Board geometry and packed colours that only change with the origin.
+
+    The grid is two serpentine polylines (the connecting runs lie on the
+    border lines anyway), body colours come from a fade lookup table and
+    cell rectangles are precomputed per column/row.
+    """
     def __init__(self):
-        self.high_score = 0
-        self.reset()
-
-    def reset(self):
-        cx, cy = COLS // 2, ROWS // 2
-        self.snake         = [(cx, cy), (cx-1, cy), (cx-2, cy)]
-        self.direction     = RIGHT
-        self.next_dir      = RIGHT
-        self.food          = self._spawn_food()
-        self.bonus_food    = None
-        self.bonus_timer   = 0.0
-        self.score         = 0
-        self.level         = 1
-        self.alive         = True
-        self.paused        = False
-        self.tick_interval = 0.15
-        self.last_tick     = time.time()
-        self.elapsed       = 0.0
-        self.move_count    = 0
-        self.food_eaten    = 0
-        self.death_reason  = ""
-        self.speed_override = False
-        self.custom_speed   = 0.15
-        self.god_mode       = False
-        self.show_grid      = True
-        self.show_hitboxes  = False
-        self.log: list = []
-        self._log("Snake game started!")
-
-    def _log(self, msg):
-        self.log.append(f"[{time.strftime('%H:%M:%S')}] {msg}")
-        if len(self.log) > 200: self.log.pop(0)
-
-    def _spawn_food(self):
-        occupied = set(getattr(self, 'snake', []))
-        while True:
-            pos = (random.randint(0, COLS-1), random.randint(0, ROWS-1))
-            if pos not in occupied: return pos
-
-    def handle_key(self, key):
-        mapping = {
-            pygame.K_UP: UP,   pygame.K_w: UP,
-            pygame.K_DOWN: DOWN, pygame.K_s: DOWN,
-            pygame.K_LEFT: LEFT, pygame.K_a: LEFT,
-            pygame.K_RIGHT: RIGHT, pygame.K_d: RIGHT,
-        }
-        if key in mapping:
-            nd = mapping[key]
-            if (nd[0]+self.direction[0], nd[1]+self.direction[1]) != (0,0):
-                self.next_dir = nd
-        elif key in (pygame.K_p, pygame.K_SPACE):
-            if self.alive:
-                self.paused = not self.paused
-                self._log("Paused." if self.paused else "Resumed.")
-        elif key == pygame.K_r:
-            self.reset()
-
-    def update(self, dt):
-        if not self.alive or self.paused: return
-        self.elapsed += dt
-        if self.bonus_food:
-            self.bonus_timer -= dt
-            if self.bonus_timer <= 0:
-                self._log("Bonus food expired!")
-                self.bonus_food = None
-        interval = self.custom_speed if self.speed_override else self.tick_interval
-        now = time.time()
-        if now - self.last_tick < interval: return
-        self.last_tick = now
-        self.direction = self.next_dir
-        hx, hy = self.snake[0]
-        dx, dy = self.direction
-        nh = (hx+dx, hy+dy)
-        if not (0 <= nh[0] < COLS and 0 <= nh[1] < ROWS):
-            if not self.god_mode:
-                self.death_reason = "Hit the wall"; self._die(); return
-            else:
-                nh = (nh[0]%COLS, nh[1]%ROWS)
-        if nh in self.snake[:-1] and not self.god_mode:
-            self.death_reason = "Ate itself"; self._die(); return
-        self.snake.insert(0, nh)
-        self.move_count += 1
-        grew = False
-        if nh == self.food:
-            self.score += 10*self.level; self.food_eaten += 1
-            self.food = self._spawn_food(); grew = True
-            self._log(f"Food eaten! Score: {self.score}")
-            if self.food_eaten % 5 == 0 and not self.bonus_food:
-                self.bonus_food = self._spawn_food(); self.bonus_timer = 6.0
-                self._log("Bonus food appeared! (6s)")
-            if self.food_eaten % 10 == 0:
-                self.level += 1
-                self.tick_interval = max(0.06, self.tick_interval - 0.01)
-                self._log(f"Level up! Now level {self.level}")
-        if nh == self.bonus_food:
-            self.score += 50*self.level; self.bonus_food = None; grew = True
-            self._log(f"Bonus food eaten! +{50*self.level} pts")
-        if not grew: self.snake.pop()
-        if self.score > self.high_score: self.high_score = self.score
-
-    def _die(self):
-        self.alive = False
-        self._log(f"GAME OVER — {self.death_reason}. Score: {self.score}")
+        self.origin = None
+
+    def build(self, ox, oy):
+        if self.origin == (ox, oy): return
+        self.origin = (ox, oy)
+        top, bot, left, right = oy, oy + GAME_H, ox, ox + GAME_W
+        self.vgrid = []
+        for c in range(COLS + 1):
+            x = ox + c*CELL_SIZE
+            self.vgrid += [(x, top), (x, bot)] if c % 2 == 0 else [(x, bot), (x, top)]
+        self.hgrid = []
+        for r in range(ROWS + 1):
+            y = oy + r*CELL_SIZE
+            self.hgrid += [(left, y), (right, y)] if r % 2 == 0 else [(right, y), (left, y)]
+        self.bg_col   = imgui.get_color_u32_rgba(*C_BG)
+        self.grid_col = imgui.get_color_u32_rgba(*C_GRID)
+        self.hit_col  = imgui.get_color_u32_rgba(1, 0.2, 0.2, 0.35)
+        self.food_col = imgui.get_color_u32_rgba(*C_FOOD)
+        self.fade = [imgui.get_color_u32_rgba(*C_SNAKE_HEAD)]
+        for i in range(1, SNAKE_FADE_LEN):
+            f = max(0.5, 1.0 - i*0.015)
+            self.fade.append(imgui.get_color_u32_rgba(
+                C_SNAKE_BODY[0]*f, C_SNAKE_BODY[1]*f, C_SNAKE_BODY[2]*f, 1.0))
+        # top-left corners of full cells, and of shrunken body cells
+        pad = (CELL_SIZE - CELL_SIZE*SNAKE_BODY_SHRINK) / 2
+        self.cx = [ox + c*CELL_SIZE for c in range(COLS)]
+        self.cy = [oy + r*CELL_SIZE for r in range(ROWS)]
+        self.body_pad, self.body_size = pad, CELL_SIZE*SNAKE_BODY_SHRINK
+
+    def body_cell(self, dl, col, row, i):
+        x = self.cx[col]; y = self.cy[row]
+        if i == 0:
+            dl.add_rect_filled(x, y, x+CELL_SIZE, y+CELL_SIZE, self.fade[0], rounding=4)
+        else:
+            x += self.body_pad; y += self.body_pad
+            dl.add_rect_filled(x, y, x+self.body_size, y+self.body_size,
+                               self.fade[min(i, SNAKE_FADE_LEN-1)], rounding=4)
+
+
+snake_cache = SnakeRenderCache()
+autopilot   = None       # SnakeBot, built the first time Autopilot is switched on
+
+
+def get_autopilot():
+    # sim.bot builds its neighbour tables and cycle at import, so not at startup
+    global autopilot
+    if autopilot is None:
+        from sim.bot import SnakeBot
+        autopilot = SnakeBot()
+    return autopilot
 
 
 def draw_snake_game(gs: SnakeState, ox: float, oy: float):
     dl = imgui.get_window_draw_list()
-    dl.add_rect_filled(ox, oy, ox+GAME_W, oy+GAME_H, imgui.get_color_u32_rgba(*C_BG))
+    rc = snake_cache; rc.build(ox, oy)
+    dl.add_rect_filled(ox, oy, ox+GAME_W, oy+GAME_H, rc.bg_col)
     if gs.show_grid:
-        gc = imgui.get_color_u32_rgba(*C_GRID)
-        for c in range(COLS+1):
-            dl.add_line(ox+c*CELL_SIZE, oy, ox+c*CELL_SIZE, oy+GAME_H, gc)
-        for r in range(ROWS+1):
-            dl.add_line(ox, oy+r*CELL_SIZE, ox+GAME_W, oy+r*CELL_SIZE, gc)
+        dl.add_polyline(rc.vgrid, rc.grid_col)
+        dl.add_polyline(rc.hgrid, rc.grid_col)
     # food
-    fx, fy = gs.food
-    _fill_cell(dl, fx, fy, *C_FOOD[:3], ox=ox, oy=oy)
-    pulse = 0.5 + 0.5*math.sin(time.time()*5)
-    dl.add_circle(ox+fx*CELL_SIZE+CELL_SIZE//2, oy+fy*CELL_SIZE+CELL_SIZE//2,
-                  CELL_SIZE*0.7+pulse*4,
-                  imgui.get_color_u32_rgba(0.95,0.25,0.30,0.3+0.4*pulse), thickness=2)
+    if gs.food:
+        fx, fy = gs.food
+        dl.add_rect_filled(rc.cx[fx], rc.cy[fy], rc.cx[fx]+CELL_SIZE, rc.cy[fy]+CELL_SIZE,
+                           rc.food_col, rounding=4)
+        pulse = 0.5 + 0.5*math.sin(time.time()*5)
+        dl.add_circle(ox+fx*CELL_SIZE+CELL_SIZE//2, oy+fy*CELL_SIZE+CELL_SIZE//2,
+                      CELL_SIZE*0.7+pulse*4,
+                      imgui.get_color_u32_rgba(0.95,0.25,0.30,0.3+0.4*pulse), thickness=2)
     if gs.bonus_food:
         bx, by = gs.bonus_food
         bp = 0.5+0.5*math.sin(time.time()*8)
         _fill_cell(dl, bx, by, *C_FOOD_BONUS[:3], a=0.7+0.3*bp, ox=ox, oy=oy)
-    # snake
-    for i,(sc,sr) in enumerate(gs.snake):
-        if i==0: r,g,b = C_SNAKE_HEAD[:3]
-        else:
-            fade = max(0.5, 1.0-i*0.015)
-            r,g,b = C_SNAKE_BODY[0]*fade, C_SNAKE_BODY[1]*fade, C_SNAKE_BODY[2]*fade
-        _fill_cell(dl, sc, sr, r, g, b, ox=ox, oy=oy, shrink=1.0 if i==0 else 0.82)
-        if gs.show_hitboxes:
-            dl.add_rect(ox+sc*CELL_SIZE+1, oy+sr*CELL_SIZE+1,
-                        ox+sc*CELL_SIZE+CELL_SIZE-1, oy+sr*CELL_SIZE+CELL_SIZE-1,
-                        imgui.get_color_u32_rgba(1,0.2,0.2,0.35), thickness=1)
+    # snake: the fading head section segment by segment, then every further
+    # segment shares one colour, so each distinct cell is drawn once (later
+    # segments still land on top, as before)
+    head = list(itertools.islice(gs.snake, SNAKE_FADE_LEN))
+    for i, (sc, sr) in enumerate(head):
+        rc.body_cell(dl, sc, sr, i)
+    tail = dict.fromkeys(itertools.islice(gs.snake, SNAKE_FADE_LEN, None))
+    for sc, sr in tail:
+        rc.body_cell(dl, sc, sr, SNAKE_FADE_LEN)
+    if gs.show_hitboxes:
+        for sc, sr in dict.fromkeys(gs.snake):
+            x = rc.cx[sc]; y = rc.cy[sr]
+            dl.add_rect(x+1, y+1, x+CELL_SIZE-1, y+CELL_SIZE-1, rc.hit_col, thickness=1)
     # overlay
-    if not gs.alive:
+    if gs.won:
+        dl.add_rect_filled(ox,oy,ox+GAME_W,oy+GAME_H, imgui.get_color_u32_rgba(0,0,0,0.6))
+        dl.add_text(ox+GAME_W//2-60, oy+GAME_H//2-20, imgui.get_color_u32_rgba(0.3,0.95,0.5,1), "YOU WIN!")
+        dl.add_text(ox+GAME_W//2-90, oy+GAME_H//2+10, imgui.get_color_u32_rgba(0.8,0.8,0.8,1), "Press R to restart")
+    elif not gs.alive:
         dl.add_rect_filled(ox,oy,ox+GAME_W,oy+GAME_H, imgui.get_color_u32_rgba(0,0,0,0.6))
         dl.add_text(ox+GAME_W//2-70, oy+GAME_H//2-20, imgui.get_color_u32_rgba(0.95,0.3,0.3,1), "GAME OVER")
         dl.add_text(ox+GAME_W//2-90, oy+GAME_H//2+10, imgui.get_color_u32_rgba(0.8,0.8,0.8,1), "Press R to restart")
@@ -222,8 +254,8 @@ def draw_snake_panel(gs: SnakeState):
         stat("Dir",        dn.get(gs.direction,"?"))
         eff = gs.custom_speed if gs.speed_override else gs.tick_interval
         stat("Tick",       f"{eff:.3f}s")
-        sc = (0.2,0.9,0.3,1) if gs.alive else (0.9,0.2,0.2,1)
-        stat("Status", "Alive" if gs.alive else "Dead", sc)
+        sc = (0.2,0.9,0.3,1) if gs.alive or gs.won else (0.9,0.2,0.2,1)
+        stat("Status", "Won" if gs.won else "Alive" if gs.alive else "Dead", sc)
         imgui.columns(1)
 
         if gs.bonus_food:
@@ -235,16 +267,31 @@ def draw_snake_panel(gs: SnakeState):
         imgui.spacing(); imgui.separator(); imgui.spacing()
         imgui.push_style_color(imgui.COLOR_TEXT, 0.4,0.75,1.0,1); imgui.text("TWEAKS"); imgui.pop_style_color()
         imgui.separator()
-        _, gs.speed_override = imgui.checkbox("Override Speed", gs.speed_override)
-        if gs.speed_override:
+        _, ovr = imgui.checkbox("Override Speed", gs.speed_override)
+        spd = gs.custom_speed
+        if ovr:
             imgui.same_line()
             imgui.push_item_width(130)
-            ch, v = imgui.slider_float("##spd", gs.custom_speed, 0.03, 0.40, "%.3fs")
+            _, spd = imgui.slider_float("##spd", spd, 0.03, 0.40, "%.3fs")
             imgui.pop_item_width()
-            if ch: gs.custom_speed = v; gs._log(f"Speed -> {v:.3f}s")
-        _, gs.god_mode = imgui.checkbox("God Mode", gs.god_mode)
+        gs.set_speed(ovr, spd)
+        _, god = imgui.checkbox("God Mode", gs.god_mode)
+        gs.set_god_mode(god)
         if imgui.is_item_hovered():
             with imgui.begin_tooltip(): imgui.text("Wrap walls, ignore self-collision")
+        ch, on = imgui.checkbox("Autopilot", gs.controller is not None)
+        if ch or on:
+            from sim.bot import BOT_NAMES
+            bot = get_autopilot()
+        if ch:
+            gs.controller = bot if on else None; bot.invalidate()
+            gs.log.add(EV_INFO, "Autopilot {}", BOT_NAMES[bot.strategy] if on else "off")
+        if on:
+            imgui.same_line()
+            imgui.push_item_width(130)
+            ch, i = imgui.combo("##bot", bot.strategy, BOT_NAMES)
+            imgui.pop_item_width()
+            if ch: bot.strategy = i; bot.invalidate(); gs.log.add(EV_INFO, "Autopilot {}", BOT_NAMES[i])
         _, gs.show_grid      = imgui.checkbox("Grid",     gs.show_grid)
         imgui.same_line(spacing=16)
         _, gs.show_hitboxes  = imgui.checkbox("Hitboxes", gs.show_hitboxes)
@@ -253,17 +300,10 @@ def draw_snake_panel(gs: SnakeState):
         _, inject_val = imgui.input_int("##inj", 100, step=10)
         imgui.pop_item_width()
         imgui.same_line()
-        if imgui.button("Add Score"):
-            gs.score += inject_val
-            gs.high_score = max(gs.high_score, gs.score)
-            gs._log(f"Injected +{inject_val}")
-        if imgui.button("Spawn Bonus"):
-            if not gs.bonus_food:
-                gs.bonus_food = gs._spawn_food(); gs.bonus_timer = 6.0
-                gs._log("Bonus spawned via debug.")
+        if imgui.button("Add Score"):   gs.add_score(inject_val)
+        if imgui.button("Spawn Bonus"): gs.spawn_bonus()
         imgui.same_line()
-        if imgui.button("Kill Snake") and gs.alive:
-            gs.death_reason = "Debug kill"; gs._die()
+        if imgui.button("Kill Snake"):  gs.kill()
         imgui.spacing()
         if imgui.button("  RESTART  "): gs.reset()
 
@@ -276,211 +316,108 @@ def draw_snake_panel(gs: SnakeState):
         imgui.text("R              Restart")
         imgui.pop_style_color()
 
+        _draw_snake_log(gs)
+        _draw_fps_bar()
+
+
+def _draw_snake_log(gs):
+    imgui.spacing(); imgui.separator(); imgui.spacing()
+    snake_log_view.draw(gs.log, "slog", 160)
+
+def _draw_fps_bar():
+    imgui.spacing(); imgui.separator()
+    fps = imgui.get_io().framerate
+    bc = (0.2,0.8,0.2,1) if fps>=55 else (0.9,0.7,0.1,1) if fps>=30 else (0.9,0.2,0.2,1)
+    imgui.push_style_color(imgui.COLOR_PLOT_HISTOGRAM, *bc)
+    imgui.progress_bar(min(fps/60.0,1.0), (-1,0), f"FPS: {fps:.0f}")
+    imgui.pop_style_color()
+
+
+# ── Replays ─────────────────────────────────────────────────────
+REPLAY_DIR      = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replays")
+REPLAY_LIST_MAX = 10     # newest files offered under Snake > Open Replay
+
+def save_replay(gs):
+    os.makedirs(REPLAY_DIR, exist_ok=True)
+    name = f"snake_{time.strftime('%Y%m%d_%H%M%S')}_{gs.seed:08x}.snkr"
+    gs.replay.save(os.path.join(REPLAY_DIR, name))
+    gs.log.add(EV_INFO, "Replay saved: {}", name)
+
+def list_replays():
+    if not os.path.isdir(REPLAY_DIR): return []
+    names = sorted((f for f in os.listdir(REPLAY_DIR) if f.endswith(".snkr")), reverse=True)
+    return names[:REPLAY_LIST_MAX]
+
+def watch_replay(src):
+    """A ReplayPlayer for replay bytes or a .snkr path (sim.replay's player is
+    only imported once a replay is watched)."""
+    from sim.replay import Replay, ReplayPlayer
+    return ReplayPlayer(Replay.from_bytes(src) if isinstance(src, bytes) else Replay.load(src))
+
+def draw_replay_panel(pl):
+    """Playback controls for a ReplayPlayer; returns False once the user stops it."""
+    from sim.replay import PLAYBACK_SPEEDS
+    rp, gs = pl.replay, pl.gs
+    keep = True
+    imgui.set_next_window_position(VIEW_W, MENUBAR_H, imgui.ONCE)
+    imgui.set_next_window_size(PANEL_W-4, WINDOW_H-MENUBAR_H, imgui.ONCE)
+    flags = imgui.WINDOW_NO_MOVE | imgui.WINDOW_NO_RESIZE | imgui.WINDOW_NO_TITLE_BAR
+    with imgui.begin("##replay_panel", flags=flags):
+        imgui.push_style_color(imgui.COLOR_TEXT, 0.4, 0.75, 1.0, 1)
+        imgui.text("SNAKE  —  Replay"); imgui.pop_style_color()
+        imgui.separator(); imgui.spacing()
+
+        imgui.columns(2, "rc", border=False)
+        for label, value in (("Seed", f"{rp.seed:08x}"), ("Tick", f"{pl.t} / {rp.ticks}"),
+                             ("Events", len(rp.events)), ("Score", gs.score),
+                             ("Level", gs.level), ("Length", len(gs.snake)),
+                             ("Status", "Won" if gs.won else "Alive" if gs.alive else "Dead")):
+            imgui.text(label); imgui.next_column(); imgui.text(str(value)); imgui.next_column()
+        imgui.columns(1)
+
         imgui.spacing(); imgui.separator(); imgui.spacing()
-        imgui.push_style_color(imgui.COLOR_TEXT, 0.95,0.55,0.25,1)
-        imgui.text(f"EVENT LOG  ({len(gs.log)})"); imgui.pop_style_color()
-        imgui.separator()
-        if imgui.button("Clear##slog"): gs.log.clear()
-        imgui.push_style_color(imgui.COLOR_CHILD_BACKGROUND, 0.04,0.04,0.06,1)
-        with imgui.begin_child("slog", 0, 160, border=True):
-            for e in reversed(gs.log):
-                if "GAME OVER" in e or "kill" in e.lower():
-                    imgui.push_style_color(imgui.COLOR_TEXT, 0.95,0.3,0.3,1)
-                elif "Level up" in e:
-                    imgui.push_style_color(imgui.COLOR_TEXT, 0.4,0.9,0.4,1)
-                elif "Bonus" in e:
-                    imgui.push_style_color(imgui.COLOR_TEXT, 0.95,0.8,0.1,1)
-                else:
-                    imgui.push_style_color(imgui.COLOR_TEXT, 0.7,0.7,0.7,1)
-                imgui.text(e); imgui.pop_style_color()
-        imgui.pop_style_color()
+        if imgui.button("Resume" if pl.paused else "Pause", 70, 0): pl.paused = not pl.paused
+        imgui.same_line()
+        if imgui.button("Rewind"): pl.seek(0)
+        imgui.same_line()
+        if imgui.button("Run to End"): pl.run()
+        imgui.same_line()
+        if imgui.button("Stop"): keep = False
+        imgui.push_item_width(-1)
+        ch, t = imgui.slider_int("##seek", pl.t, 0, rp.ticks, "tick %d")
+        if ch: pl.seek(t)
+        labels = [f"{s:g}x" for s in PLAYBACK_SPEEDS]
+        cur = PLAYBACK_SPEEDS.index(pl.speed) if pl.speed in PLAYBACK_SPEEDS else 2
+        ch, i = imgui.combo("##speed", cur, labels)
+        if ch: pl.speed = PLAYBACK_SPEEDS[i]
+        imgui.pop_item_width()
 
-        imgui.spacing(); imgui.separator()
-        fps = imgui.get_io().framerate
-        bc = (0.2,0.8,0.2,1) if fps>=55 else (0.9,0.7,0.1,1) if fps>=30 else (0.9,0.2,0.2,1)
-        imgui.push_style_color(imgui.COLOR_PLOT_HISTOGRAM, *bc)
-        imgui.progress_bar(min(fps/60.0,1.0), (-1,0), f"FPS: {fps:.0f}")
-        imgui.pop_style_color()
+        _draw_snake_log(gs)
+        _draw_fps_bar()
+    return keep
 
 
 # ╔══════════════════════════════════════════════════════════════╗
 # ║                  N-BODY / PROJECTILE SIM                    ║
 # ╚══════════════════════════════════════════════════════════════╝
-SIM_MODE_NBODY      = 0
-SIM_MODE_PROJECTILE = 1
-
-BODY_COLORS = [
-    (0.95, 0.35, 0.20),  # sun-orange
-    (0.25, 0.65, 0.95),  # sky-blue
-    (0.30, 0.90, 0.40),  # green
-    (0.95, 0.85, 0.15),  # yellow
-    (0.75, 0.35, 0.95),  # purple
-    (0.95, 0.50, 0.80),  # pink
-    (0.35, 0.95, 0.88),  # cyan
-    (0.95, 0.60, 0.25),  # amber
-]
-
-
-class Body:
-    def __init__(self, x, y, vx, vy, mass, color_idx=0):
-        self.x = float(x); self.y = float(y)
-        self.vx = float(vx); self.vy = float(vy)
-        self.mass = float(mass)
-        self.color_idx = color_idx % len(BODY_COLORS)
-        self.trail: list = []   # list of (x,y)
-        self.ax = 0.0; self.ay = 0.0
-
-    def color(self):
-        return BODY_COLORS[self.color_idx]
-
-
-class PhysicsState:
-    def __init__(self):
-        self.sim_mode   = SIM_MODE_NBODY
-        self.paused     = False
-        self.time_step  = 0.5
-        self.G          = 500.0
-        self.softening  = 8.0
-        self.trail_len  = 300
-        self.show_trail = True
-        self.show_force_vectors = False
-        self.show_velocity_vectors = False
-        self.elapsed    = 0.0
-        self.log: list  = []
-
-        # Projectile
-        self.proj_gravity  = 200.0
-        self.proj_angle    = 45.0
-        self.proj_speed    = 300.0
-        self.proj_x0       = 60.0
-        self.proj_y0       = GAME_H - 60.0
-        self.proj_running  = False
-        self.proj_t        = 0.0
-        self.proj_path: list = []
-        self.proj_air_resist = 0.0
-        self.proj_vx       = 0.0
-        self.proj_vy       = 0.0
-        self.proj_x        = 0.0
-        self.proj_y        = 0.0
-        self.proj_landed   = False
-        self.proj_range    = 0.0
-
-        self.bodies: list = []
-        self._preset_solar()
-
-    def _log(self, msg):
-        self.log.append(f"[{time.strftime('%H:%M:%S')}] {msg}")
-        if len(self.log) > 200: self.log.pop(0)
-
-    def _preset_solar(self):
-        cx, cy = GAME_W/2, GAME_H/2
-        self.bodies = [
-            Body(cx,   cy,   0,      0,      8000, 0),   # central star
-            Body(cx+160, cy, 0,    -56,       30, 1),   # planet 1
-            Body(cx-250, cy, 0,     45,       20, 2),   # planet 2
-            Body(cx+370, cy, 0,    -37,       15, 3),   # planet 3
-            Body(cx,  cy-120, 52,    0,        8, 4),   # moon-ish
-        ]
-        self._log("Preset: Solar System loaded")
-
-    def _preset_figure8(self):
-        # Classic figure-8 three-body
-        cx, cy = GAME_W/2, GAME_H/2
-        s = 120
-        self.bodies = [
-            Body(cx - s*0.97,  cy - s*0.24,  93*0.4,  27*0.4,  200, 0),
-            Body(cx + s*0.97,  cy + s*0.24, -93*0.4, -27*0.4,  200, 1),
-            Body(cx,           cy,             0,       0,      200, 2),
-        ]
-        self._log("Preset: Figure-8 orbit loaded")
-
-    def _preset_binary(self):
-        cx, cy = GAME_W/2, GAME_H/2
-        self.bodies = [
-            Body(cx-100, cy,  0, -40, 2000, 0),
-            Body(cx+100, cy,  0,  40, 2000, 1),
-            Body(cx, cy-200, 65,   0,   50, 2),
-            Body(cx, cy+200,-65,   0,   50, 3),
-        ]
-        self._log("Preset: Binary star + planets loaded")
-
-    def add_body(self, x, y, vx, vy, mass):
-        idx = len(self.bodies) % len(BODY_COLORS)
-        self.bodies.append(Body(x, y, vx, vy, mass, idx))
-        self._log(f"Body added at ({x:.0f},{y:.0f}) m={mass:.0f}")
-
-    def remove_body(self, i):
-        if 0 <= i < len(self.bodies):
-            self.bodies.pop(i)
-            self._log(f"Body {i} removed")
-
-    def reset_trails(self):
-        for b in self.bodies: b.trail.clear()
-
-    def update_nbody(self, dt):
-        if self.paused or not self.bodies: return
-        real_dt = dt * self.time_step
-        n = len(self.bodies)
-        # Compute accelerations
-        for i in range(n):
-            self.bodies[i].ax = 0.0
-            self.bodies[i].ay = 0.0
-        for i in range(n):
-            for j in range(i+1, n):
-                bi = self.bodies[i]; bj = self.bodies[j]
-                dx = bj.x - bi.x;  dy = bj.y - bi.y
-                dist2 = dx*dx + dy*dy + self.softening**2
-                dist  = math.sqrt(dist2)
-                force = self.G * bi.mass * bj.mass / dist2
-                fx = force * dx/dist; fy = force * dy/dist
-                bi.ax += fx/bi.mass; bi.ay += fy/bi.mass
-                bj.ax -= fx/bj.mass; bj.ay -= fy/bj.mass
-        # Integrate
-        for b in self.bodies:
-            b.vx += b.ax * real_dt; b.vy += b.ay * real_dt
-            b.x  += b.vx * real_dt; b.y  += b.vy * real_dt
-            if self.show_trail:
-                b.trail.append((b.x, b.y))
-                if len(b.trail) > self.trail_len: b.trail.pop(0)
-        self.elapsed += real_dt
-
-    def launch_projectile(self):
-        rad = math.radians(self.proj_angle)
-        self.proj_vx  = self.proj_speed * math.cos(rad)
-        self.proj_vy  = -self.proj_speed * math.sin(rad)   # screen y flipped
-        self.proj_x   = self.proj_x0
-        self.proj_y   = self.proj_y0
-        self.proj_t   = 0.0
-        self.proj_path = [(self.proj_x, self.proj_y)]
-        self.proj_running = True
-        self.proj_landed  = False
-        self.proj_range   = 0.0
-        self._log(f"Launch: angle={self.proj_angle:.1f}° speed={self.proj_speed:.0f}")
-
-    def update_projectile(self, dt):
-        if not self.proj_running or self.proj_landed or self.paused: return
-        steps = 4
-        sub = dt / steps
-        for _ in range(steps):
-            # air resistance  F_drag = -k*v
-            drag = self.proj_air_resist
-            self.proj_vx += (-drag * self.proj_vx) * sub
-            self.proj_vy += (self.proj_gravity - drag * self.proj_vy) * sub
-            self.proj_x  += self.proj_vx * sub
-            self.proj_y  += self.proj_vy * sub
-            self.proj_t  += sub
-            self.proj_path.append((self.proj_x, self.proj_y))
-            if self.proj_y >= self.proj_y0:
-                self.proj_landed = True
-                self.proj_running = False
-                self.proj_range = abs(self.proj_x - self.proj_x0)
-                self._log(f"Landed! Range={self.proj_range:.1f}px  t={self.proj_t:.2f}s")
-                break
-            if self.proj_x > GAME_W + 200 or self.proj_x < -200:
-                self.proj_landed = True; self.proj_running = False
-                self._log("Projectile left the field.")
-                break
+TRAIL_BANDS      = 6     # alpha bands per trail, one polyline each
+TRAIL_MAX_DRAW   = 256   # most points handed to ImGui per trail after decimation
+TRAIL_POINT_BUDGET = 8000  # polyline points per frame over all trails (~0.35 us each)
+TRAIL_CALL_BUDGET  = 800   # polylines per frame over all trails (~2 us each)
+
+STAR_SEED        = 42
 
+NBODY_DETAIL_MAX = 400   # above this many bodies draw plain dots, no glow
+NBODY_LIST_MAX   = 32    # rows shown in the panel's body list
+NBODY_SPLAT_MIN  = 10000 # above this many bodies draw a density image instead of dots
+
+PROJ_DASH_PX     = 6     # dash length of the projectile preview
+
+SWEEP_VIEW_W     = 340   # projectile sweep heatmap inset, px
+SWEEP_VIEW_H     = 260
+# heatmap colour ramp, low → high
+SWEEP_RAMP = np.array([(0.05,0.03,0.20), (0.25,0.20,0.60), (0.10,0.60,0.60),
+                       (0.50,0.85,0.30), (0.98,0.90,0.20)])
 
 def draw_physics_sim(ps: PhysicsState, ox: float, oy: float):
     dl = imgui.get_window_draw_list()
@@ -492,66 +429,383 @@ def draw_physics_sim(ps: PhysicsState, ox: float, oy: float):
         _draw_projectile(dl, ps, ox, oy)
 
 
+def _upload_rgba(tex_id, pixels, filt):
+    """(H, W, 4) uint8 image into a GL texture, creating it on first use."""
+    H, W = pixels.shape[:2]
+    if tex_id is None: tex_id = gl.glGenTextures(1)
+    gl.glBindTexture(gl.GL_TEXTURE_2D, tex_id)
+    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, filt)
+    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, filt)
+    gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
+    gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, W, H, 0,
+                    gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, np.ascontiguousarray(pixels).tobytes())
+    return tex_id
+
+
+class StarField:
+    """Static background stars, rebuilt only when the size or density changes.
+
+    Uses its own RNG so the global random module is never reseeded. With
+    use_texture set (needs a live GL context) the stars are rasterised once
+    into an RGBA texture and drawn with a single add_image; otherwise the
+    packed positions/colours are replayed as tiny quads.
+    """
+    def __init__(self, seed=STAR_SEED):
+        self.seed = seed
+        self.use_texture = False
+        self.key = None
+        self.stars = []          # (x, y, r, packed colour)
+        self.tex_id = None
+
+    def _build(self, w, h, density):
+        self.key = (w, h, density)
+        rng = np.random.default_rng(self.seed)
+        count = int(w * h * density / 1e4)
+        xs = rng.integers(0, int(w), count, endpoint=True)
+        ys = rng.integers(0, int(h), count, endpoint=True)
+        br = rng.uniform(0.2, 0.6, count)
+        rs = rng.uniform(0.5, 1.5, count)
+        self.stars = [(float(x), float(y), float(r), imgui.get_color_u32_rgba(b, b, b+0.1, 1))
+                      for x, y, r, b in zip(xs, ys, rs, br)]
+        if self.use_texture:
+            self._upload(w, h, xs, ys, rs, br)
+
+    def _upload(self, w, h, xs, ys, rs, br):
+        W, H = int(w), int(h)
+        img = np.zeros((H, W, 4), dtype=np.float32)
+        for oy_ in range(-2, 3):
+            for ox_ in range(-2, 3):
+                px = xs + ox_; py = ys + oy_
+                ok = (px >= 0) & (px < W) & (py >= 0) & (py < H)
+                cov = np.clip(rs + 0.5 - math.hypot(ox_, oy_), 0.0, 1.0)[ok]
+                np.maximum.at(img[..., 3], (py[ok], px[ok]), cov)
+                for ch, c in enumerate((br, br, br + 0.1)):
+                    np.maximum.at(img[..., ch], (py[ok], px[ok]), c[ok])
+        pixels = (np.clip(img, 0, 1) * 255).astype(np.uint8)
+        self.tex_id = _upload_rgba(self.tex_id, pixels, gl.GL_LINEAR)
+
+    def draw(self, dl, ox, oy, w, h, density):
+        if (w, h, density) != self.key: self._build(w, h, density)
+        if self.tex_id is not None:
+            dl.add_image(self.tex_id, (ox, oy), (ox + int(w), oy + int(h)))
+            return
+        for x, y, r, c in self.stars:
+            dl.add_rect_filled(ox+x-r, oy+y-r, ox+x+r, oy+y+r, c)
+
+
+starfield = StarField()
+
+
+class SweepHeatmap:
+    """Colour-mapped angle x speed plane of the last projectile sweep.
+
+    Rasterised only when the sweep or metric changes: into a GL texture with
+    use_texture set, otherwise kept as packed colours for one quad per cell.
+    """
+    def __init__(self):
+        self.use_texture = False
+        self.sw = None           # SweepResult and metric last rasterised; the object
+        self.metric = None       # itself, since a freed result's id() can be reused
+        self.tex_id = None
+        self.cells = []          # packed colour per cell, row-major, fast speed on top
+        self.lo = self.hi = 0.0
+
+    def _build(self, sw, metric):
+        self.sw, self.metric = sw, metric
+        z = sw.metric(metric)[:, :, 0, 0].T[::-1]          # rows: speed high → low
+        self.lo, self.hi = float(np.nanmin(z)), float(np.nanmax(z))
+        t = np.nan_to_num((z - self.lo) / max(self.hi - self.lo, 1e-9), nan=0.0)
+        x = np.linspace(0, 1, len(SWEEP_RAMP))
+        rgb = np.stack([np.interp(t, x, SWEEP_RAMP[:, c]) for c in range(3)], -1)
+        if self.use_texture:
+            rgba = np.concatenate([rgb, np.ones(z.shape + (1,))], -1)
+            self.tex_id = _upload_rgba(self.tex_id, (rgba * 255).astype(np.uint8), gl.GL_NEAREST)
+        else:
+            self.cells = [imgui.get_color_u32_rgba(r, g, b, 1) for r, g, b in rgb.reshape(-1, 3).tolist()]
+
+    def draw(self, dl, ps: PhysicsState, x0, y0, w, h):
+        from sim.sweep import SWEEP_METRIC_NAMES
+        sw = ps.sweep
+        if self.sw is not sw or self.metric != ps.sweep_metric: self._build(sw, ps.sweep_metric)
+        na, ns = len(sw.angles), len(sw.speeds)
+        dl.add_rect_filled(x0-6, y0-22, x0+w+6, y0+h+22, imgui.get_color_u32_rgba(0.03,0.03,0.05,0.85), 4)
+        if self.tex_id is not None:
+            dl.add_image(self.tex_id, (x0, y0), (x0 + w, y0 + h))
+        else:
+            cw, ch = w / na, h / ns
+            for k, c in enumerate(self.cells):
+                r, q = divmod(k, na)
+                dl.add_rect_filled(x0 + q*cw, y0 + r*ch, x0 + (q+1)*cw, y0 + (r+1)*ch, c)
+        a0, a1 = sw.angles[0], sw.angles[-1]; s0, s1 = sw.speeds[0], sw.speeds[-1]
+        def to_px(a, s):
+            return (x0 + (a - a0) / max(a1 - a0, 1e-9) * w, y0 + h - (s - s0) / max(s1 - s0, 1e-9) * h)
+        # longest-range angle for each speed
+        ridge = [to_px(a, s) for a, s in zip(sw.optimal_angles()[:, 0, 0].tolist(), sw.speeds.tolist())]
+        if len(ridge) > 1:
+            dl.add_polyline(ridge, imgui.get_color_u32_rgba(1, 1, 1, 0.7), thickness=1.5)
+        if a0 <= ps.proj_angle <= a1 and s0 <= ps.proj_speed <= s1:
+            cx, cy = to_px(ps.proj_angle, ps.proj_speed)
+            dl.add_circle(cx, cy, 5, imgui.get_color_u32_rgba(1, 0.4, 0.2, 1), thickness=2)
+        white = imgui.get_color_u32_rgba(0.85, 0.85, 0.85, 1)
+        dl.add_rect(x0, y0, x0+w, y0+h, imgui.get_color_u32_rgba(0.5, 0.5, 0.5, 1))
+        dl.add_text(x0, y0 - 18, white,
+                    f"{SWEEP_METRIC_NAMES[ps.sweep_metric]}  {self.lo:.0f} – {self.hi:.0f}   "
+                    f"drag {sw.drags[0]:.2f}  g {sw.gravities[0]:.0f}")
+        dl.add_text(x0, y0 + h + 4, white, f"angle {a0:.0f}° → {a1:.0f}°   speed {s0:.0f} ↑ {s1:.0f}")
+
+
+sweep_view = SweepHeatmap()
+
+
 def _draw_nbody(dl, ps: PhysicsState, ox, oy):
+    from sim.collide import body_radius
     t = time.time()
 
-    # Soft star-field background dots (static pattern based on position)
-    random.seed(42)
-    for _ in range(80):
-        sx = ox + random.randint(0, int(GAME_W))
-        sy = oy + random.randint(0, int(GAME_H))
-        brightness = random.uniform(0.2, 0.6)
-        dl.add_circle_filled(sx, sy, random.uniform(0.5,1.5),
-                             imgui.get_color_u32_rgba(brightness,brightness,brightness+0.1,1))
-    random.seed()
+    # Soft star-field background dots (static pattern, cached)
+    starfield.draw(dl, ox, oy, GAME_W, GAME_H, ps.star_density)
 
     # Trails
-    if ps.show_trail:
-        for b in ps.bodies:
-            if len(b.trail) < 2: continue
-            r,g,bv = b.color()
-            for i in range(1, len(b.trail)):
-                alpha = (i / len(b.trail)) * 0.6
-                col = imgui.get_color_u32_rgba(r, g, bv, alpha)
-                x1,y1 = b.trail[i-1]; x2,y2 = b.trail[i]
-                dl.add_line(ox+x1, oy+y1, ox+x2, oy+y2, col, thickness=1.2)
+    if ps.show_trail and ps.store.n <= TRAIL_MAX_BODIES:
+        _draw_trails(dl, ps, ox, oy)
 
     # Bodies
-    for b in ps.bodies:
+    if len(ps.bodies) > NBODY_DETAIL_MAX:
+        _draw_nbody_dots(dl, ps, ox, oy)
+        bodies, pos = (), []
+    else:
+        bodies, pos = ps.bodies, ps.render_pos().tolist()
+    for b, (bx, by) in zip(bodies, pos):
         r,g,bv = b.color()
-        radius = max(4.0, math.sqrt(b.mass) * 0.18)
+        radius = float(body_radius(b.mass))
         # glow
-        dl.add_circle_filled(ox+b.x, oy+b.y, radius*2.2,
+        dl.add_circle_filled(ox+bx, oy+by, radius*2.2,
                              imgui.get_color_u32_rgba(r,g,bv,0.12))
-        dl.add_circle_filled(ox+b.x, oy+b.y, radius*1.5,
+        dl.add_circle_filled(ox+bx, oy+by, radius*1.5,
                              imgui.get_color_u32_rgba(r,g,bv,0.25))
-        dl.add_circle_filled(ox+b.x, oy+b.y, radius,
+        dl.add_circle_filled(ox+bx, oy+by, radius,
                              imgui.get_color_u32_rgba(r,g,bv,1.0))
         # specular highlight
-        dl.add_circle_filled(ox+b.x-radius*0.3, oy+b.y-radius*0.3, radius*0.35,
+        dl.add_circle_filled(ox+bx-radius*0.3, oy+by-radius*0.3, radius*0.35,
                              imgui.get_color_u32_rgba(1,1,1,0.35))
 
         # velocity vector
         if ps.show_velocity_vectors:
             scale = 0.4
-            dl.add_line(ox+b.x, oy+b.y,
-                        ox+b.x+b.vx*scale, oy+b.y+b.vy*scale,
+            dl.add_line(ox+bx, oy+by,
+                        ox+bx+b.vx*scale, oy+by+b.vy*scale,
                         imgui.get_color_u32_rgba(0.3,0.9,1.0,0.8), thickness=1.5)
         # force/accel vector
         if ps.show_force_vectors:
             scale = 800
-            dl.add_line(ox+b.x, oy+b.y,
-                        ox+b.x+b.ax*scale, oy+b.y+b.ay*scale,
+            dl.add_line(ox+bx, oy+by,
+                        ox+bx+b.ax*scale, oy+by+b.ay*scale,
                         imgui.get_color_u32_rgba(1.0,0.4,0.2,0.8), thickness=1.5)
 
     # Elapsed
     tc = imgui.get_color_u32_rgba(0.7,0.7,0.7,0.7)
     dl.add_text(ox+8, oy+8, tc, f"N-Body  |  Bodies: {len(ps.bodies)}  |  t = {ps.elapsed:.1f}")
+    if ps.recorder is not None:
+        dl.add_circle_filled(ox+GAME_W-20, oy+14, 5, imgui.get_color_u32_rgba(0.95,0.2,0.2,1))
+        dl.add_text(ox+GAME_W-58, oy+8, tc, "REC")
     if ps.paused:
         dl.add_text(ox+GAME_W//2-35, oy+GAME_H//2,
                     imgui.get_color_u32_rgba(0.95,0.85,0.1,1), "PAUSED")
 
 
+_band_color_cache: dict = {}
+
+
+def _trail_band_colors(color_idx):
+    # packed colours for each alpha band, built once per palette entry
+    cols = _band_color_cache.get(color_idx)
+    if cols is None:
+        r, g, b = BODY_COLORS[color_idx]
+        cols = _band_color_cache[color_idx] = [
+            imgui.get_color_u32_rgba(r, g, b, (k + 0.5) / TRAIL_BANDS * 0.6)
+            for k in range(TRAIL_BANDS)]
+    return cols
+
+
+def _trail_window(ps: PhysicsState):
+    """Every row's trail as one (n, cap, 2) view, oldest → newest, with the
+    mask of columns holding samples and each row's first valid column."""
+    tb = ps.trails; n = min(ps.store.n, len(tb.count)); cap = tb.cap
+    start = cap - tb.count[:n]
+    return tb.pts[:n, tb.head:tb.head + cap], np.arange(cap) >= start[:, None], start
+
+
+def _draw_trails(dl, ps: PhysicsState, ox, oy):
+    """All trails as banded polylines. Decimation (one point per pixel, then a
+    per-row stride so the frame stays inside TRAIL_POINT_BUDGET) is one pass
+    over every row. ImGui still needs a polyline per band per body, so with
+    many bodies each trail gets fewer bands to stay inside TRAIL_CALL_BUDGET."""
+    win, valid, start = _trail_window(ps)
+    n, cap = valid.shape
+    if not n or cap < 2: return
+    limit = max(2, min(TRAIL_MAX_DRAW, TRAIL_POINT_BUDGET // n))
+    q = np.floor(win)
+    keep = valid.copy()
+    keep[:, 1:] &= np.any(q[:, 1:] != q[:, :-1], axis=2)
+    keep[np.arange(n), np.minimum(start, cap - 1)] = True
+    keep[:, -1] = True
+    keep &= valid
+    rank = np.cumsum(keep, axis=1) - 1
+    stride = np.maximum(-(-(rank[:, -1] + 1) // limit), 1)   # 0 for empty rows
+    keep &= (rank % stride[:, None] == 0)
+    keep[:, -1] = valid[:, -1]                    # newest sample always stays
+    counts = keep.sum(axis=1).tolist()
+    pts = (win[keep] + (ox, oy)).tolist()
+    nb = max(1, min(TRAIL_BANDS, TRAIL_CALL_BUDGET // n))
+    cols = [[c[(k + 1) * TRAIL_BANDS // nb - 1] for k in range(nb)]
+            for c in map(_trail_band_colors, range(len(BODY_COLORS)))]
+    o = 0
+    for m, ci in zip(counts, ps.store.color_idx[:n].tolist()):
+        if m >= 2: _draw_bands(dl, pts[o:o + m], cols[ci], 1.2)
+        o += m
+
+
+def _draw_bands(dl, pts, cols, thickness):
+    """Draw a list of points as len(cols) polylines, oldest band first."""
+    m = len(pts)
+    nb = min(len(cols), m - 1)
+    for k in range(nb):
+        lo, hi = k * (m - 1) // nb, (k + 1) * (m - 1) // nb
+        if hi > lo:
+            # bands share their end point so the line stays continuous
+            dl.add_polyline(pts[lo:hi+1], cols[k * len(cols) // nb], thickness=thickness)
+
+
+def _decimate(pts):
+    """Drop points that land on the same pixel as their predecessor, then
+    stride down to TRAIL_MAX_DRAW; the newest point is always kept."""
+    q = np.floor(pts)
+    keep = np.empty(len(pts), dtype=bool)
+    keep[0] = True
+    np.any(q[1:] != q[:-1], axis=1, out=keep[1:])
+    keep[-1] = True
+    pts = pts[keep]
+    if len(pts) > TRAIL_MAX_DRAW:
+        idx = np.linspace(0, len(pts) - 1, TRAIL_MAX_DRAW).astype(np.intp)
+        pts = pts[idx]
+    return pts
+
+
+def _draw_banded_polyline(dl, pts, ox, oy, cols, thickness):
+    """Draw an (k,2) path as len(cols) polylines, oldest band first."""
+    if len(pts) < 2: return
+    pts = _decimate(pts)
+    m = len(pts)
+    if m < 2: return
+    _draw_bands(dl, (pts + (ox, oy)).tolist(), cols, thickness)
+
+
+def _draw_nbody_dots(dl, ps: PhysicsState, ox, oy):
+    # large scenes: one 2x2 px quad per body, colors packed once per palette entry
+    st = ps.store; n = st.n
+    if n > NBODY_SPLAT_MIN and body_splat.use_texture:
+        body_splat.draw(dl, ps, ox, oy); return
+    step = -(-n // NBODY_SPLAT_MIN)      # without a texture, thin huge scenes out
+    cols = [imgui.get_color_u32_rgba(r, g, b, 0.9) for r, g, b in BODY_COLORS]
+    for (x, y), ci in zip(ps.render_pos()[::step].tolist(), st.color_idx[:n:step].tolist()):
+        dl.add_rect_filled(ox+x-1, oy+y-1, ox+x+1, oy+y+1, cols[ci])
+
+
+class BodySplat:
+    """Huge scenes as one additive density image: every body adds its palette
+    colour to its pixel, log tone-mapped, re-uploaded only when bodies moved."""
+    def __init__(self):
+        self.use_texture = False
+        self.tex_id = None
+        self.key = None
+        self.palette = np.array(BODY_COLORS, dtype=np.float32)
+
+    def draw(self, dl, ps: PhysicsState, ox, oy):
+        key = (ps.scene_version, ps.elapsed, ps.draw_alpha, ps.paused)
+        if key != self.key: self._build(ps); self.key = key
+        dl.add_image(self.tex_id, (ox, oy), (ox + GAME_W, oy + GAME_H))
+
+    def _build(self, ps: PhysicsState):
+        W, H = GAME_W, GAME_H
+        p = ps.render_pos()
+        x = p[:, 0].astype(np.intp); y = p[:, 1].astype(np.intp)
+        ok = (x >= 0) & (x < W) & (y >= 0) & (y < H)
+        pix = (y * W + x)[ok]
+        rgb = self.palette[ps.store.color_idx[:ps.store.n][ok]]
+        img = np.stack([np.bincount(pix, rgb[:, c], W*H) for c in range(3)], -1)
+        hits = np.bincount(pix, minlength=W*H)
+        scale = np.log1p(hits) / np.log1p(max(int(hits.max()), 1)) / np.maximum(hits, 1)
+        rgba = np.empty((W*H, 4), dtype=np.uint8)
+        rgba[:, :3] = np.clip(img * scale[:, None] * 1.5, 0, 1) * 255
+        rgba[:, 3] = np.where(hits > 0, 255, 0)
+        self.tex_id = _upload_rgba(self.tex_id, rgba.reshape(H, W, 4), gl.GL_NEAREST)
+
+
+body_splat = BodySplat()
+
+
+# ── Scene files ─────────────────────────────────────────────────
+SCENE_DIR        = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenes")
+SCENE_RECENT     = os.path.join(SCENE_DIR, "recent.txt")
+SCENE_LIST_MAX   = 10    # files offered under Simulation > Load Scene / Recent Scenes
+
+def list_scenes():
+    from sim.scene import SCENE_EXT
+    if not os.path.isdir(SCENE_DIR): return []
+    names = sorted((f for f in os.listdir(SCENE_DIR) if f.endswith(SCENE_EXT)), reverse=True)
+    return names[:SCENE_LIST_MAX]
+
+def recent_scenes():
+    try:
+        with open(SCENE_RECENT) as f: paths = f.read().splitlines()
+    except OSError:
+        return []
+    return [p for p in paths if os.path.isfile(p)][:SCENE_LIST_MAX]
+
+def _touch_recent(path):
+    paths = [path] + [p for p in recent_scenes() if p != path]
+    os.makedirs(SCENE_DIR, exist_ok=True)
+    with open(SCENE_RECENT, "w") as f: f.write("\n".join(paths[:SCENE_LIST_MAX]))
+
+def save_scene(ps: PhysicsState):
+    from sim.scene import SCENE_EXT
+    os.makedirs(SCENE_DIR, exist_ok=True)
+    path = os.path.join(SCENE_DIR, f"scene_{time.strftime('%Y%m%d_%H%M%S')}_{ps.store.n}{SCENE_EXT}")
+    try:
+        ps.save_scene(path); _touch_recent(path)
+    except OSError as e:
+        ps.log.add(EV_ALERT, "Scene save failed: {}", e)
+
+def load_scene(ps: PhysicsState, path):
+    try:
+        ps.load_scene(path); _touch_recent(path)
+        ps.sim_mode = SIM_MODE_NBODY
+    except (OSError, ValueError) as e:
+        ps.log.add(EV_ALERT, "Scene load failed: {}", e)
+
+
+# ── Trajectory recordings ───────────────────────────────────────
+RECORD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+
+def start_recording(ps: PhysicsState, compress):
+    os.makedirs(RECORD_DIR, exist_ok=True)
+    path = os.path.join(RECORD_DIR, f"nbody_{time.strftime('%Y%m%d_%H%M%S')}.nbtr")
+    try:
+        ps.start_recording(path, compress)
+    except OSError as e:
+        ps.log.add(EV_ALERT, "Recording failed: {}", e)
+
+def _draw_recorder_status(ps: PhysicsState):
+    rec = ps.recorder
+    if rec is None: return
+    col = (0.95,0.3,0.3,1) if rec.error or rec.dropped else (0.9,0.9,0.9,1)
+    imgui.push_style_color(imgui.COLOR_TEXT, *col)
+    imgui.text(f"REC  {rec.steps} steps  {rec.bytes / 2**20:.1f} MB  queue {rec.backlog}"
+               + (f"  dropped {rec.dropped}" if rec.dropped else ""))
+    if rec.error: imgui.text_wrapped(f"write failed: {rec.error}")
+    imgui.pop_style_color()
+    if imgui.button("Stop Recording"): ps.stop_recording()
+
+
 def _draw_projectile(dl, ps: PhysicsState, ox, oy):
     # Ground line
     gy = oy + ps.proj_y0
@@ -567,34 +821,26 @@ def _draw_projectile(dl, ps: PhysicsState, ox, oy):
                 gy - guide_len*math.sin(rad),
                 imgui.get_color_u32_rgba(0.6,0.6,0.2,0.5), thickness=1)
 
-    # Ideal trajectory (no drag) dashed preview
+    # Dashed preview of the next shot (closed form, drag included, cached per setting)
     if not ps.proj_running:
-        prev = None
-        spd = ps.proj_speed
-        angle_rad = math.radians(ps.proj_angle)
-        vx0 = spd*math.cos(angle_rad)
-        vy0 = -spd*math.sin(angle_rad)
-        for step in range(120):
-            t_sim = step * 0.025
-            px = ps.proj_x0 + vx0*t_sim
-            py = ps.proj_y0 + vy0*t_sim + 0.5*ps.proj_gravity*t_sim*t_sim
-            if py > ps.proj_y0: break
-            if prev:
-                dl.add_line(ox+prev[0], oy+prev[1], ox+px, oy+py,
-                            imgui.get_color_u32_rgba(0.4,0.7,0.4,0.3), thickness=1)
-            prev = (px, py)
+        pts = (ps.proj_preview().path(spacing=PROJ_DASH_PX) + (ox, oy)).tolist()
+        col = imgui.get_color_u32_rgba(0.4,0.7,0.4,0.3)
+        for k in range(0, len(pts) - 1, 2):
+            dl.add_line(*pts[k], *pts[k+1], col, thickness=1)
 
     # Actual path
-    if len(ps.proj_path) > 1:
-        for i in range(1, len(ps.proj_path)):
-            alpha = min(1.0, i / max(len(ps.proj_path),1))
-            col = imgui.get_color_u32_rgba(0.3, 0.7+0.3*alpha, 0.95, 0.8)
-            x1,y1 = ps.proj_path[i-1]; x2,y2 = ps.proj_path[i]
-            dl.add_line(ox+x1, oy+y1, ox+x2, oy+y2, col, thickness=2)
+    path = ps.proj_path()
+    if path is not None and len(path) > 1:
+        cols = [imgui.get_color_u32_rgba(0.3, 0.7+0.3*(k+1)/TRAIL_BANDS, 0.95, 0.8)
+                for k in range(TRAIL_BANDS)]
+        _draw_banded_polyline(dl, path, ox, oy, cols, 2)
+
+    if ps.show_sweep and ps.sweep is not None:
+        sweep_view.draw(dl, ps, ox + GAME_W - SWEEP_VIEW_W - 24, oy + 40, SWEEP_VIEW_W, SWEEP_VIEW_H)
 
     # Projectile ball (if flying or path exists)
-    if ps.proj_path:
-        px, py = ps.proj_path[-1]
+    if ps.proj_traj is not None:
+        px, py = ps.proj_render_pos()
         if not ps.proj_landed:
             dl.add_circle_filled(ox+px, oy+py, 8, imgui.get_color_u32_rgba(0.95,0.5,0.2,1))
             dl.add_circle_filled(ox+px-2, oy+py-2, 3, imgui.get_color_u32_rgba(1,1,1,0.5))
@@ -629,11 +875,11 @@ def draw_physics_panel(ps: PhysicsState):
 
         if imgui.button("N-Body Gravity", width=140):
             ps.sim_mode = SIM_MODE_NBODY
-            ps._log("Switched to N-Body mode")
+            ps.log.add(EV_INFO, "Switched to N-Body mode")
         imgui.same_line()
         if imgui.button("Projectile Motion", width=150):
             ps.sim_mode = SIM_MODE_PROJECTILE
-            ps._log("Switched to Projectile mode")
+            ps.log.add(EV_INFO, "Switched to Projectile mode")
         imgui.spacing(); imgui.separator(); imgui.spacing()
 
         if ps.sim_mode == SIM_MODE_NBODY:
@@ -642,16 +888,7 @@ def draw_physics_panel(ps: PhysicsState):
             _panel_projectile(ps)
 
         imgui.spacing(); imgui.separator(); imgui.spacing()
-        imgui.push_style_color(imgui.COLOR_TEXT, 0.95,0.55,0.25,1)
-        imgui.text(f"EVENT LOG  ({len(ps.log)})"); imgui.pop_style_color()
-        imgui.separator()
-        if imgui.button("Clear##plog"): ps.log.clear()
-        imgui.push_style_color(imgui.COLOR_CHILD_BACKGROUND, 0.04,0.04,0.06,1)
-        with imgui.begin_child("plog", 0, 130, border=True):
-            for e in reversed(ps.log):
-                imgui.push_style_color(imgui.COLOR_TEXT, 0.7,0.7,0.7,1)
-                imgui.text(e); imgui.pop_style_color()
-        imgui.pop_style_color()
+        physics_log_view.draw(ps.log, "plog", 130)
 
         imgui.spacing(); imgui.separator()
         fps = imgui.get_io().framerate
@@ -669,6 +906,7 @@ def _panel_nbody(ps: PhysicsState):
     _, ps.paused = imgui.checkbox("Pause", ps.paused)
     imgui.same_line(spacing=16)
     if imgui.button("Reset Trails"): ps.reset_trails()
+    _draw_recorder_status(ps)
 
     imgui.spacing()
     # Presets
@@ -687,16 +925,72 @@ def _panel_nbody(ps: PhysicsState):
     _, ps.G         = imgui.slider_float("Gravity G", ps.G, 50.0, 3000.0, "%.0f")
     _, ps.softening = imgui.slider_float("Softening", ps.softening, 1.0, 40.0, "%.1f")
     _, ps.trail_len = imgui.slider_int ("Trail Len", ps.trail_len, 20, 800)
+    ch, eng = imgui.combo("Engine", ps.engine, NBODY_ENGINE_NAMES)
+    if ch and eng != ps.engine:
+        ps.engine = eng
+        ps.log.add(EV_INFO, "Engine -> {}", NBODY_ENGINE_NAMES[eng])
+    if ps.engine == NBODY_ENGINE_BH:
+        _, ps.bh_theta = imgui.slider_float("Theta", ps.bh_theta, 0.1, 1.5, "%.2f")
+        if imgui.is_item_hovered():
+            with imgui.begin_tooltip(): imgui.text("Opening angle: lower = more accurate, slower")
+    ch, integ = imgui.combo("Integrator", ps.integrator, INTEG_NAMES)
+    if ch and integ != ps.integrator:
+        ps.integrator = integ; ps.rk_h = None; ps.rk_limited = 0
+        ps.log.add(EV_INFO, "Integrator -> {}", INTEG_NAMES[integ])
+    if ps.integrator == INTEG_RK45:
+        _, ps.rk_tol = imgui.slider_float("RK Tol", ps.rk_tol, 1e-10, 1e-3, "%.1e",
+                                          imgui.SLIDER_FLAGS_LOGARITHMIC)
+    ch, coll = imgui.combo("Collisions", ps.collisions, COLLIDE_NAMES)
+    if ch and coll != ps.collisions:
+        ps.collisions = coll
+        ps.log.add(EV_INFO, "Collisions -> {}", COLLIDE_NAMES[coll])
     imgui.pop_item_width()
+    if ps.collisions != COLLIDE_OFF and ps.merged:
+        imgui.text(f"Merged so far: {ps.merged}")
+    if ps.integrator == INTEG_RK45:
+        imgui.text(f"RK45 sub-steps/frame: {ps.rk_substeps}")
+        if ps.rk_limited:
+            imgui.text_colored(f"Step limit hit ({ps.rk_limited} steps)", 1.0, 0.4, 0.3)
+    if ps.engine == NBODY_ENGINE_DIRECT:
+        _, ps.parallel = imgui.checkbox("Parallel", ps.parallel)
+        imgui.same_line()
+        imgui.push_style_color(imgui.COLOR_TEXT, 0.6,0.6,0.6,1)
+        if ps._parallel_active():
+            imgui.text(f"active, {os.cpu_count() or 1} workers")
+        else:
+            imgui.text(f"(used from {PARALLEL_MIN_N} bodies)")
+        imgui.pop_style_color()
+
+    # Conservation telemetry
+    ps.update_telemetry()
+    dE, dL = ps.energy_drift(), ps.angmom_drift()
+    def drift_col(d):
+        d = abs(d)
+        return (0.3,0.9,0.4,1) if d < 1e-4 else (0.9,0.8,0.2,1) if d < 1e-2 else (0.95,0.3,0.3,1)
+    imgui.columns(2, "tel", border=False)
+    imgui.text("Energy");   imgui.next_column(); imgui.text(f"{ps.energy:.4g}"); imgui.next_column()
+    imgui.text("dE/E0");    imgui.next_column()
+    imgui.push_style_color(imgui.COLOR_TEXT, *drift_col(dE)); imgui.text(f"{dE:+.2e}"); imgui.pop_style_color()
+    imgui.next_column()
+    imgui.text("Ang. Mom."); imgui.next_column(); imgui.text(f"{ps.angmom:.4g}"); imgui.next_column()
+    imgui.text("dL/L0");    imgui.next_column()
+    imgui.push_style_color(imgui.COLOR_TEXT, *drift_col(dL)); imgui.text(f"{dL:+.2e}"); imgui.pop_style_color()
+    imgui.next_column()
+    imgui.columns(1)
+    if imgui.button("Rebase Drift"):
+        ps.reset_drift_baseline()
 
     _, ps.show_trail            = imgui.checkbox("Show Trails",   ps.show_trail)
     imgui.same_line(spacing=10)
     _, ps.show_velocity_vectors = imgui.checkbox("Velocity Vec",  ps.show_velocity_vectors)
     _, ps.show_force_vectors    = imgui.checkbox("Force Vec",     ps.show_force_vectors)
+    imgui.push_item_width(180)
+    _, ps.star_density = imgui.slider_float("Star Density", ps.star_density, 0.0, 10.0, "%.1f")
+    imgui.pop_item_width()
 
     imgui.spacing(); imgui.separator(); imgui.spacing()
     imgui.text(f"Bodies: {len(ps.bodies)}")
-    for i, b in enumerate(ps.bodies):
+    for i, b in enumerate(ps.bodies[:NBODY_LIST_MAX]):
         r,g,bv = b.color()
         imgui.push_style_color(imgui.COLOR_TEXT, r, g, bv, 1.0)
         imgui.text(f"  [{i}] m={b.mass:.0f}  v=({b.vx:.1f},{b.vy:.1f})")
@@ -704,6 +998,10 @@ def _panel_nbody(ps: PhysicsState):
         imgui.same_line()
         if imgui.button(f"X##{i}"):
             ps.remove_body(i); break
+    if len(ps.bodies) > NBODY_LIST_MAX:
+        imgui.push_style_color(imgui.COLOR_TEXT, 0.6,0.6,0.6,1)
+        imgui.text(f"  ... +{len(ps.bodies)-NBODY_LIST_MAX} more")
+        imgui.pop_style_color()
 
     imgui.spacing()
     if imgui.button("Add Random Body"):
@@ -737,7 +1035,7 @@ def _panel_projectile(ps: PhysicsState):
         ps.launch_projectile()
     imgui.same_line()
     if imgui.button("Clear Path"):
-        ps.proj_path.clear(); ps.proj_landed=False; ps.proj_running=False
+        ps.proj_traj = None; ps.proj_landed=False; ps.proj_running=False
 
     imgui.spacing(); imgui.separator(); imgui.spacing()
     imgui.text("Physics Readout")
@@ -748,15 +1046,13 @@ def _panel_projectile(ps: PhysicsState):
     rad = math.radians(ps.proj_angle)
     vx0 = ps.proj_speed*math.cos(rad)
     vy0 = ps.proj_speed*math.sin(rad)
-    t_flight_ideal = 2*vy0/ps.proj_gravity if ps.proj_gravity>0 else 0
-    range_ideal    = vx0*t_flight_ideal
-    max_h_ideal    = vy0**2/(2*ps.proj_gravity) if ps.proj_gravity>0 else 0
+    pre = ps.proj_preview()
 
     pstat("Vx (launch)",  f"{vx0:.1f}")
     pstat("Vy (launch)",  f"{vy0:.1f}")
-    pstat("Ideal Range",  f"{range_ideal:.1f}")
-    pstat("Ideal Height", f"{max_h_ideal:.1f}")
-    pstat("Ideal t",      f"{t_flight_ideal:.2f}s")
+    pstat("Pred. Range",  f"{pre.range:.1f}")
+    pstat("Pred. Height", f"{pre.height:.1f}")
+    pstat("Pred. t",      f"{pre.t_land:.2f}s")
     if ps.proj_landed:
         pstat("Actual Range", f"{ps.proj_range:.1f}")
         pstat("Actual t",     f"{ps.proj_t:.2f}s")
@@ -764,12 +1060,38 @@ def _panel_projectile(ps: PhysicsState):
     pstat("State", state_str)
     imgui.columns(1)
 
+    imgui.spacing(); imgui.separator(); imgui.spacing()
+    imgui.push_style_color(imgui.COLOR_TEXT, 0.4,0.75,1.0,1); imgui.text("PARAMETER SWEEP"); imgui.pop_style_color()
+    imgui.push_item_width(200)
+    ch, n = imgui.slider_int2("Angles x Speeds", *ps.sweep_n, 10, 200)
+    if ch: ps.sweep_n = list(n)
+    ch, r = imgui.drag_float2("Speed Range", *ps.sweep_speed, 5.0, 10.0, 2000.0, "%.0f")
+    if ch: ps.sweep_speed = [min(r), max(r)]
+    from sim.sweep import SWEEP_METRIC_NAMES
+    _, ps.sweep_metric = imgui.combo("Heatmap", ps.sweep_metric, SWEEP_METRIC_NAMES)
+    imgui.pop_item_width()
+    if imgui.button("Run Sweep"): ps.run_sweep()
+    imgui.same_line()
+    if imgui.button("Best Angle"): ps.find_best_angle()
+    imgui.same_line()
+    _, ps.show_sweep = imgui.checkbox("Show##sweep", ps.show_sweep)
+    sw = ps.sweep
+    if sw is not None:
+        imgui.text(f"{sw.lanes} shots in {sw.seconds*1000:.0f} ms")
+        if (sw.drags[0], sw.gravities[0]) != (ps.proj_air_resist, ps.proj_gravity):
+            imgui.same_line(); imgui.text_colored("(stale)", 0.9, 0.6, 0.2)
+    if ps.proj_best:
+        a, r = ps.proj_best
+        imgui.text(f"Best angle: {a:.2f} deg  →  {r:.1f} px")
+        imgui.same_line()
+        if imgui.button("Use"): ps.proj_angle = a
+
     imgui.spacing(); imgui.separator(); imgui.spacing()
     _, ps.paused = imgui.checkbox("Pause Simulation", ps.paused)
 
     imgui.spacing()
     imgui.push_style_color(imgui.COLOR_TEXT, 0.6,0.6,0.6,1)
-    imgui.text("Green dashed = ideal (no drag)")
+    imgui.text("Green dashed = predicted (with drag)")
     imgui.text("Blue path   = actual trajectory")
     imgui.pop_style_color()
 
@@ -780,14 +1102,168 @@ def _panel_projectile(ps: PhysicsState):
 MODE_SNAKE   = 0
 MODE_PHYSICS = 1
 
+PHYSICS_HZ_CHOICES = (60, 120, 240, 480)
+PHYSICS_HZ         = 240   # fixed simulation rate, independent of the 60 FPS render cap
+MAX_CATCHUP_STEPS  = 8     # physics steps per frame before the backlog is dropped
+
+
+class FixedStepper:
+    """Accumulator that turns variable frame time into fixed-size physics steps."""
+    def __init__(self, hz=PHYSICS_HZ, max_steps=MAX_CATCHUP_STEPS):
+        self.hz        = hz
+        self.max_steps = max_steps
+        self.acc       = 0.0
+        self.steps     = 0      # steps taken on the last frame
+        self.dropped   = 0.0    # seconds of sim time discarded to avoid a spiral of death
+
+    @property
+    def dt(self): return 1.0 / self.hz
+
+    def advance(self, frame_dt, step):
+        """Run step(dt) as often as frame_dt allows; returns the render blend factor."""
+        h = self.dt
+        self.acc += frame_dt
+        n = 0
+        while self.acc >= h and n < self.max_steps:
+            step(h); self.acc -= h; n += 1
+        if self.acc >= h:
+            self.dropped += self.acc - self.acc % h
+            self.acc %= h
+        self.steps = n
+        return self.acc / h
+
+# ╔══════════════════════════════════════════════════════════════╗
+# ║                          FONTS                              ║
+# ╚══════════════════════════════════════════════════════════════╝
+FONT_DIRS       = [os.path.dirname(os.path.abspath(__file__)),
+                   os.path.join(os.path.dirname(os.path.abspath(__file__)), "font")]
+FONT_EXTS       = (".ttf", ".otf")
+FONT_UI         = "THSarabunNew"   # preferred UI face, else the first one found
+FONT_SIZE       = 18               # px
+FONT_OVERSAMPLE = 2                # horizontal; ImGui's 3 builds ~50% slower for no visible gain here
+
+
+class FontManager:
+    """Bundled fonts by file stem, and which one the UI atlas holds."""
+    def __init__(self, dirs=FONT_DIRS):
+        self.paths = {}
+        for d in dirs:
+            try: files = sorted(os.listdir(d))
+            except OSError: continue
+            for f in files:
+                stem, ext = os.path.splitext(f)
+                if ext.lower() in FONT_EXTS: self.paths.setdefault(stem, os.path.join(d, f))
+        self.ui      = None    # loaded face, None for ImGui's built-in font
+        self.pending = None    # face picked from the menu, swapped in between frames
+
+    def use(self, io, name=FONT_UI, renderer=None):
+        """Rebuild the atlas with one face (Thai + Latin ranges) and upload it if a
+        renderer exists; at startup call it before the renderer so it builds once."""
+        if name not in self.paths: name = next(iter(self.paths), None)
+        io.fonts.clear()
+        if name is None:
+            io.fonts.add_font_default()
+            print("[info] No bundled fonts found, using default.")
+        else:
+            cfg = imgui.FontConfig(oversample_h=FONT_OVERSAMPLE, pixel_snap_h=True)
+            io.fonts.add_font_from_file_ttf(self.paths[name], FONT_SIZE, cfg, io.fonts.get_glyph_ranges_thai())
+        self.ui = name; self.pending = None
+        if renderer is None: io.fonts.get_tex_data_as_alpha8()
+        else: renderer.refresh_font_texture()
+
+fonts = FontManager()
+
+# ╔══════════════════════════════════════════════════════════════╗
+# ║                      FRAME PROFILER                         ║
+# ╚══════════════════════════════════════════════════════════════╝
+PROFILE_PHASES = ["idle", "events", "update", "ui", "render", "flip"]
+PROFILE_PLOT   = 240     # frames shown in each overlay graph
+PROFILE_DIR    = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+profiler = FrameProfiler(PROFILE_PHASES)
+
+
+def export_trace(prof: FrameProfiler):
+    path = os.path.join(PROFILE_DIR, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    try:
+        prof.save_chrome_trace(path)
+        print(f"[profiler] {min(prof.count, prof.frames)} frames -> {path}")
+    except OSError as e:
+        print(f"[profiler] export failed: {e}")
+
+
+def _profile_row(label, series, qs):
+    s = series[-PROFILE_PLOT:]
+    imgui.text(f"{label:<7} p50 {qs[0]:6.2f}  p95 {qs[1]:6.2f}  p99 {qs[2]:6.2f} ms")
+    if len(s):
+        imgui.plot_lines(f"##{label}", s, scale_min=0.0, scale_max=max(float(s.max()), 1.0),
+                         graph_size=(0, 28))
+
+
+def draw_profiler_overlay(prof: FrameProfiler):
+    """Per-phase frame time graphs and draw-list sizes; returns False when closed."""
+    imgui.set_next_window_position(12, MENUBAR_H + 30, imgui.ONCE)
+    imgui.set_next_window_size(380, 0, imgui.ONCE)
+    imgui.set_next_window_bg_alpha(0.85)
+    with imgui.begin("Profiler", closable=True) as w:
+        if not w.opened: return False
+        if not w.expanded: return True
+        _, prof.enabled = imgui.checkbox("Capture", prof.enabled)
+        imgui.same_line()
+        if imgui.button("Clear"): prof.clear()
+        imgui.same_line()
+        if imgui.button("Export Trace"): export_trace(prof)
+        imgui.same_line(); imgui.text(f"{min(prof.count, prof.frames)} frames")
+        imgui.separator()
+        _profile_row("frame", prof.series(), prof.percentiles())
+        for name in prof.phases:
+            _profile_row(name, prof.series(name), prof.percentiles(name))
+        imgui.separator()
+        if prof.count:
+            r = (prof.count - 1) % prof.frames
+            vtx = prof.series(of=prof.vtx)
+            imgui.text(f"draw list  {prof.vtx[r]:,} vtx  {prof.idx[r]:,} idx  {prof.cmds[r]} cmds")
+            imgui.text(f"vertices   p50 {np.percentile(vtx, PROFILE_QS[0]):,.0f}  "
+                       f"p99 {np.percentile(vtx, PROFILE_QS[-1]):,.0f}")
+            s = vtx[-PROFILE_PLOT:]
+            imgui.plot_lines("##vtx", s, scale_min=0.0, scale_max=max(float(s.max()), 1.0), graph_size=(0, 28))
+    return True
+
+
+# ── startup profile (--startup-profile) ─────────────────────────
+def startup_mark(phase):
+    STARTUP.append((phase, time.perf_counter()))
+
+
+def startup_report():
+    """Time to first frame by phase; CPU spent before main.py started (interpreter
+    start-up, unpacking a frozen build) is listed separately, and so are the sim
+    modules loaded by then (the rest are imported when first used)."""
+    lines = [f"startup: {(STARTUP[-1][1] - STARTUP[0][1]) * 1e3:.1f} ms to first frame "
+             f"(+{STARTUP_CPU0 * 1e3:.0f} ms CPU before main.py)"]
+    for (_, t0), (phase, t1) in zip(STARTUP, STARTUP[1:]):
+        lines.append(f"  {phase:<22} {(t1 - t0) * 1e3:8.1f} ms   @ {(t1 - STARTUP[0][1]) * 1e3:8.1f}")
+    loaded = sorted(m[4:] for m in sys.modules if m.startswith("sim."))
+    lines.append(f"  sim modules loaded:    {', '.join(loaded)}")
+    text = "\n".join(lines)
+    print(text)
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(PROFILE_DIR, "startup.txt"), "w") as f: f.write(text + "\n")
+    except OSError as e:
+        print(f"[profiler] could not save startup profile: {e}")
+
+
 def main():
+    startup_mark("module setup")
+    startup_profile = "--startup-profile" in sys.argv[1:]
     pygame.init()
     size = (WINDOW_W, WINDOW_H)
     pygame.display.set_mode(size, pygame.DOUBLEBUF | pygame.OPENGL)
     pygame.display.set_caption("ImGui App — Snake & Physics Sim")
+    startup_mark("window")
 
     imgui.create_context()
-    renderer = PygameRenderer()
     io = imgui.get_io()
     io.display_size = size
 
@@ -801,32 +1277,44 @@ def main():
     style.frame_padding      = (6, 4)
     style.item_spacing       = (8, 5)
 
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    font_path  = os.path.join(script_dir, "font", "Chandler42 Regular.otf")
-    if os.path.exists(font_path):
-        io.fonts.add_font_from_file_ttf(font_path, 18, io.fonts.get_glyph_ranges_thai())
-        renderer.rebuild_font_atlas()
-    else:
-        print(f"[info] Font not found at {font_path}, using default.")
+    fonts.use(io)          # before the renderer exists, so the atlas is built and uploaded once
+    startup_mark("font atlas")
+
+    renderer = PygameRenderer()
+    starfield.use_texture = sweep_view.use_texture = body_splat.use_texture = True
+    startup_mark("renderer")
 
     gs    = SnakeState()
     ps    = PhysicsState()
     clock = pygame.time.Clock()
+    stepper = FixedStepper()
     app_mode = MODE_SNAKE    # current app mode
+    player   = None          # ReplayPlayer while a replay is being watched
+    show_profiler = False
 
     # State for "Add Body" inline form in panel (kept outside loop for persistence)
     new_body_inputs = [GAME_W/2, GAME_H/2, 0.0, -50.0, 100.0]
+    startup_mark("app state")
 
     running = True
     while running:
-        dt = clock.tick(60) / 1000.0
+        prof = profiler
+        prof.begin_frame()
+        with prof.scope("idle"):
+            dt = clock.tick(60) / 1000.0
 
+        events = prof.scope("events").begin()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_profiler = not show_profiler
             elif event.type == pygame.KEYDOWN:
-                if app_mode == MODE_SNAKE:
-                    gs.handle_key(event.key)
+                if app_mode == MODE_SNAKE and player:
+                    if event.key == pygame.K_SPACE:    player.paused = not player.paused
+                    elif event.key == pygame.K_ESCAPE: player = None
+                elif app_mode == MODE_SNAKE:
+                    if event.key in SNAKE_KEYS: gs.handle_input(SNAKE_KEYS[event.key])
                 else:
                     if event.key == pygame.K_SPACE:
                         ps.paused = not ps.paused
@@ -835,15 +1323,16 @@ def main():
             renderer.process_event(event)
 
         renderer.process_inputs()
+        events.end()
 
-        if app_mode == MODE_SNAKE:
-            gs.update(dt)
-        else:
-            if ps.sim_mode == SIM_MODE_NBODY:
-                ps.update_nbody(dt)
+        with prof.scope("update"):
+            if app_mode == MODE_SNAKE:
+                stepper.advance(dt, player.step if player else gs.step)
             else:
-                ps.update_projectile(dt)
+                ps.draw_alpha = stepper.advance(dt, ps.step)
+                if ps.sim_mode == SIM_MODE_NBODY: ps.sample_trails()
 
+        ui = prof.scope("ui").begin()
         imgui.new_frame()
 
         # ── Menu Bar ──────────────────────────────────────────────
@@ -856,6 +1345,20 @@ def main():
                         clicked, _ = imgui.menu_item("Physics Sim",      "", app_mode==MODE_PHYSICS, True)
                         if clicked: app_mode = MODE_PHYSICS
                         imgui.separator()
+                        with imgui.begin_menu("Physics Rate", True) as rm:
+                            if rm.opened:
+                                for hz in PHYSICS_HZ_CHOICES:
+                                    if imgui.menu_item(f"{hz} Hz", "", stepper.hz==hz, True)[0]:
+                                        stepper.hz = hz
+                        with imgui.begin_menu("Font", True) as fm:
+                            if fm.opened:
+                                for name in fonts.paths:
+                                    if imgui.menu_item(name, "", fonts.ui == name, True)[0]: fonts.pending = name
+                        imgui.separator()
+                        if imgui.menu_item("Profiler", "F3", show_profiler, True)[0]:
+                            show_profiler = not show_profiler
+                        if imgui.menu_item("Export Trace")[0]: export_trace(profiler)
+                        imgui.separator()
                         clicked, _ = imgui.menu_item("Quit", "Alt+F4", False, True)
                         if clicked: running = False
 
@@ -863,10 +1366,25 @@ def main():
                     with imgui.begin_menu("Snake", True) as m:
                         if m.opened:
                             if imgui.menu_item("Restart", "R")[0]:      gs.reset()
-                            imgui.menu_item("God Mode",  "", gs.god_mode, True)
-                            if imgui.menu_item("God Mode Toggle")[0]:    gs.god_mode = not gs.god_mode
+                            if imgui.menu_item("God Mode",  "", gs.god_mode, True)[0]: gs.set_god_mode(not gs.god_mode)
+                            if imgui.menu_item("God Mode Toggle")[0]:    gs.set_god_mode(not gs.god_mode)
                             if imgui.menu_item("Toggle Grid")[0]:        gs.show_grid = not gs.show_grid
                             if imgui.menu_item("Toggle Hitboxes")[0]:    gs.show_hitboxes = not gs.show_hitboxes
+                            imgui.separator()
+                            if imgui.menu_item("Save Replay")[0]:        save_replay(gs)
+                            if imgui.menu_item("Watch This Game")[0]:
+                                player = watch_replay(gs.replay.to_bytes())
+                            with imgui.begin_menu("Open Replay", True) as rm:
+                                if rm.opened:
+                                    names = list_replays()
+                                    if not names: imgui.menu_item("(none saved)", "", False, False)
+                                    for name in names:
+                                        if imgui.menu_item(name)[0]:
+                                            try:
+                                                player = watch_replay(os.path.join(REPLAY_DIR, name))
+                                            except (OSError, ValueError) as e:
+                                                gs.log.add(EV_ALERT, "Replay load failed: {}", e)
+                            if player and imgui.menu_item("Stop Replay", "Esc")[0]: player = None
 
                 if app_mode == MODE_PHYSICS:
                     with imgui.begin_menu("Simulation", True) as m:
@@ -879,9 +1397,37 @@ def main():
                             if imgui.menu_item("Solar Preset")[0]:  ps._preset_solar(); ps.elapsed=0
                             if imgui.menu_item("Figure-8 Preset")[0]: ps._preset_figure8(); ps.elapsed=0
                             if imgui.menu_item("Binary Star Preset")[0]: ps._preset_binary(); ps.elapsed=0
+                            with imgui.begin_menu("Generate", True) as gm:
+                                if gm.opened:
+                                    from sim.scene import GENERATORS, GEN_SIZES
+                                    for kind, gname in enumerate(GENERATORS):
+                                        with imgui.begin_menu(gname, True) as km:
+                                            if km.opened:
+                                                for size in GEN_SIZES:
+                                                    if imgui.menu_item(f"{size:,} bodies")[0]:
+                                                        ps.generate(kind, size); ps.sim_mode = SIM_MODE_NBODY
+                            imgui.separator()
+                            if imgui.menu_item("Save Scene")[0]: save_scene(ps)
+                            with imgui.begin_menu("Load Scene", True) as lm:
+                                if lm.opened:
+                                    names = list_scenes()
+                                    if not names: imgui.menu_item("(none saved)", "", False, False)
+                                    for name in names:
+                                        if imgui.menu_item(name)[0]: load_scene(ps, os.path.join(SCENE_DIR, name))
+                            with imgui.begin_menu("Recent Scenes", True) as rm:
+                                if rm.opened:
+                                    paths = recent_scenes()
+                                    if not paths: imgui.menu_item("(none)", "", False, False)
+                                    for path in paths:
+                                        if imgui.menu_item(os.path.basename(path))[0]: load_scene(ps, path)
                             imgui.separator()
                             if imgui.menu_item("Pause / Resume", "Space")[0]: ps.paused = not ps.paused
                             if imgui.menu_item("Reset Trails")[0]: ps.reset_trails()
+                            imgui.separator()
+                            if ps.recorder is None:
+                                if imgui.menu_item("Record Trajectories")[0]: start_recording(ps, False)
+                                if imgui.menu_item("Record Trajectories (zlib)")[0]: start_recording(ps, True)
+                            elif imgui.menu_item("Stop Recording")[0]: ps.stop_recording()
 
                 # FPS in menu bar (right-aligned approx)
                 fps = io.framerate
@@ -902,28 +1448,42 @@ def main():
             wp = imgui.get_window_position()
             view_oy = wp.y
             if app_mode == MODE_SNAKE:
+                vg = player.gs if player else gs
                 top_pad = ((WINDOW_H - MENUBAR_H) - GAME_H) // 2
-                draw_snake_game(gs, wp.x, view_oy + max(0, top_pad))
+                draw_snake_game(vg, wp.x, view_oy + max(0, top_pad))
                 dl = imgui.get_window_draw_list()
-                dl.add_text(wp.x+8, view_oy+6,
-                            imgui.get_color_u32_rgba(1,1,1,0.8),
-                            f"Score: {gs.score}   Level: {gs.level}   Hi: {gs.high_score}")
+                hud = f"Score: {vg.score}   Level: {vg.level}   Hi: {vg.high_score}"
+                if player: hud = f"REPLAY  x{player.speed:g}   tick {player.t}/{player.replay.ticks}   " + hud
+                dl.add_text(wp.x+8, view_oy+6, imgui.get_color_u32_rgba(1,1,1,0.8), hud)
             else:
                 draw_physics_sim(ps, wp.x, view_oy)
 
         # ── Side panel ─────────────────────────────────────────────
-        if app_mode == MODE_SNAKE:
+        if app_mode == MODE_SNAKE and player:
+            if not draw_replay_panel(player): player = None
+        elif app_mode == MODE_SNAKE:
             draw_snake_panel(gs)
         else:
             draw_physics_panel(ps)
+        if show_profiler: show_profiler = draw_profiler_overlay(prof)
+        ui.end()
 
         # ── Render ─────────────────────────────────────────────────
-        gl.glClearColor(0.06, 0.06, 0.08, 1)
-        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
-        imgui.render()
-        renderer.render(imgui.get_draw_data())
-        pygame.display.flip()
-
+        with prof.scope("render"):
+            gl.glClearColor(0.06, 0.06, 0.08, 1)
+            gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+            imgui.render()
+            dd = imgui.get_draw_data()
+            renderer.render(dd)
+        with prof.scope("flip"):
+            pygame.display.flip()
+        if fonts.pending: fonts.use(io, fonts.pending, renderer)
+        if startup_profile:
+            startup_mark("first frame"); startup_report(); startup_profile = False
+        prof.end_frame(dd.total_vtx_count, dd.total_idx_count,
+                       sum(cl.cmd_buffer_size for cl in dd.commands_lists))
+
+    ps.shutdown()
     renderer.shutdown()
     pygame.quit()
 
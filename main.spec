@@ -5,12 +5,20 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('THSarabunNew.ttf', '.'), ('font', 'font')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=[
+        # packaging/build tooling: pygame.pkgdata falls back when pkg_resources is missing
+        'pkg_resources', 'setuptools', 'distutils', 'numpy.distutils', 'numpy.f2py',
+        # stdlib the app never touches
+        'tkinter', 'asyncio', 'xmlrpc', 'pydoc', 'pydoc_data', 'lib2to3', 'curses',
+        'sqlite3', 'webbrowser',
+        # GL front ends besides OpenGL.GL
+        'OpenGL.GLUT', 'OpenGL.GLE', 'OpenGL.GLES1', 'OpenGL.GLES2', 'OpenGL.GLES3', 'OpenGL.Tk',
+    ],
     noarchive=False,
     optimize=0,
 )
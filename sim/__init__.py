@@ -0,0 +1,6 @@
+"""Headless simulation core for the Snake game and the physics sandbox.
+
+Nothing in here touches pygame, imgui or OpenGL. ``sim.snake`` and the
+``sim.eventlog`` it logs to are pure Python; ``sim.physics`` and
+``sim.batch`` need NumPy and are only imported on demand.
+"""
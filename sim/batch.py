@@ -0,0 +1,195 @@
+"""Many Snake games advanced in lockstep with NumPy.
+
+``SnakeBatch`` keeps N boards as arrays and moves every live game one tick
+per ``step(actions)`` under the same rules as ``SnakeState.tick()``: level-up
+speed, bonus food every 5 foods with a 6 s expiry (in tick time), god-mode
+wrapping and the full-board win. Only the food RNG stream differs.
+"""
+import numpy as np
+
+from .config import COLS, ROWS
+from .snake import Action, BONUS_TIME
+
+CELLS = COLS * ROWS
+
+# indexed by Action.UP/DOWN/LEFT/RIGHT; the reverse of action a is a ^ 1
+DIR_DX = np.array([0, 0, -1, 1], np.int32)
+DIR_DY = np.array([-1, 1, 0, 0], np.int32)
+
+SPAWN_TRIES = 8    # rejection-sampling rounds before scanning a nearly full board
+
+
+class SnakeBatch:
+    """N independent games stored column-wise; game g is row g of every array.
+
+    Cells are flat indices ``row*COLS + col``. Bodies are rings of cell
+    indices: ``body[g, head[g]]`` is the head and the ``length[g]`` slots
+    behind it (mod the ring size) are the rest, tail last. ``occ`` counts
+    segments per cell (god mode lets the body overlap itself) and ``nfree``
+    tracks how many cells are empty. Food and bonus food are -1 when absent.
+    """
+    def __init__(self, n, seed=None, god_mode=False, auto_reset=True):
+        self.n          = n
+        self.rng        = np.random.default_rng(seed)
+        self.auto_reset = auto_reset
+        self.god_mode   = np.zeros(n, bool); self.god_mode[:] = god_mode
+        cap = 1 << (CELLS - 1).bit_length()    # a normal game never outgrows the board
+        self.occ           = np.zeros((n, CELLS), np.uint16)
+        self.nfree         = np.zeros(n, np.int32)
+        self.body          = np.zeros((n, cap), np.int32)
+        self.head          = np.zeros(n, np.int32)
+        self.length        = np.zeros(n, np.int32)
+        self.direction     = np.zeros(n, np.int32)
+        self.food          = np.zeros(n, np.int32)
+        self.bonus_food    = np.zeros(n, np.int32)
+        self.bonus_timer   = np.zeros(n)
+        self.score         = np.zeros(n, np.int64)
+        self.level         = np.zeros(n, np.int32)
+        self.food_eaten    = np.zeros(n, np.int32)
+        self.move_count    = np.zeros(n, np.int32)
+        self.tick_interval = np.zeros(n)
+        self.elapsed       = np.zeros(n)
+        self.alive         = np.zeros(n, bool)
+        self.won           = np.zeros(n, bool)
+        # outcome of the last game each slot finished (valid where step() said done)
+        self.final_score   = np.zeros(n, np.int64)
+        self.final_won     = np.zeros(n, bool)
+        self.final_moves   = np.zeros(n, np.int32)
+        self.games         = 0
+        self._rows         = np.arange(n)
+        self.reset()
+
+    def reset(self, idx=None):
+        """Start fresh games in the given slots (all of them by default)."""
+        idx = self._rows if idx is None else np.asarray(idx, np.intp)
+        if not len(idx): return
+        cx, cy = COLS // 2, ROWS // 2
+        start = cy*COLS + np.array([cx-2, cx-1, cx])   # tail → head
+        self.occ[idx] = 0
+        self.occ[idx[:, None], start] = 1
+        self.nfree[idx]         = CELLS - 3
+        self.body[idx, :3]      = start
+        self.head[idx]          = 2
+        self.length[idx]        = 3
+        self.direction[idx]     = Action.RIGHT
+        self.bonus_food[idx]    = -1
+        self.bonus_timer[idx]   = 0.0
+        self.score[idx]         = 0
+        self.level[idx]         = 1
+        self.food_eaten[idx]    = 0
+        self.move_count[idx]    = 0
+        self.tick_interval[idx] = 0.15
+        self.elapsed[idx]       = 0.0
+        self.alive[idx]         = True
+        self.won[idx]           = False
+        self.food[idx]          = self._spawn(idx)
+
+    def _spawn(self, idx):
+        """A uniformly chosen empty cell for each game in idx; -1 on a full board."""
+        out  = np.full(len(idx), -1, np.int32)
+        todo = np.flatnonzero(self.nfree[idx] > 0)
+        for _ in range(SPAWN_TRIES):
+            if not len(todo): return out
+            c  = self.rng.integers(0, CELLS, len(todo), dtype=np.int32)
+            ok = self.occ[idx[todo], c] == 0
+            out[todo[ok]] = c[ok]; todo = todo[~ok]
+        for k in todo:
+            free = np.flatnonzero(self.occ[idx[k]] == 0)
+            out[k] = free[self.rng.integers(len(free))]
+        return out
+
+    def _grow(self):
+        """Double the body rings, unrolling each so the tail sits in slot 0."""
+        cap  = self.body.shape[1]
+        tail = (self.head - self.length + 1) & (cap - 1)
+        ring = np.take_along_axis(self.body, (tail[:, None] + np.arange(cap)) & (cap - 1), 1)
+        self.body = np.zeros((self.n, 2*cap), np.int32)
+        self.body[:, :cap] = ring
+        self.head[:] = self.length - 1
+
+    def cells(self, g):
+        """Body cells of game g as (col, row) pairs, head first, like SnakeState.snake."""
+        mask = self.body.shape[1] - 1
+        ring = self.body[g, (self.head[g] - np.arange(self.length[g])) & mask]
+        return list(zip((ring % COLS).tolist(), (ring // COLS).tolist()))
+
+    def step(self, actions):
+        """Move every live game one tick.
+
+        actions holds one Action per game (or a single value for all); a
+        reversal or a non-direction keeps the current heading. Returns
+        (reward, done): score gained this tick and the games that ended.
+        Ended games are restarted when auto_reset is set, otherwise they stay
+        frozen with alive False until reset().
+        """
+        a    = np.broadcast_to(np.asarray(actions), (self.n,))
+        live = self.alive
+        d    = self.direction
+        turn = live & (a >= 0) & (a < 4) & (a != (d ^ 1))
+        d[turn] = a[turn]
+        iv = self.tick_interval
+        np.add(self.elapsed, iv, out=self.elapsed, where=live)
+        hb = live & (self.bonus_food >= 0)
+        if hb.any():
+            np.subtract(self.bonus_timer, iv, out=self.bonus_timer, where=hb)
+            self.bonus_food[hb & (self.bonus_timer <= 0)] = -1
+        refill = np.flatnonzero(live & (self.food < 0))   # god mode filled the board earlier
+        if len(refill): self.food[refill] = self._spawn(refill)
+
+        mask = self.body.shape[1] - 1
+        rows = self._rows
+        hc   = self.body[rows, self.head]
+        nx   = hc % COLS + DIR_DX[d]
+        ny   = hc // COLS + DIR_DY[d]
+        wall = (nx < 0) | (nx >= COLS) | (ny < 0) | (ny >= ROWS)
+        ni   = (ny % ROWS)*COLS + nx % COLS
+        tc   = self.body[rows, (self.head - self.length + 1) & mask]
+        # same as `nh in snake[:-1]`: the tail cell is about to be vacated
+        hit  = self.occ[rows, ni].astype(np.int32) - (ni == tc) > 0
+        dead = live & ~self.god_mode & (wall | hit)
+
+        g = np.flatnonzero(live & ~dead)
+        if len(g) and self.length[g].max() >= mask:
+            self._grow(); mask = self.body.shape[1] - 1
+        score0 = self.score.copy()
+        gi = ni[g]
+        h  = (self.head[g] + 1) & mask
+        self.head[g] = h; self.body[g, h] = gi; self.length[g] += 1
+        o  = self.occ[g, gi] + 1
+        self.occ[g, gi] = o; self.nfree[g] -= o == 1
+        self.move_count[g] += 1
+
+        ate = gi == self.food[g]
+        win = np.zeros(len(g), bool)
+        e = g[ate]
+        if len(e):
+            self.score[e] += 10*self.level[e]; self.food_eaten[e] += 1
+            self.food[e] = self._spawn(e)
+            w = (self.food[e] < 0) & ~self.god_mode[e]
+            win[ate] = w; e = e[~w]
+            fe = self.food_eaten[e]
+            b  = e[(fe % 5 == 0) & (self.bonus_food[e] < 0)]
+            self.bonus_food[b] = self._spawn(b); self.bonus_timer[b] = BONUS_TIME
+            up = e[fe % 10 == 0]
+            self.level[up] += 1
+            self.tick_interval[up] = np.maximum(0.06, self.tick_interval[up] - 0.01)
+        bon = ~win & (gi == self.bonus_food[g])
+        b = g[bon]
+        self.score[b] += 50*self.level[b]; self.bonus_food[b] = -1
+        keep = ~(ate | bon)
+        k, kc = g[keep], tc[g][keep]
+        o = self.occ[k, kc] - 1
+        self.occ[k, kc] = o; self.nfree[k] += o == 0; self.length[k] -= 1
+        if win.any():
+            self.won[g[win]] = True; dead[g[win]] = True
+
+        reward = self.score - score0
+        ended = np.flatnonzero(dead)
+        if len(ended):
+            self.alive[ended]       = False
+            self.final_score[ended] = self.score[ended]
+            self.final_won[ended]   = self.won[ended]
+            self.final_moves[ended] = self.move_count[ended]
+            self.games += len(ended)
+            if self.auto_reset: self.reset(ended)
+        return reward, dead
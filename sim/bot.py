@@ -0,0 +1,222 @@
+"""Snake autopilot.
+
+A ``SnakeBot`` is installed as ``SnakeState.controller`` and picks the next
+heading right before every tick. Strategies:
+
+* BFS       shortest path to the food through cells that will have emptied
+            by the time the head gets there, taken only if the tail is still
+            reachable from the food afterwards; otherwise stall towards the tail.
+* Cycle     follow a precomputed Hamiltonian cycle; never dies, slow to score.
+* Hybrid    follow the cycle but cut ahead towards the food whenever the cut
+            cannot overtake the tail (falls back to BFS if the body is off-cycle).
+
+Neighbour tables and the cycle are built once at import; search buffers are
+per bot and stamped with an epoch instead of being cleared. A planned BFS path
+is reused tick after tick until the food moves or the path stops being valid.
+
+``python -m sim.bot`` runs a headless benchmark of all three.
+"""
+import sys
+import time
+from array import array
+
+from .config import COLS, ROWS
+from .snake import Action, SnakeState
+
+CELLS = COLS * ROWS
+
+BOT_BFS    = 0
+BOT_CYCLE  = 1
+BOT_HYBRID = 2
+BOT_NAMES  = ["BFS", "Hamiltonian", "Hybrid"]
+
+PLAN_RETRY      = 4      # ticks spent stalling before a failed food search is retried
+HYBRID_SLACK    = 4      # cycle cells kept free ahead of the tail when cutting
+HYBRID_MAX_FILL = 0.5    # stop cutting once the snake covers this share of the board
+
+# (neighbour cell, action to get there) per cell, walls excluded
+NEIGHBORS = []
+NEIGHBOR_CELLS = []
+for _ci in range(CELLS):
+    _c, _r = _ci % COLS, _ci // COLS
+    NEIGHBORS.append(tuple((n, a) for ok, n, a in (
+        (_r > 0,        _ci - COLS, Action.UP),
+        (_r < ROWS - 1, _ci + COLS, Action.DOWN),
+        (_c > 0,        _ci - 1,    Action.LEFT),
+        (_c < COLS - 1, _ci + 1,    Action.RIGHT)) if ok))
+    NEIGHBOR_CELLS.append(tuple(n for n, _ in NEIGHBORS[-1]))
+
+
+def _hamiltonian_cycle():
+    """Boustrophedon over columns 1.. row by row, back up column 0. Needs ROWS even."""
+    assert ROWS % 2 == 0, "the cycle construction needs an even number of rows"
+    order = []
+    for r in range(ROWS):
+        cols = range(1, COLS) if r % 2 == 0 else range(COLS - 1, 0, -1)
+        order += [r*COLS + c for c in cols]
+    order += [r*COLS for r in range(ROWS - 1, -1, -1)]
+    return order
+
+HAM_ORDER = _hamiltonian_cycle()
+HAM_IDX   = array("i", [0] * CELLS)
+for _k, _ci in enumerate(HAM_ORDER): HAM_IDX[_ci] = _k
+
+
+def _body(gs):
+    return [r*COLS + c for c, r in gs.snake]
+
+
+class SnakeBot:
+    def __init__(self, strategy=BOT_HYBRID):
+        self.strategy = strategy
+        self.free_at  = array("i", [0] * CELLS)   # moves until a body cell empties
+        self.body_ep  = array("I", [0] * CELLS)   # epoch that wrote free_at[c]
+        self.seen     = array("I", [0] * CELLS)   # epoch that visited c
+        self.dist     = array("i", [0] * CELLS)
+        self.parent   = array("i", [0] * CELLS)
+        self.queue    = array("i", [0] * CELLS)
+        self.epoch    = 0
+        self.mark     = 0                         # epoch of the current free_at
+        self.path     = []                        # planned cells, next move last
+        self.target   = None
+        self.retry    = 0                         # ticks until the next search after a failure
+        self.plans    = 0
+
+    def invalidate(self):
+        self.path = []; self.target = None; self.retry = 0
+
+    def __call__(self, gs):
+        a = self.choose(gs)
+        if a is not None: gs.handle_input(a)
+
+    # ── search helpers ────────────────────────────────────────────
+    def _mark_body(self, body):
+        """Stamp free_at for a head-first body: the tail empties after 1 move."""
+        self.epoch += 1; ep = self.mark = self.epoch
+        fa, be, n = self.free_at, self.body_ep, len(body)
+        for j, c in enumerate(body):
+            t = n - j
+            if be[c] != ep or fa[c] < t: fa[c] = t; be[c] = ep
+
+    def _bfs(self, start, goal=-1, d0=0):
+        """Time-aware BFS from start over the last marked body. Stops at goal
+        (returns True) or exhausts the reachable cells (returns the count)."""
+        self.epoch += 1; ep = self.epoch
+        fa, be, seen, dist, par, q = self.free_at, self.body_ep, self.seen, self.dist, self.parent, self.queue
+        body_ep = self.mark
+        seen[start] = ep; dist[start] = d0; par[start] = -1
+        q[0] = start; head = 0; tail = 1
+        while head < tail:
+            c = q[head]; head += 1
+            d = dist[c] + 1
+            for n in NEIGHBOR_CELLS[c]:
+                if seen[n] == ep: continue
+                if be[n] == body_ep and fa[n] > d: continue
+                seen[n] = ep; dist[n] = d; par[n] = c
+                if n == goal: return True
+                q[tail] = n; tail += 1
+        return False if goal >= 0 else tail
+
+    def _safe_after(self, body, path):
+        """Would the tail still be reachable from the food after eating it?"""
+        n = len(body) + 1
+        vbody = path[:n] + body[:max(0, n - len(path))]
+        self._mark_body(vbody)
+        return len(vbody) < 3 or self._bfs(vbody[0], vbody[-1], 0)
+
+    def _plan(self, gs, body, head):
+        self.plans += 1
+        food = gs.food[1]*COLS + gs.food[0]
+        self._mark_body(body)
+        if not self._bfs(head, food): return None
+        path = []; c = food
+        while c != head: path.append(c); c = self.parent[c]
+        return path if self._safe_after(body, path) else None
+
+    def _stall(self, gs, body, head):
+        """No safe route to food: keep the tail in reach and wander away from the
+        food so the body has time to clear; boxed in, take the roomiest move."""
+        fc, fr = gs.food if gs.food else (head % COLS, head // COLS)
+        best, best_key = None, None
+        self._mark_body(body)
+        for n, a in NEIGHBORS[head]:
+            if self.body_ep[n] == self.mark and self.free_at[n] > 1: continue
+            if n == body[-1] or self._bfs(n, body[-1], 1):
+                key = (1, abs(n % COLS - fc) + abs(n // COLS - fr))
+            else:
+                key = (0, self._bfs(n, -1, 1))
+            if best_key is None or key > best_key: best, best_key = a, key
+        return best
+
+    # ── strategies ────────────────────────────────────────────────
+    def _bfs_move(self, gs, head, tail):
+        food = gs.food[1]*COLS + gs.food[0] if gs.food else -1
+        p = self.path
+        # keep following the plan while it is still legal for this food
+        if not (p and self.target == food and gs.occ[p[-1]] - (p[-1] == tail) <= 0
+                and p[-1] in NEIGHBOR_CELLS[head]):
+            p = self.path = []
+            if self.retry > 0: self.retry -= 1
+            elif food >= 0:
+                self.target = food
+                p = self.path = self._plan(gs, _body(gs), head) or []
+                if not p: self.retry = PLAN_RETRY
+        if p:
+            nxt = p.pop()
+            for n, a in NEIGHBORS[head]:
+                if n == nxt: return a
+        return self._stall(gs, _body(gs), head)
+
+    def _cycle_move(self, gs, head, tail, length):
+        want = HAM_ORDER[(HAM_IDX[head] + 1) % CELLS]
+        move = None
+        if self.strategy == BOT_HYBRID and gs.food and length < CELLS * HYBRID_MAX_FILL:
+            h = HAM_IDX[head]
+            to_tail = (HAM_IDX[tail] - h) % CELLS
+            to_food = (HAM_IDX[gs.food[1]*COLS + gs.food[0]] - h) % CELLS
+            limit = min(to_food, to_tail - HYBRID_SLACK)
+            best = 0
+            for n, a in NEIGHBORS[head]:
+                d = (HAM_IDX[n] - h) % CELLS
+                if best < d <= limit and gs.occ[n] == 0: best, move = d, a
+        if move is None:
+            for n, a in NEIGHBORS[head]:
+                if n == want and gs.occ[n] - (n == tail) <= 0: move = a
+        return move
+
+    def choose(self, gs):
+        (hc, hr), (tc, tr) = gs.snake[0], gs.snake[-1]
+        head, tail = hr*COLS + hc, tr*COLS + tc
+        if self.strategy != BOT_BFS:
+            a = self._cycle_move(gs, head, tail, len(gs.snake))
+            if a is not None: return a
+        return self._bfs_move(gs, head, tail)
+
+
+# ── headless benchmark ─────────────────────────────────────────────
+def benchmark(strategy, games=5, max_ticks=20000, seed=1):
+    bot = SnakeBot(strategy)
+    ticks = score = wins = 0
+    t0 = time.perf_counter()
+    for g in range(games):
+        gs = SnakeState(seed=seed + g, record=False); gs.controller = bot; bot.invalidate()
+        for _ in range(max_ticks):
+            gs.tick()
+            if not gs.alive: break
+        ticks += gs.move_count; score += gs.score; wins += gs.won
+    dt = time.perf_counter() - t0
+    return ticks / dt, score / games, wins, ticks / games
+
+
+def main(argv):
+    games     = int(argv[0]) if len(argv) > 0 else 5
+    max_ticks = int(argv[1]) if len(argv) > 1 else 20000
+    print(f"{games} games per strategy, at most {max_ticks} ticks each")
+    for s, name in enumerate(BOT_NAMES):
+        tps, avg, wins, length = benchmark(s, games, max_ticks)
+        print(f"  {name:<12} {tps:>10,.0f} ticks/s   avg score {avg:>9,.0f}   "
+              f"avg ticks {length:>8,.0f}   wins {wins}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,22 @@
+"""Board and viewport dimensions shared by the simulations and the UI."""
+
+# ╔══════════════════════════════════════════════════════════════╗
+# ║                     WINDOW / LAYOUT                         ║
+# ╚══════════════════════════════════════════════════════════════╝
+WINDOW_W  = 1300
+WINDOW_H  = 800
+PANEL_W   = 400          # right debug/control panel width
+VIEW_W    = WINDOW_W - PANEL_W   # 900  — shared by both modes
+MENUBAR_H = 20           # estimated menu bar height
+
+# ── Snake grid ──────────────────────────────────────────────────
+CELL_SIZE = 24
+COLS      = VIEW_W  // CELL_SIZE   # 37
+ROWS      = (WINDOW_H - MENUBAR_H) // CELL_SIZE   # 32
+
+GAME_W = COLS * CELL_SIZE
+GAME_H = ROWS * CELL_SIZE
+
+UP    = (0, -1);  DOWN  = (0, 1)
+LEFT  = (-1, 0);  RIGHT = (1, 0)
+DIRS  = [UP, DOWN, LEFT, RIGHT]   # index = Action value = 2-bit replay code
@@ -0,0 +1,84 @@
+"""Structured event log kept in a fixed-size ring.
+
+An entry is (time, kind, format string, args); nothing is formatted until a
+viewer asks for that row, so logging costs a few list stores. Storage grows
+with use up to ``capacity``, then the oldest entries are overwritten. Entries
+are addressed by sequence number (``total`` counts every event ever added),
+which stays valid as the ring wraps. Pure Python apart from ``select()``,
+which imports NumPy on first use so ``sim.snake`` stays light.
+"""
+import time
+
+EV_INFO  = 0   # settings, mode switches, user actions
+EV_GAME  = 1   # food eaten, launches, landings
+EV_BONUS = 2
+EV_LEVEL = 3   # level ups, wins
+EV_ALERT = 4   # deaths and failures
+EV_SCENE = 5   # bodies added, removed, merged; scenes loaded or saved
+EV_NAMES = ["Info", "Game", "Bonus", "Level", "Alert", "Scene"]
+
+EVENT_LOG_CAP = 100_000
+
+
+class EventLog:
+    def __init__(self, capacity=EVENT_LOG_CAP, clock=time.time):
+        self.capacity = capacity
+        self.clock    = clock
+        self.total    = 0        # events ever added, cleared or overwritten ones included
+        self.clear()
+
+    def clear(self):
+        self.t, self.fmt, self.args = [], [], []
+        self.kind = bytearray()
+        self.head = 0            # slot of the oldest entry (0 until the ring is full)
+
+    def __len__(self): return len(self.t)
+
+    @property
+    def first(self):
+        """Sequence number of the oldest retained entry."""
+        return self.total - len(self.t)
+
+    def add(self, kind, fmt, *args):
+        """Log fmt.format(*args), formatted later and only if it is shown."""
+        t = self.clock()
+        if len(self.t) < self.capacity:
+            self.t.append(t); self.kind.append(kind); self.fmt.append(fmt); self.args.append(args)
+        else:
+            h = self.head
+            self.t[h] = t; self.kind[h] = kind; self.fmt[h] = fmt; self.args[h] = args
+            self.head = (h + 1) % self.capacity
+        self.total += 1
+
+    def _slot(self, seq):
+        return (self.head + seq - self.first) % self.capacity
+
+    def kind_of(self, seq): return self.kind[self._slot(seq)]
+
+    def message(self, seq):
+        s = self._slot(seq)
+        return self.fmt[s].format(*self.args[s])
+
+    def line(self, seq):
+        stamp = time.strftime('%H:%M:%S', time.localtime(self.t[self._slot(seq)]))
+        return f"[{stamp}] {self.message(seq)}"
+
+    def lines(self):
+        """Every retained entry formatted, oldest first."""
+        return [self.line(q) for q in range(self.first, self.total)]
+
+    def select(self, kinds, since=0):
+        """Sequence numbers, oldest first, of retained entries from ``since`` on
+        whose kind is in kinds, as an int64 array."""
+        import numpy as np
+        n, first = len(self.t), self.first
+        lo = max(since - first, 0)
+        if lo >= n: return np.zeros(0, np.int64)
+        # only slots lo..n are read: one slice, or two where the ring wraps
+        a = self.head + lo; b = a + n - lo
+        kind = self.kind
+        if a >= n: k = kind[a - n:b - n]
+        elif b <= n: k = kind[a:b]
+        else: k = kind[a:] + kind[:b - n]
+        keep = np.zeros(256, bool); keep[list(kinds)] = True
+        return first + lo + np.flatnonzero(keep[np.frombuffer(k, np.uint8)])
@@ -0,0 +1,974 @@
+"""N-body gravity and projectile simulation on NumPy arrays.
+
+No UI imports: PhysicsState is advanced with ``step(dt)`` and read back
+through its arrays (``store``, ``trails``, ``proj_traj``) by whatever front
+end is drawing it. multiprocessing, the trajectory recorder and the scene,
+sweep and collision modules are imported on first use, keeping them off the
+app's startup path.
+"""
+import os
+import math
+import time
+import atexit
+
+import numpy as np
+
+from .config import GAME_W, GAME_H
+from .trajectory import DragTrajectory, drag_velocity
+from .eventlog import EventLog, EV_INFO, EV_GAME, EV_ALERT, EV_SCENE
+
+SIM_MODE_NBODY      = 0
+SIM_MODE_PROJECTILE = 1
+
+NBODY_ENGINE_DIRECT = 0
+NBODY_ENGINE_BH     = 1
+NBODY_ENGINE_NAMES  = ["Direct", "Barnes-Hut"]
+
+INTEG_EULER    = 0     # semi-implicit (symplectic) Euler, the original scheme
+INTEG_LEAPFROG = 1     # velocity Verlet, kick-drift-kick
+INTEG_YOSHIDA4 = 2     # 4th-order triple-jump composition of leapfrog
+INTEG_RK45     = 3     # adaptive Dormand–Prince 5(4)
+INTEG_NAMES    = ["Euler", "Leapfrog", "Yoshida 4", "RK45 (adaptive)"]
+
+_CBRT2 = 2.0 ** (1.0 / 3.0)
+YOSHIDA_W = (1/(2-_CBRT2), -_CBRT2/(2-_CBRT2), 1/(2-_CBRT2))
+
+RK45_MAX_SUBSTEPS = 64
+COLLIDE_OFF    = 0     # bodies pass through each other, softening only
+COLLIDE_MERGE  = 1     # touching bodies fuse (mass, momentum conserved)
+COLLIDE_BOUNCE = 2     # elastic impulse along the line of centres
+COLLIDE_NAMES  = ["Off", "Merge", "Bounce"]
+
+TELEMETRY_PERIOD  = 0.25   # seconds between energy/momentum readouts
+ENERGY_MAX_PAIRS  = 1 << 22 # pair terms summed exactly before the potential is sampled
+
+TRAIL_MAX_BODIES = 200   # trails are not recorded for scenes larger than this
+PROJ_PATH_MAX    = 4096  # most points generated for a drawn projectile path
+STAR_DENSITY     = 1.2   # background stars per 100x100 px
+BH_AUTO_N        = 20000 # scenes loaded or generated above this open paused on Barnes-Hut
+
+BODY_COLORS = [
+    (0.95, 0.35, 0.20),  # sun-orange
+    (0.25, 0.65, 0.95),  # sky-blue
+    (0.30, 0.90, 0.40),  # green
+    (0.95, 0.85, 0.15),  # yellow
+    (0.75, 0.35, 0.95),  # purple
+    (0.95, 0.50, 0.80),  # pink
+    (0.35, 0.95, 0.88),  # cyan
+    (0.95, 0.60, 0.25),  # amber
+]
+
+
+# Rows per batch in the pairwise kernel are chosen so one temporary (rows×n)
+# matrix stays around this many float64 elements (~8 MB).
+NBODY_CHUNK_ELEMS = 1 << 20
+
+
+def nbody_accel(pos, mass, G, softening, out=None, lo=0, hi=None):
+    """Softened pairwise gravity for every body, batched over row chunks.
+
+    pos is (n,2), mass is (n,); returns/fills an (n,2) acceleration array.
+    lo/hi restrict the work to rows [lo, hi) (the other rows of out are untouched).
+    """
+    n = len(mass)
+    acc = np.empty((n, 2)) if out is None else out
+    if n == 0: return acc
+    hi = n if hi is None else hi
+    x = pos[:, 0]; y = pos[:, 1]
+    gm = G * mass
+    eps2 = softening * softening
+    rows = max(1, NBODY_CHUNK_ELEMS // n)
+    for s in range(lo, hi, rows):
+        e = min(s + rows, hi)
+        dx = x[None, :] - x[s:e, None]
+        dy = y[None, :] - y[s:e, None]
+        w = dx*dx; w += dy*dy; w += eps2
+        w *= np.sqrt(w)
+        np.divide(gm, w, out=w)          # G*m_j / |r|^3  (self term has dx=dy=0)
+        acc[s:e, 0] = np.einsum("ij,ij->i", w, dx)
+        acc[s:e, 1] = np.einsum("ij,ij->i", w, dy)
+    return acc
+
+
+# ── Barnes–Hut ───────────────────────────────────────────────────
+# Linear quadtree: bodies are sorted by Morton code and every level's nodes
+# are contiguous runs of that order, so the whole tree is a handful of flat
+# arrays. The last level holds one node per body.
+BH_DEPTH = 16          # quadtree levels below the root (16 bits per axis)
+BH_WALK_CHUNK = 2048   # bodies walked together (bounds the pair frontier)
+
+
+def _morton_spread(v):
+    v = v & 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+class QuadTree:
+    """Array-backed Barnes–Hut tree over a snapshot of (pos, mass)."""
+    def __init__(self, pos, mass):
+        n = len(mass)
+        lo = pos.min(axis=0)
+        size = max(float((pos.max(axis=0) - lo).max()), 1e-9) * (1 + 1e-9)
+        q = ((pos - lo) * ((1 << BH_DEPTH) / size)).astype(np.int64)
+        np.clip(q, 0, (1 << BH_DEPTH) - 1, out=q)
+        code = _morton_spread(q[:, 0]) | (_morton_spread(q[:, 1]) << 1)
+        self.order = order = np.argsort(code, kind="stable")
+        code = code[order]
+        self.x = pos[order, 0]; self.y = pos[order, 1]
+        m = mass[order]
+        mx = m * self.x; my = m * self.y
+
+        starts = []
+        for lvl in range(BH_DEPTH + 1):
+            pre = code >> (2 * (BH_DEPTH - lvl))
+            starts.append(np.flatnonzero(np.r_[True, pre[1:] != pre[:-1]]))
+        starts.append(np.arange(n))
+
+        offs = np.cumsum([0] + [len(s) for s in starts])
+        self.start = np.concatenate(starts)
+        self.count = np.concatenate([np.diff(np.r_[s, n]) for s in starts])
+        self.mass  = np.concatenate([np.add.reduceat(m, s) for s in starts])
+        self.cx = np.concatenate([np.add.reduceat(mx, s) for s in starts]) / self.mass
+        self.cy = np.concatenate([np.add.reduceat(my, s) for s in starts]) / self.mass
+        self.size2 = np.concatenate(
+            [np.full(len(s), (size / (1 << lvl))**2) for lvl, s in enumerate(starts[:-1])]
+            + [np.zeros(n)])
+        fc = [offs[l+1] + np.searchsorted(starts[l+1], s) for l, s in enumerate(starts[:-1])]
+        self.first_child = np.concatenate(fc + [np.zeros(n, dtype=np.int64)])
+        self.n_child = np.concatenate(
+            [np.diff(np.r_[f, offs[l+2]]) for l, f in enumerate(fc)] + [np.zeros(n, dtype=np.int64)])
+
+    def accel(self, G, softening, theta, out):
+        """Walk the tree for every body; fills out (n,2) in original order."""
+        n = len(self.x)
+        eps2 = softening * softening
+        th2 = theta * theta
+        acc_s = np.zeros((n, 2))
+        for s in range(0, n, BH_WALK_CHUNK):
+            e = min(s + BH_WALK_CHUNK, n)
+            pb = np.arange(s, e)                      # body (sorted index)
+            pn = np.zeros(e - s, dtype=np.int64)      # node (root)
+            while pb.size:
+                dx = self.cx[pn] - self.x[pb]
+                dy = self.cy[pn] - self.y[pb]
+                r2 = dx*dx + dy*dy
+                st = self.start[pn]; ct = self.count[pn]
+                inside = (st <= pb) & (pb < st + ct)
+                far = (ct == 1) | (self.size2[pn] < th2 * r2)
+                use = far & ~inside
+                w = G * self.mass[pn[use]] / ((r2[use] + eps2) ** 1.5)
+                rows = pb[use] - s
+                acc_s[s:e, 0] += np.bincount(rows, w * dx[use], minlength=e - s)
+                acc_s[s:e, 1] += np.bincount(rows, w * dy[use], minlength=e - s)
+                # open every node we could not approximate (self-leaves drop out)
+                op = ~far | (inside & (ct > 1))
+                nc = self.n_child[pn[op]]
+                tot = int(nc.sum())
+                rank = np.arange(tot) - np.repeat(np.cumsum(nc) - nc, nc)
+                pn = np.repeat(self.first_child[pn[op]], nc) + rank
+                pb = np.repeat(pb[op], nc)
+        out[self.order] = acc_s
+        return out
+
+
+def bh_accel(pos, mass, G, softening, theta, out=None):
+    """Barnes–Hut approximation of nbody_accel with opening angle theta."""
+    n = len(mass)
+    acc = np.empty((n, 2)) if out is None else out
+    if n == 0: return acc
+    return QuadTree(pos, mass).accel(G, softening, theta, acc)
+
+
+def nbody_energy(pos, vel, mass, G, softening):
+    """Kinetic + softened potential energy, consistent with nbody_accel.
+
+    Above ENERGY_MAX_PAIRS pair terms the potential is estimated from every
+    stride-th row (the same rows each call, so drift readouts stay meaningful).
+    """
+    n = len(mass)
+    ke = 0.5 * float(np.dot(mass, (vel*vel).sum(axis=1)))
+    if n < 2: return ke
+    x = pos[:, 0]; y = pos[:, 1]
+    eps2 = softening * softening
+    stride = max(1, -(-n * n // ENERGY_MAX_PAIRS))
+    rows = max(1, NBODY_CHUNK_ELEMS // n)
+    pair = 0.0
+    for s in range(0, n, rows * stride):
+        sl = slice(s, min(s + rows * stride, n), stride)
+        dx = x[None, :] - x[sl, None]
+        dy = y[None, :] - y[sl, None]
+        w = dx*dx; w += dy*dy; w += eps2
+        pair += float(mass[sl] @ (1.0 / np.sqrt(w)) @ mass)
+    pair *= n / len(range(0, n, stride))
+    # every pair counted twice, plus the softened self terms m_i²/eps
+    pair -= float(np.dot(mass, mass)) / math.sqrt(eps2)
+    return ke - 0.5 * G * pair
+
+
+def nbody_angmom(pos, vel, mass):
+    return float(np.dot(mass, pos[:, 0]*vel[:, 1] - pos[:, 1]*vel[:, 0]))
+
+
+# Dormand–Prince 5(4) tableau
+_DP_C = (0.0, 1/5, 3/10, 4/5, 8/9, 1.0, 1.0)
+_DP_A = (
+    (),
+    (1/5,),
+    (3/40, 9/40),
+    (44/45, -56/15, 32/9),
+    (19372/6561, -25360/2187, 64448/6561, -212/729),
+    (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+    (35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84),
+)
+_DP_B  = (35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84, 0.0)
+_DP_E  = (71/57600, 0.0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40)   # b5 - b4
+
+
+# ── Multi-process direct summation ───────────────────────────────
+PARALLEL_MIN_N = 2000          # below this the single-process kernel wins
+PARALLEL_TILES_PER_WORKER = 4  # row tiles handed to each worker per step
+
+
+def _shm_release(shm):
+    try:
+        shm.close()
+    except BufferError:
+        pass            # a numpy view is still alive; the mapping goes with the process
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+_worker_shm = {}   # worker side: block name -> attached SharedMemory, reused across steps
+
+
+def _worker_view(name, shape, dtype=np.float64):
+    shm = _worker_shm.get(name)
+    if shm is None:
+        from multiprocessing import shared_memory
+        shm = _worker_shm[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _worker_tile(args):
+    pos_name, mass_name, acc_name, n, G, softening, lo, hi = args
+    # forget blocks the parent has since replaced (store growth)
+    for name in [k for k in _worker_shm if k not in (pos_name, mass_name, acc_name)]:
+        try: _worker_shm.pop(name).close()
+        except BufferError: pass
+    pos  = _worker_view(pos_name, (n, 2))
+    mass = _worker_view(mass_name, (n,))
+    acc  = _worker_view(acc_name, (n, 2))
+    nbody_accel(pos, mass, G, softening, out=acc, lo=lo, hi=hi)
+
+
+class ParallelForce:
+    """Persistent process pool running nbody_accel over shared-memory row tiles.
+
+    Workers are spawned on first use and reused every step; only block names
+    and row ranges cross the process boundary, results land in shared memory.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.scratch = None   # shared buffers for inputs/outputs that are not store rows
+
+    def _scratch(self, n):
+        if self.scratch is None: self.scratch = NBodyArrays(n, shared=True)
+        self.scratch._reserve(n)
+        return self.scratch
+
+    def accel(self, store, pos, mass, G, softening, out=None):
+        n = len(mass)
+        if self.pool is None:
+            import multiprocessing as mp
+            self.pool = mp.get_context("spawn").Pool(self.workers)
+        names = []
+        for arr, col in ((pos, "pos"), (mass, "mass")):
+            if np.may_share_memory(arr, getattr(store, col)):
+                names.append(store.shm_name(col))
+            else:
+                sc = self._scratch(n); getattr(sc, col)[:n] = arr
+                names.append(sc.shm_name(col))
+        in_store = out is not None and np.may_share_memory(out, store.acc)
+        names.append(store.shm_name("acc") if in_store else self._scratch(n).shm_name("acc"))
+        edges = np.linspace(0, n, self.workers * PARALLEL_TILES_PER_WORKER + 1).astype(int)
+        tiles = [(*names, n, G, softening, int(lo), int(hi))
+                 for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo]
+        self.pool.map(_worker_tile, tiles, chunksize=1)
+        if in_store: return out
+        res = self.scratch.acc[:n]
+        if out is None: return res.copy()
+        out[...] = res
+        return out
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate(); self.pool.join(); self.pool = None
+        if self.scratch is not None:
+            self.scratch.release(); self.scratch = None
+
+
+class NBodyArrays:
+    """Structure-of-arrays body storage; rows [0, n) are live.
+
+    A shared store keeps every column in a multiprocessing SharedMemory block
+    so worker processes can map the same rows without pickling.
+    """
+    COLUMNS = ("pos", "vel", "acc", "prev", "mass", "color_idx")
+
+    def __init__(self, capacity=16, shared=False):
+        self.n = 0
+        self.shared = shared
+        self._shm = {}      # column -> SharedMemory (shared stores only)
+        self.pos  = self._alloc("pos",  (capacity, 2))
+        self.vel  = self._alloc("vel",  (capacity, 2))
+        self.acc  = self._alloc("acc",  (capacity, 2))
+        self.prev = self._alloc("prev", (capacity, 2))   # pos before the last step (render lerp)
+        self.mass = self._alloc("mass", (capacity,))
+        self.color_idx = self._alloc("color_idx", (capacity,), np.int32)
+        self.trails = None  # TrailBank kept row-aligned by the owning PhysicsState
+
+    @property
+    def capacity(self): return len(self.mass)
+
+    def _alloc(self, name, shape, dtype=np.float64):
+        if not self.shared: return np.zeros(shape, dtype=dtype)
+        from multiprocessing import shared_memory
+        nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        old = self._shm.get(name)
+        self._shm[name] = shm
+        a = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        a[...] = 0
+        if old is not None: _shm_release(old)
+        return a
+
+    def shm_name(self, name): return self._shm[name].name
+
+    def _realloc(self, cap):
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            keep = old[:self.n].copy()
+            setattr(self, name, None); del old       # drop our view before the block goes
+            new = self._alloc(name, (cap,) + keep.shape[1:], keep.dtype)
+            new[:self.n] = keep
+            setattr(self, name, new)
+
+    def _reserve(self, need):
+        if need <= self.capacity: return
+        self._realloc(max(need, self.capacity * 2))
+
+    def set_shared(self, shared):
+        if shared == self.shared: return
+        blocks = self._shm; self._shm = {}
+        self.shared = shared
+        self._realloc(self.capacity)
+        for shm in blocks.values(): _shm_release(shm)
+
+    def release(self):
+        for name in self.COLUMNS:
+            a = getattr(self, name)
+            setattr(self, name, np.zeros((0,) + a.shape[1:], dtype=a.dtype))
+        del a
+        for shm in self._shm.values(): _shm_release(shm)
+        self._shm = {}
+        self.n = 0
+
+    def append(self, x, y, vx, vy, mass, color_idx=0):
+        self._reserve(self.n + 1)
+        i = self.n
+        self.pos[i] = self.prev[i] = (x, y); self.vel[i] = (vx, vy); self.acc[i] = 0.0
+        self.mass[i] = mass;  self.color_idx[i] = color_idx
+        self.n += 1
+        return i
+
+    def remove(self, i):
+        n = self.n
+        for name in self.COLUMNS:
+            a = getattr(self, name)
+            a[i:n-1] = a[i+1:n]
+        self.n -= 1
+
+    def compact(self, keep):
+        """Drop rows [0, n) where keep is False, preserving order."""
+        k = int(keep.sum())
+        for name in self.COLUMNS:
+            a = getattr(self, name)
+            a[:k] = a[:self.n][keep]
+        self.n = k
+
+    def clear(self): self.n = 0
+
+
+class TrailBank:
+    """Trail history for every body as one mirrored ring buffer.
+
+    pts has shape (rows, 2*cap, 2): each sample is written at head and
+    head+cap, so the newest k points of any row are always the contiguous
+    slice [head+cap-k, head+cap) and view() never copies.
+    """
+    def __init__(self, cap):
+        self.cap   = cap
+        self.head  = 0
+        self.pts   = np.zeros((0, 2*cap, 2), dtype=np.float32)
+        self.count = np.zeros(0, dtype=np.int32)
+
+    def _rows(self, need):
+        if need <= len(self.count): return
+        rows = max(need, 2 * len(self.count), 8)
+        pts = np.zeros((rows, 2*self.cap, 2), dtype=np.float32)
+        pts[:len(self.count)] = self.pts
+        count = np.zeros(rows, dtype=np.int32)
+        count[:len(self.count)] = self.count
+        self.pts, self.count = pts, count
+
+    def reset_row(self, i):
+        self._rows(i + 1)
+        self.count[i] = 0
+
+    def remove(self, i, n):
+        self.pts[i:n-1] = self.pts[i+1:n]
+        self.count[i:n-1] = self.count[i+1:n]
+
+    def compact(self, keep):
+        rows = min(len(keep), len(self.count))
+        if not rows: return
+        k = int(keep[:rows].sum())
+        self.pts[:k] = self.pts[:rows][keep[:rows]]
+        self.count[:k] = self.count[:rows][keep[:rows]]
+        self.count[k:rows] = 0
+
+    def clear(self):
+        self.count[:] = 0
+
+    def release(self):
+        self.pts = np.zeros((0, 2*self.cap, 2), dtype=np.float32)
+        self.count = np.zeros(0, dtype=np.int32)
+
+    def push(self, pts):
+        """Append one sample per row for rows [0, len(pts)) — O(1) per body."""
+        n = len(pts)
+        self._rows(n)
+        h, cap = self.head, self.cap
+        self.pts[:n, h] = pts
+        self.pts[:n, h + cap] = pts
+        self.head = (h + 1) % cap
+        np.minimum(self.count[:n] + 1, cap, out=self.count[:n])
+
+    def view(self, i):
+        if i >= len(self.count): return self.pts[:0, 0]
+        e = self.head + self.cap
+        return self.pts[i, e - self.count[i]:e]
+
+    def resize(self, cap):
+        """Change capacity, keeping the newest min(old, new) points per row."""
+        if cap == self.cap: return
+        old = self.pts[:, self.head:self.head + self.cap]     # oldest -> newest
+        k = min(cap, self.cap)
+        pts = np.zeros((len(self.count), 2*cap, 2), dtype=np.float32)
+        pts[:, :k] = old[:, self.cap - k:]
+        pts[:, cap:cap + k] = old[:, self.cap - k:]
+        self.pts, self.cap, self.head = pts, cap, k % cap
+        np.minimum(self.count, cap, out=self.count)
+
+
+def _row_attr(name, col=None):
+    if col is None:
+        def get(self): return float(getattr(self.store, name)[self.i])
+        def put(self, v): getattr(self.store, name)[self.i] = v
+    else:
+        def get(self): return float(getattr(self.store, name)[self.i, col])
+        def put(self, v): getattr(self.store, name)[self.i, col] = v
+    return property(get, put)
+
+
+class Body:
+    """View onto one row of an NBodyArrays store.
+
+    A Body built on its own owns a one-row store until PhysicsState adopts it.
+    """
+    __slots__ = ("store", "i")
+
+    def __init__(self, x, y, vx, vy, mass, color_idx=0):
+        self.store = NBodyArrays(1)
+        self.i = self.store.append(float(x), float(y), float(vx), float(vy),
+                                   float(mass), color_idx % len(BODY_COLORS))
+
+    @classmethod
+    def view(cls, store, i):
+        b = cls.__new__(cls); b.store = store; b.i = i
+        return b
+
+    x    = _row_attr("pos", 0);  y  = _row_attr("pos", 1)
+    vx   = _row_attr("vel", 0);  vy = _row_attr("vel", 1)
+    ax   = _row_attr("acc", 0);  ay = _row_attr("acc", 1)
+    mass = _row_attr("mass")
+
+    @property
+    def color_idx(self): return int(self.store.color_idx[self.i])
+
+    @property
+    def trail(self):
+        """Ordered (k,2) view of this body's trail, oldest first (no copy)."""
+        bank = self.store.trails
+        return bank.view(self.i) if bank is not None else np.zeros((0, 2))
+
+    def color(self):
+        return BODY_COLORS[self.color_idx]
+
+
+class BodyList:
+    """Sequence of Body views over rows [0, n) of a store. Views are made on
+    access, so a million-body scene doesn't hold a million Python objects."""
+    def __init__(self, store): self.store = store
+
+    def __len__(self): return self.store.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self): raise IndexError(i)
+        return Body.view(self.store, i)
+
+    def __iter__(self):
+        return (Body.view(self.store, i) for i in range(len(self)))
+
+
+class PhysicsState:
+    def __init__(self, clock=time.time):
+        self.clock      = clock   # wall-clock source for log stamps and telemetry throttling
+        self.sim_mode   = SIM_MODE_NBODY
+        self.paused     = False
+        self.time_step  = 0.5
+        self.G          = 500.0
+        self.softening  = 8.0
+        self.engine     = NBODY_ENGINE_DIRECT
+        self.bh_theta   = 0.5
+        self.integrator = INTEG_EULER
+        self.parallel   = False  # multi-process direct summation for big scenes
+        self.pforce     = None
+        self._atexit    = False  # shutdown() registered with atexit (once per state)
+        self.rk_tol     = 1e-6
+        self.rk_h       = None   # last accepted RK45 sub-step (carried between frames)
+        self.rk_substeps = 0
+        self.rk_limited = 0      # consecutive RK45 steps that hit RK45_MAX_SUBSTEPS
+        self.scene_version = 0   # bumped whenever bodies are added/removed/replaced
+        self._acc_key   = None   # (scene_version, G, softening, engine, theta) acc was computed for
+        # energy / angular-momentum telemetry
+        self.energy = self.energy0 = 0.0
+        self.angmom = self.angmom0 = 0.0
+        self._telemetry_key = None   # (scene_version, G, softening) the drift baseline is for
+        self._telemetry_state = None # (elapsed, ...) energy/angmom were last computed at
+        self._telemetry_t   = 0.0
+        self.trail_len  = 300
+        self.show_trail = True
+        self.show_force_vectors = False
+        self.show_velocity_vectors = False
+        self.star_density = STAR_DENSITY
+        self.elapsed    = 0.0
+        self.draw_alpha = 1.0    # fixed-step interpolation factor for rendering
+        self.recorder   = None   # TrajectoryRecorder fed every N-body step
+        self.collisions = COLLIDE_OFF
+        self.merged     = 0      # bodies absorbed by merges since the scene was set
+        self.log        = EventLog(clock=clock)
+
+        # Projectile
+        self.proj_gravity  = 200.0
+        self.proj_angle    = 45.0
+        self.proj_speed    = 300.0
+        self.proj_x0       = 60.0
+        self.proj_y0       = GAME_H - 60.0
+        self.proj_running  = False
+        self.proj_t        = 0.0
+        self.proj_traj     = None          # DragTrajectory of the shot in flight
+        self._preview      = None          # (settings, DragTrajectory) for the dashed preview
+        self.proj_air_resist = 0.0
+        self.proj_vx       = 0.0
+        self.proj_vy       = 0.0
+        self.proj_x        = 0.0
+        self.proj_y        = 0.0
+        self.proj_prev     = (0.0, 0.0)
+        self.proj_landed   = False
+        self.proj_range    = 0.0
+        # angle x speed sweep at the current drag/gravity
+        self.sweep         = None          # SweepResult
+        self.sweep_n       = [90, 100]     # angle, speed samples
+        self.sweep_speed   = [50.0, 800.0]
+        self.sweep_metric  = 0             # sim.sweep.SWEEP_METRIC_RANGE (sweep loads on first run)
+        self.show_sweep    = True
+        self.proj_best     = None          # (angle, range) for the current shot settings
+
+        self.store = NBodyArrays()
+        self.trails = self.store.trails = TrailBank(self.trail_len)
+        self.bodies = BodyList(self.store)
+        self._preset_solar()
+
+    def _adopt(self, b):
+        # move a Body's row into our store and repoint the view at it
+        b.i = self.store.append(b.x, b.y, b.vx, b.vy, b.mass, b.color_idx)
+        b.store = self.store
+        if self.store.n <= TRAIL_MAX_BODIES: self.trails.reset_row(b.i)
+        return b
+
+    def _set_bodies(self, bodies):
+        self.store.clear()
+        for b in bodies: self._adopt(b)
+        self.scene_version += 1; self.merged = 0
+
+    def set_arrays(self, pos, vel, mass, color_idx, trail_count=None, trail_pts=None):
+        """Replace the scene with whole columns; trail_pts is (n, cap, 2), oldest first."""
+        st = self.store; n = len(mass)
+        st.clear(); st._reserve(n)
+        st.pos[:n] = st.prev[:n] = pos; st.vel[:n] = vel; st.acc[:n] = 0.0
+        st.mass[:n] = mass; st.color_idx[:n] = np.asarray(color_idx) % len(BODY_COLORS)
+        st.n = n
+        if trail_pts is not None and n <= TRAIL_MAX_BODIES:
+            cap = trail_pts.shape[1]
+            tb = self.trails = st.trails = TrailBank(cap)
+            tb.pts = np.zeros((n, 2*cap, 2), dtype=np.float32)
+            tb.pts[:, :cap] = tb.pts[:, cap:] = trail_pts     # head 0: row ends at cap
+            tb.count = np.array(trail_count, dtype=np.int32)
+            self.trail_len = cap
+        elif n > TRAIL_MAX_BODIES:
+            self.trails.release()
+        else:
+            self.trails._rows(n); self.trails.count[:n] = 0
+        if n > BH_AUTO_N:
+            # a step this size can take seconds: open it paused, on the O(n log n) engine
+            self.engine = NBODY_ENGINE_BH; self.paused = True
+            self.log.add(EV_INFO, "{} bodies: Barnes-Hut, paused", n)
+        self.scene_version += 1; self.merged = 0
+
+    def save_scene(self, path):
+        from .scene import write_scene
+        st = self.store; n = st.n
+        tc = tp = None
+        if n and len(self.trails.count) >= n:
+            tb = self.trails
+            tc, tp = tb.count[:n], tb.pts[:n, tb.head:tb.head + tb.cap]
+        write_scene(path, st.pos[:n], st.vel[:n], st.mass[:n], st.color_idx[:n],
+                    self.G, self.softening, self.time_step, self.elapsed, tc, tp)
+        self.log.add(EV_SCENE, "Scene saved: {} ({} bodies)", os.path.basename(path), n)
+
+    def load_scene(self, path):
+        from .scene import SceneFile
+        sf = SceneFile(path)
+        t0 = time.perf_counter()
+        self.set_arrays(np.stack([sf.x, sf.y], -1), np.stack([sf.vx, sf.vy], -1), sf.mass, sf.color,
+                        *((sf.trail_count, sf.trail_pts) if sf.has_trails else ()))
+        self.G, self.softening, self.time_step, self.elapsed = sf.G, sf.softening, sf.time_step, sf.elapsed
+        self.log.add(EV_SCENE, "Scene loaded: {} ({} bodies, {:.0f} ms)",
+                     os.path.basename(path), sf.n, (time.perf_counter() - t0)*1000)
+
+    def generate(self, kind, n, seed=None):
+        """Procedural scene by index into sim.scene.GENERATORS."""
+        from .scene import gen_disk, gen_plummer, gen_galaxies
+        cx, cy = GAME_W/2, GAME_H/2
+        if kind == 0:   cols = gen_disk(n, cx, cy, 300.0, self.G, self.softening, seed=seed)
+        elif kind == 1: cols = gen_plummer(n, cx, cy, 60.0, self.G, seed=seed)
+        else:           cols = gen_galaxies(n, cx, cy, 160.0, self.G, self.softening, seed=seed)
+        self.set_arrays(*cols)
+        self.elapsed = 0.0
+        self.log.add(EV_SCENE, "Generated {} bodies", n)
+
+    def _preset_solar(self):
+        cx, cy = GAME_W/2, GAME_H/2
+        self._set_bodies([
+            Body(cx,   cy,   0,      0,      8000, 0),   # central star
+            Body(cx+160, cy, 0,    -56,       30, 1),   # planet 1
+            Body(cx-250, cy, 0,     45,       20, 2),   # planet 2
+            Body(cx+370, cy, 0,    -37,       15, 3),   # planet 3
+            Body(cx,  cy-120, 52,    0,        8, 4),   # moon-ish
+        ])
+        self.log.add(EV_SCENE, "Preset: Solar System loaded")
+
+    def _preset_figure8(self):
+        # Classic figure-8 three-body
+        cx, cy = GAME_W/2, GAME_H/2
+        s = 120
+        self._set_bodies([
+            Body(cx - s*0.97,  cy - s*0.24,  93*0.4,  27*0.4,  200, 0),
+            Body(cx + s*0.97,  cy + s*0.24, -93*0.4, -27*0.4,  200, 1),
+            Body(cx,           cy,             0,       0,      200, 2),
+        ])
+        self.log.add(EV_SCENE, "Preset: Figure-8 orbit loaded")
+
+    def _preset_binary(self):
+        cx, cy = GAME_W/2, GAME_H/2
+        self._set_bodies([
+            Body(cx-100, cy,  0, -40, 2000, 0),
+            Body(cx+100, cy,  0,  40, 2000, 1),
+            Body(cx, cy-200, 65,   0,   50, 2),
+            Body(cx, cy+200,-65,   0,   50, 3),
+        ])
+        self.log.add(EV_SCENE, "Preset: Binary star + planets loaded")
+
+    def add_body(self, x, y, vx, vy, mass):
+        idx = len(self.bodies) % len(BODY_COLORS)
+        self._adopt(Body(x, y, vx, vy, mass, idx))
+        self.scene_version += 1
+        self.log.add(EV_SCENE, "Body added at ({:.0f},{:.0f}) m={:.0f}", x, y, mass)
+
+    def remove_body(self, i):
+        if 0 <= i < len(self.bodies):
+            self.trails.remove(i, self.store.n)
+            self.store.remove(i)
+            self.scene_version += 1
+            self.log.add(EV_SCENE, "Body {} removed", i)
+
+    def reset_trails(self):
+        self.trails.clear()
+
+    def _parallel_active(self):
+        return (self.parallel and self.engine == NBODY_ENGINE_DIRECT
+                and self.store.n >= PARALLEL_MIN_N)
+
+    def _accel(self, pos, mass, out=None):
+        if self.engine == NBODY_ENGINE_BH:
+            return bh_accel(pos, mass, self.G, self.softening, self.bh_theta, out)
+        if self._parallel_active() and self.store.shared:
+            if self.pforce is None:
+                self.pforce = ParallelForce()
+                if not self._atexit:
+                    atexit.register(self.shutdown); self._atexit = True
+                self.log.add(EV_INFO, "Parallel: started {} workers", self.pforce.workers)
+            return self.pforce.accel(self.store, pos, mass, self.G, self.softening, out)
+        return nbody_accel(pos, mass, self.G, self.softening, out)
+
+    def start_recording(self, path, compress=False):
+        from .recorder import TrajectoryRecorder      # writer thread and zlib only when recording
+        self.stop_recording()
+        self.recorder = TrajectoryRecorder(path, compress)
+        self.log.add(EV_INFO, "Recording to {}{}", os.path.basename(path), " (zlib)" if compress else "")
+
+    def stop_recording(self):
+        rec, self.recorder = self.recorder, None
+        if rec is None: return
+        rec.close()
+        self.log.add(EV_ALERT if rec.error else EV_INFO, "Recording stopped: {} steps, {:.1f} MB{}{}",
+                     rec.steps, rec.bytes / 2**20, f", {rec.dropped} dropped" if rec.dropped else "",
+                     f", error: {rec.error}" if rec.error else "")
+
+    def shutdown(self):
+        self.stop_recording()
+        if self.pforce is not None:
+            self.pforce.close(); self.pforce = None
+        self.store.set_shared(False)
+
+    def step(self, dt):
+        """Advance whichever simulation is active by dt seconds."""
+        if self.sim_mode == SIM_MODE_NBODY: self.update_nbody(dt)
+        else: self.update_projectile(dt)
+
+    def update_nbody(self, dt):
+        if self.paused or not self.bodies: return
+        real_dt = dt * self.time_step
+        st = self.store; n = st.n
+        # move the columns into shared memory before taking any views of them
+        if self._parallel_active(): st.set_shared(True)
+        pos, vel, acc = st.pos[:n], st.vel[:n], st.acc[:n]
+        st.prev[:n] = pos
+        if self.integrator == INTEG_LEAPFROG:
+            self._kdk(real_dt)
+        elif self.integrator == INTEG_YOSHIDA4:
+            for w in YOSHIDA_W: self._kdk(w * real_dt)
+        elif self.integrator == INTEG_RK45:
+            real_dt = self._rk45(real_dt)        # less than asked if the step limit was hit
+        else:
+            # Semi-implicit Euler: acc is left at the pre-step positions
+            self._accel(pos, st.mass[:n], out=acc)
+            vel += acc * real_dt
+            pos += vel * real_dt
+            self._acc_key = None
+        self.elapsed += real_dt
+        if self.collisions != COLLIDE_OFF: self._collide()
+        if self.recorder is not None: self.recorder.push(self)
+
+    def _collide(self):
+        from .collide import body_radius, find_contacts, merge, bounce
+        st = self.store; n = st.n
+        pos, vel, mass = st.pos[:n], st.vel[:n], st.mass[:n]
+        radius = body_radius(mass)
+        i, j = find_contacts(pos, radius)
+        if not len(i): return
+        if self.collisions == COLLIDE_BOUNCE:
+            bounce(pos, vel, mass, radius, i, j)
+            self._acc_key = None
+            return
+        keep = merge(pos, vel, mass, st.color_idx[:n], i, j)
+        st.compact(keep); self.trails.compact(keep)
+        self.merged += n - st.n
+        self.scene_version += 1
+        self.log.add(EV_SCENE, "Merged {} bodies ({} contacts), {} left", n - st.n, len(i), st.n)
+
+    def _acc_params(self):
+        return (self.scene_version, self.G, self.softening, self.engine, self.bh_theta)
+
+    def _kdk(self, h):
+        st = self.store; n = st.n
+        pos, vel, acc, mass = st.pos[:n], st.vel[:n], st.acc[:n], st.mass[:n]
+        if self._acc_key != self._acc_params():
+            self._accel(pos, mass, out=acc)
+        vel += (0.5 * h) * acc
+        pos += h * vel
+        self._accel(pos, mass, out=acc)
+        vel += (0.5 * h) * acc
+        self._acc_key = self._acc_params()
+
+    def _rk45(self, h_total):
+        """Dormand–Prince over h_total with an error-controlled inner step.
+        Returns the (signed) time actually integrated, short of h_total when
+        RK45_MAX_SUBSTEPS runs out before the error estimate allows it."""
+        st = self.store; n = st.n
+        pos, vel, mass = st.pos[:n], st.vel[:n], st.mass[:n]
+        y = np.concatenate([pos, vel])            # (2n, 2): positions then velocities
+        def f(yv):
+            return np.concatenate([yv[n:], self._accel(yv[:n], mass)])
+        t, sign = 0.0, (1.0 if h_total >= 0 else -1.0)
+        h = min(abs(self.rk_h or h_total), abs(h_total))
+        k1 = f(y)
+        steps = 0
+        while t < abs(h_total) and steps < RK45_MAX_SUBSTEPS:
+            h = min(h, abs(h_total) - t)
+            hs = sign * h
+            ks = [k1]
+            for a_row, c in zip(_DP_A[1:], _DP_C[1:]):
+                yi = y + hs * sum(a * k for a, k in zip(a_row, ks) if a)
+                ks.append(f(yi))
+            y5 = y + hs * sum(b * k for b, k in zip(_DP_B, ks) if b)
+            err = hs * sum(e * k for e, k in zip(_DP_E, ks) if e)
+            scale = 1e-9 + self.rk_tol * np.maximum(np.abs(y), np.abs(y5))
+            ratio = float(np.max(np.abs(err) / scale))
+            steps += 1
+            if ratio <= 1.0 or h <= 1e-12 * abs(h_total):
+                t += h; y = y5; k1 = ks[-1]       # FSAL: last stage is f(y5)
+            fac = 0.9 * ratio ** -0.2 if ratio > 0 else 5.0
+            h *= min(5.0, max(0.2, fac))
+        # log entering and leaving the limited state, not every physics step
+        if t < abs(h_total):
+            if not self.rk_limited:
+                self.log.add(EV_ALERT, "RK45: step limit hit ({}), tol too tight, sim time lagging",
+                             RK45_MAX_SUBSTEPS)
+            self.rk_limited += 1
+        elif self.rk_limited:
+            self.log.add(EV_INFO, "RK45: back within step limit after {} limited steps", self.rk_limited)
+            self.rk_limited = 0
+        self.rk_h = h
+        self.rk_substeps = steps
+        pos[:] = y[:n]; vel[:] = y[n:]
+        st.acc[:n] = k1[n:]
+        self._acc_key = self._acc_params()
+        return sign * t
+
+    def update_telemetry(self, force=False):
+        """Refresh total energy / angular momentum and their drift baseline.
+        Skipped when nothing has moved since the last refresh (e.g. paused)."""
+        now = self.clock()
+        if not force and now - self._telemetry_t < TELEMETRY_PERIOD: return
+        self._telemetry_t = now
+        state = (self.elapsed, self.scene_version, self.G, self.softening)
+        if state == self._telemetry_state: return
+        self._telemetry_state = state
+        st = self.store; n = st.n
+        pos, vel, mass = st.pos[:n], st.vel[:n], st.mass[:n]
+        self.energy = nbody_energy(pos, vel, mass, self.G, self.softening)
+        self.angmom = nbody_angmom(pos, vel, mass)
+        key = (self.scene_version, self.G, self.softening)
+        if key != self._telemetry_key:
+            self._telemetry_key = key
+            self.energy0, self.angmom0 = self.energy, self.angmom
+
+    def reset_drift_baseline(self):
+        """Measure drift from the current state from now on."""
+        self._telemetry_key = self._telemetry_state = None
+        self.update_telemetry(force=True)
+
+    def energy_drift(self):
+        return (self.energy - self.energy0) / abs(self.energy0) if self.energy0 else 0.0
+
+    def angmom_drift(self):
+        return (self.angmom - self.angmom0) / abs(self.angmom0) if self.angmom0 else 0.0
+
+    def sample_trails(self):
+        # once per rendered frame, so trail length stays in frames whatever the physics rate
+        if self.paused or not self.show_trail: return
+        if self.store.n > TRAIL_MAX_BODIES:
+            if len(self.trails.count): self.trails.release()
+            return
+        self.trails.resize(self.trail_len)
+        self.trails.push(self.render_pos())
+
+    def render_pos(self):
+        """Body positions blended between the last two physics steps."""
+        st = self.store; n = st.n
+        if self.paused or self.draw_alpha >= 1.0: return st.pos[:n]
+        return st.prev[:n] + self.draw_alpha * (st.pos[:n] - st.prev[:n])
+
+    def proj_render_pos(self):
+        if not self.proj_running or self.paused: return (self.proj_x, self.proj_y)
+        (px, py), a = self.proj_prev, self.draw_alpha
+        return (px + a*(self.proj_x-px), py + a*(self.proj_y-py))
+
+    def launch_projectile(self):
+        rad = math.radians(self.proj_angle)
+        self.proj_vx  = self.proj_speed * math.cos(rad)
+        self.proj_vy  = -self.proj_speed * math.sin(rad)   # screen y flipped
+        self.proj_x   = self.proj_x0
+        self.proj_y   = self.proj_y0
+        self.proj_t   = 0.0
+        self.proj_traj = DragTrajectory(self.proj_x0, self.proj_y0, self.proj_vx, self.proj_vy,
+                                        self.proj_gravity, self.proj_air_resist)
+        self.proj_running = True
+        self.proj_landed  = False
+        self.proj_range   = 0.0
+        self.log.add(EV_GAME, "Launch: angle={:.1f}° speed={:.0f}", self.proj_angle, self.proj_speed)
+
+    def run_sweep(self):
+        from .sweep import SweepResult
+        na, ns = self.sweep_n
+        self.sweep = SweepResult(np.linspace(1.0, 89.0, na), np.linspace(*self.sweep_speed, ns),
+                                 self.proj_air_resist, self.proj_gravity)
+        self.log.add(EV_GAME, "Sweep: {} shots in {:.0f} ms", self.sweep.lanes, self.sweep.seconds*1000)
+
+    def find_best_angle(self):
+        from .sweep import best_angle
+        self.proj_best = best_angle(self.proj_speed, self.proj_air_resist, self.proj_gravity)
+        a, r = self.proj_best
+        self.log.add(EV_GAME, "Best angle @ drag {:.2f}: {:.2f}° → {:.1f}px", self.proj_air_resist, a, r)
+
+    def proj_path(self, spacing=2.0):
+        """Flown part of the current shot as screen points, or None."""
+        if self.proj_traj is None: return None
+        return self.proj_traj.path(self.proj_t, spacing, PROJ_PATH_MAX)
+
+    def proj_preview(self):
+        """Trajectory the current launch settings would fly, drag included."""
+        key = (self.proj_x0, self.proj_y0, self.proj_angle, self.proj_speed,
+               self.proj_gravity, self.proj_air_resist)
+        if self._preview is None or self._preview[0] != key:
+            self._preview = (key, DragTrajectory.launch(*key))
+        return self._preview[1]
+
+    def update_projectile(self, dt):
+        # closed-form linear drag (F = -k*v): evaluate the shot at t, no integration
+        if not self.proj_running or self.proj_landed or self.paused: return
+        self.proj_prev = (self.proj_x, self.proj_y)
+        tr = self.proj_traj
+        self.proj_t = min(self.proj_t + dt, tr.t_land)
+        x, y = tr.pos(self.proj_t)
+        vx, vy = drag_velocity(self.proj_t, tr.vx0, tr.vy0, tr.g, tr.k)
+        self.proj_x, self.proj_y, self.proj_vx, self.proj_vy = float(x), float(y), float(vx), float(vy)
+        if self.proj_t >= tr.t_land:
+            self.proj_landed = True
+            self.proj_running = False
+            self.proj_range = tr.range
+            self.log.add(EV_GAME, "Landed! Range={:.1f}px  t={:.2f}s", self.proj_range, self.proj_t)
+        elif self.proj_x > GAME_W + 200 or self.proj_x < -200:
+            self.proj_landed = True; self.proj_running = False
+            self.log.add(EV_GAME, "Projectile left the field.")
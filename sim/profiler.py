@@ -0,0 +1,114 @@
+"""Frame profiler: per-phase timings in preallocated ring buffers.
+
+Phases are named up front; ``with prof.scope("update"):`` reuses one scope
+object per phase, so instrumenting a frame allocates nothing. A phase entered
+more than once in a frame accumulates its time (the trace shows it starting at
+its first entry). ``chrome_trace()`` turns the captured frames into the Chrome
+trace event format for chrome://tracing or Perfetto.
+"""
+import os
+from time import perf_counter_ns
+
+import numpy as np
+
+PROFILE_FRAMES = 600    # frames kept in the ring
+PROFILE_QS     = (50, 95, 99)
+
+
+class _Scope:
+    __slots__ = ("prof", "col", "t0")
+
+    def __init__(self, prof, col):
+        self.prof, self.col, self.t0 = prof, col, 0
+
+    def __enter__(self):
+        self.t0 = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.end()
+        return False
+
+    begin = __enter__      # for spans that don't fit a with-block
+
+    def end(self):
+        t1 = perf_counter_ns()
+        p = self.prof
+        if p.row < 0: return
+        if p.dur[p.row, self.col] == 0:
+            p.start[p.row, self.col] = self.t0 - p.t0[p.row]
+        p.dur[p.row, self.col] += t1 - self.t0
+
+
+class FrameProfiler:
+    def __init__(self, phases, frames=PROFILE_FRAMES):
+        self.phases = list(phases)
+        self.enabled = True
+        self.frames = frames
+        self.t0    = np.zeros(frames, np.int64)                 # frame start, perf_counter_ns
+        self.total = np.zeros(frames, np.int64)                 # frame duration
+        self.start = np.zeros((frames, len(phases)), np.int64)  # phase start, from frame start
+        self.dur   = np.zeros((frames, len(phases)), np.int64)
+        self.vtx   = np.zeros(frames, np.int32)
+        self.idx   = np.zeros(frames, np.int32)
+        self.cmds  = np.zeros(frames, np.int32)
+        self.count = 0        # frames completed
+        self.row   = -1       # row being written, -1 outside a frame
+        self._scopes = {name: _Scope(self, k) for k, name in enumerate(self.phases)}
+
+    def scope(self, name):
+        """Timer for a phase; a no-op outside begin_frame/end_frame or when disabled."""
+        return self._scopes[name]
+
+    def begin_frame(self):
+        if not self.enabled: self.row = -1; return
+        r = self.row = self.count % self.frames
+        self.dur[r] = 0; self.start[r] = 0
+        self.t0[r] = perf_counter_ns()
+
+    def end_frame(self, vtx=0, idx=0, cmds=0):
+        r = self.row
+        if r < 0: return
+        self.total[r] = perf_counter_ns() - self.t0[r]
+        self.vtx[r], self.idx[r], self.cmds[r] = vtx, idx, cmds
+        self.count += 1; self.row = -1
+
+    def clear(self):
+        self.count = 0; self.row = -1
+
+    # ── readout ───────────────────────────────────────────────────
+    def _order(self):
+        n = min(self.count, self.frames)
+        return (np.arange(self.count - n, self.count) % self.frames)
+
+    def series(self, name=None, of=None):
+        """Oldest → newest float32 ms of a phase (or of the whole frame), or of
+        another per-frame column when ``of`` is given (e.g. self.vtx)."""
+        o = self._order()
+        if of is not None: return of[o].astype(np.float32)
+        a = self.total[o] if name is None else self.dur[o, self.phases.index(name)]
+        return (a / 1e6).astype(np.float32)
+
+    def percentiles(self, name=None, qs=PROFILE_QS):
+        s = self.series(name)
+        return np.percentile(s, qs) if len(s) else np.zeros(len(qs))
+
+    def chrome_trace(self):
+        """Captured frames as a Chrome trace dict (timestamps in µs)."""
+        ev = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "frame profiler"}}]
+        for r in self._order().tolist():
+            ts = self.t0[r] / 1e3
+            ev.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1, "ts": ts, "dur": self.total[r] / 1e3})
+            for k, name in enumerate(self.phases):
+                if self.dur[r, k]:
+                    ev.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                               "ts": ts + self.start[r, k] / 1e3, "dur": self.dur[r, k] / 1e3})
+            ev.append({"name": "draw list", "ph": "C", "pid": 1, "ts": ts,
+                       "args": {"vertices": int(self.vtx[r]), "indices": int(self.idx[r]),
+                                "commands": int(self.cmds[r])}})
+        return {"traceEvents": ev, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path):
+        import json
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f: json.dump(self.chrome_trace(), f)
@@ -0,0 +1,234 @@
+"""Streaming N-body trajectory recorder.
+
+``TrajectoryRecorder.push(ps)`` copies one step into a chunk buffer on the
+simulation thread; full chunks go through a bounded queue to a writer thread
+that appends them to disk (optionally zlib-compressed) and computes
+energy/momentum summaries. If the writer falls behind, chunks are dropped and
+counted rather than stalling the frame; the step numbers leave a visible gap.
+
+File layout (little-endian, append-only)::
+
+    header  "NBTR" u8 version
+    blocks  "<4s B 3x I I Q Q": kind, codec, n, steps, step0, payload bytes
+            kind STAT  payload u64 sizes[4], then t f64[steps],
+                       pos f64[steps, n, 2], vel f64[steps, n, 2], mass f64[n]
+                       (each column zlib-compressed on its own with CODEC_ZLIB)
+            kind SUMM  payload rows of SUMMARY_DTYPE, always raw
+            payloads are zero-padded to 8 bytes
+
+``TrajectoryFile`` memory-maps a recording and indexes the block headers, so
+any step range can be read without loading the rest; a truncated tail (the
+app died mid-write) is ignored. ``python -m sim.recorder FILE`` prints one.
+"""
+import queue
+import struct
+import sys
+import threading
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+TRACE_MAGIC   = b"NBTR"
+TRACE_VERSION = 1
+_HEADER = struct.Struct("<4sB")
+_BLOCK  = struct.Struct("<4sB3xIIQQ")
+_SIZES  = struct.Struct("<4Q")
+BLOCK_STATES  = b"STAT"
+BLOCK_SUMMARY = b"SUMM"
+CODEC_RAW  = 0
+CODEC_ZLIB = 1
+SUMMARY_DTYPE = np.dtype([("step", "<u8"), ("t", "<f8"), ("energy", "<f8"), ("angmom", "<f8")])
+
+RECORD_CHUNK_STEPS = 256       # steps per block at most
+RECORD_CHUNK_BYTES = 8 << 20   # ...and fewer for big scenes, to bound each block
+RECORD_QUEUE       = 8         # blocks in flight before new ones are dropped
+RECORD_SUMMARY_EVERY = 64      # steps between energy/momentum summaries
+RECORD_ZLIB_LEVEL  = 1
+
+
+def _pad8(b):
+    return b + bytes(-len(b) % 8)
+
+
+class TrajectoryRecorder:
+    def __init__(self, path, compress=False, chunk_steps=RECORD_CHUNK_STEPS,
+                 summary_every=RECORD_SUMMARY_EVERY, queue_max=RECORD_QUEUE):
+        self.path = path
+        self.codec = CODEC_ZLIB if compress else CODEC_RAW
+        self.chunk_steps = chunk_steps
+        self.summary_every = summary_every
+        self.steps = 0             # steps pushed, dropped ones included
+        self.dropped = 0           # steps lost because the queue was full
+        self.blocks = 0
+        self.bytes = _HEADER.size
+        self.error = None          # OSError from the writer, recording stops
+        self._buf = None           # (step0, key, t, pos, vel, mass, G, softening)
+        self._k = 0
+        self._f = open(path, "wb")
+        self._f.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION))
+        self.q = queue.Queue(queue_max)
+        self.thread = threading.Thread(target=self._run, name="trajectory-writer", daemon=True)
+        self.thread.start()
+
+    @property
+    def backlog(self): return self.q.qsize()
+
+    # ── simulation thread ─────────────────────────────────────────
+    def push(self, ps):
+        """Record the current state of ps (one step). Never waits on the writer."""
+        if self.error is not None: return
+        st = ps.store; n = st.n
+        key = (ps.scene_version, n, ps.G, ps.softening)
+        if self._buf is not None and self._buf[1] != key: self.flush()
+        if self._buf is None:
+            m = max(1, min(self.chunk_steps, RECORD_CHUNK_BYTES // max(32 * n, 1)))
+            self._buf = (self.steps, key, np.empty(m), np.empty((m, n, 2)), np.empty((m, n, 2)),
+                         st.mass[:n].copy(), ps.G, ps.softening)
+        _, _, t, pos, vel, *_ = self._buf
+        k = self._k
+        t[k] = ps.elapsed; pos[k] = st.pos[:n]; vel[k] = st.vel[:n]
+        self._k += 1; self.steps += 1
+        if self._k == len(t): self.flush()
+
+    def flush(self):
+        """Hand the partial chunk to the writer; the buffers now belong to it."""
+        if self._buf is None or self._k == 0: return
+        step0, _, t, pos, vel, mass, G, soft = self._buf
+        k = self._k
+        self._buf = None; self._k = 0
+        try:
+            self.q.put_nowait((step0, t[:k], pos[:k], vel[:k], mass, G, soft))
+        except queue.Full:
+            self.dropped += k
+
+    def close(self):
+        self.flush()
+        self.q.put(None)
+        self.thread.join()
+        self._f.close()
+
+    # ── writer thread ─────────────────────────────────────────────
+    def _write(self, kind, codec, n, steps, step0, payload):
+        self._f.write(_BLOCK.pack(kind, codec, n, steps, step0, len(payload)))
+        self._f.write(payload)
+        self.bytes += _BLOCK.size + len(payload)
+
+    def _run(self):
+        from .physics import nbody_energy, nbody_angmom
+        while True:
+            item = self.q.get()
+            if item is None: break
+            if self.error is not None: continue
+            step0, t, pos, vel, mass, G, soft = item
+            steps, n = len(t), len(mass)
+            cols = [np.ascontiguousarray(a).tobytes() for a in (t, pos, vel, mass)]
+            if self.codec == CODEC_ZLIB:
+                cols = [zlib.compress(c, RECORD_ZLIB_LEVEL) for c in cols]
+            cols = [_pad8(c) for c in cols]
+            rows = [(step0 + j, t[j], nbody_energy(pos[j], vel[j], mass, G, soft), nbody_angmom(pos[j], vel[j], mass))
+                    for j in range(-step0 % self.summary_every, steps, self.summary_every)]
+            try:
+                self._write(BLOCK_STATES, self.codec, n, steps, step0,
+                            _SIZES.pack(*map(len, cols)) + b"".join(cols))
+                if rows:
+                    self._write(BLOCK_SUMMARY, CODEC_RAW, n, len(rows), step0,
+                                np.array(rows, SUMMARY_DTYPE).tobytes())
+                self._f.flush()
+                self.blocks += 1
+            except OSError as e:
+                self.error = e
+
+
+class TrajectoryFile:
+    """Memory-mapped reader. Steps are numbered as recorded; dropped steps are
+    missing from ``step_ids``. Bodies count may change between blocks."""
+    def __init__(self, path):
+        self.path = path
+        self.mm = np.memmap(path, np.uint8, "r")
+        magic, ver = _HEADER.unpack_from(self.mm, 0)
+        if magic != TRACE_MAGIC or ver != TRACE_VERSION:
+            raise ValueError("not a trajectory recording (or an unsupported version)")
+        self.blocks = []           # (step0, steps, n, codec, payload offset)
+        summaries = []
+        o, size = _HEADER.size, len(self.mm)
+        while o + _BLOCK.size <= size:
+            kind, codec, n, steps, step0, nbytes = _BLOCK.unpack_from(self.mm, o)
+            o += _BLOCK.size
+            if o + nbytes > size: break                    # torn final block
+            if kind == BLOCK_STATES:
+                self.blocks.append((step0, steps, n, codec, o))
+            elif kind == BLOCK_SUMMARY:
+                summaries.append(np.frombuffer(self.mm, SUMMARY_DTYPE, steps, o))
+            o += nbytes
+        self.summaries = np.concatenate(summaries) if summaries else np.zeros(0, SUMMARY_DTYPE)
+        self.starts = np.array([b[0] for b in self.blocks], dtype=np.int64)
+        self._block = lru_cache(maxsize=4)(self._load_block)
+
+    def __len__(self): return sum(b[1] for b in self.blocks)
+
+    @property
+    def step_ids(self):
+        return np.concatenate([np.arange(s, s + k) for s, k, *_ in self.blocks]) if self.blocks else np.zeros(0, np.int64)
+
+    def _load_block(self, bi):
+        """(t, pos, vel, mass) of block bi; views into the map for raw blocks."""
+        step0, steps, n, codec, o = self.blocks[bi]
+        sizes = _SIZES.unpack_from(self.mm, o); o += _SIZES.size
+        shapes = ((steps,), (steps, n, 2), (steps, n, 2), (n,))
+        out = []
+        for nb, shape in zip(sizes, shapes):
+            count = int(np.prod(shape))
+            if codec == CODEC_ZLIB:
+                a = np.frombuffer(zlib.decompress(self.mm[o:o + nb]), "<f8", count)
+            else:
+                a = np.frombuffer(self.mm, "<f8", count, o)
+            out.append(a.reshape(shape)); o += nb
+        return tuple(out)
+
+    def frame(self, step):
+        """(t, pos, vel, mass) at a recorded step number."""
+        bi = int(np.searchsorted(self.starts, step, "right")) - 1
+        if bi < 0 or step >= self.blocks[bi][0] + self.blocks[bi][1]:
+            raise IndexError(f"step {step} was not recorded")
+        t, pos, vel, mass = self._block(bi)
+        j = step - self.blocks[bi][0]
+        return t[j], pos[j], vel[j], mass
+
+    def window(self, lo, hi):
+        """Yield (step0, t, pos, vel, mass) slices covering recorded steps in [lo, hi)."""
+        first = max(int(np.searchsorted(self.starts, lo, "right")) - 1, 0)
+        for bi in range(first, len(self.blocks)):
+            s0, k = self.blocks[bi][:2]
+            if s0 >= hi: break
+            a, b = max(lo - s0, 0), min(hi - s0, k)
+            if a >= b: continue
+            t, pos, vel, mass = self._block(bi)
+            yield s0 + a, t[a:b], pos[a:b], vel[a:b], mass
+
+    def time_window(self, t0, t1):
+        """As window(), selecting by simulated time instead of step number."""
+        for s0, t, pos, vel, mass in self.window(0, 1 << 62):
+            sel = (t >= t0) & (t < t1)
+            if sel.any():
+                a, b = np.flatnonzero(sel)[[0, -1]]
+                yield s0 + a, t[a:b+1], pos[a:b+1], vel[a:b+1], mass
+            elif len(t) and t[0] >= t1:
+                break
+
+
+def main(argv):
+    for path in argv:
+        tf = TrajectoryFile(path)
+        ns = sorted({b[2] for b in tf.blocks})
+        first, last = (tf.blocks[0][0], tf.blocks[-1][0] + tf.blocks[-1][1]) if tf.blocks else (0, 0)
+        print(f"{path}: {len(tf)} steps in {len(tf.blocks)} blocks (steps {first}..{last}, "
+              f"{last - first - len(tf)} dropped)  bodies {ns}  {len(tf.summaries)} summaries")
+        if len(tf.summaries):
+            e = tf.summaries["energy"]
+            print(f"  t {tf.summaries['t'][0]:.2f} → {tf.summaries['t'][-1]:.2f}   "
+                  f"energy drift {(e[-1] - e[0]) / abs(e[0]) if e[0] else 0.0:+.2e}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
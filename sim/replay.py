@@ -0,0 +1,164 @@
+"""Compact Snake replays: the game seed, 2 bits of heading per tick and the
+debug actions taken in between.
+
+File layout (little-endian)::
+
+    header  "SNKR" u8 version, u64 seed, u32 ticks, u32 events
+    dirs    ceil(ticks/4) bytes, tick t in bits 2*(t%4).. of byte t//4
+    events  per event: u32 tick, u8 kind, f64 value
+
+An event stamped with tick t is applied after t ticks have run. Playback
+re-simulates from the seed; ``python -m sim.replay FILE`` does it headlessly.
+"""
+import copy
+import struct
+import sys
+import time
+
+from .config import DIRS
+
+REPLAY_MAGIC   = b"SNKR"
+REPLAY_VERSION = 1
+_HEADER = struct.Struct("<4sBQII")
+_EVENT  = struct.Struct("<IBd")
+
+# debug actions that change the outcome of a game
+EV_ADD_SCORE   = 1
+EV_SPAWN_BONUS = 2
+EV_KILL        = 3
+EV_GOD_MODE    = 4   # value 0/1
+EV_SPEED_OVR   = 5   # value 0/1
+EV_SPEED       = 6   # value: custom tick interval in seconds
+EV_NAMES = {EV_ADD_SCORE: "Add Score", EV_SPAWN_BONUS: "Spawn Bonus", EV_KILL: "Kill Snake",
+            EV_GOD_MODE: "God Mode", EV_SPEED_OVR: "Override Speed", EV_SPEED: "Speed"}
+
+KEYFRAME_EVERY  = 256    # ticks between playback snapshots used for seeking
+PLAYBACK_SPEEDS = [0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0]
+
+
+class Replay:
+    """Recording of one game, appended to by SnakeState as it ticks."""
+    def __init__(self, seed):
+        self.seed   = seed
+        self.ticks  = 0
+        self.dirs   = bytearray()
+        self.events = []          # (tick, kind, value)
+
+    def push_dir(self, code):
+        k = self.ticks & 3
+        if k == 0: self.dirs.append(code)
+        else:      self.dirs[-1] |= code << 2*k
+        self.ticks += 1
+
+    def dir_at(self, t):
+        return self.dirs[t >> 2] >> 2*(t & 3) & 3
+
+    def event(self, kind, value=0.0):
+        self.events.append((self.ticks, kind, float(value)))
+
+    def to_bytes(self):
+        out = bytearray(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed,
+                                     self.ticks, len(self.events)))
+        out += self.dirs
+        for ev in self.events: out += _EVENT.pack(*ev)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, ver, seed, ticks, nev = _HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or ver != REPLAY_VERSION:
+            raise ValueError("not a Snake replay (or an unsupported version)")
+        rp = cls(seed); rp.ticks = ticks
+        o = _HEADER.size; nb = (ticks + 3) >> 2
+        rp.dirs = bytearray(data[o:o+nb]); o += nb
+        rp.events = [_EVENT.unpack_from(data, o + i*_EVENT.size) for i in range(nev)]
+        return rp
+
+    def save(self, path):
+        with open(path, "wb") as f: f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f: return cls.from_bytes(f.read())
+
+
+def apply_event(gs, kind, value):
+    if   kind == EV_ADD_SCORE:   gs.add_score(int(value))
+    elif kind == EV_SPAWN_BONUS: gs.spawn_bonus()
+    elif kind == EV_KILL:        gs.kill()
+    elif kind == EV_GOD_MODE:    gs.set_god_mode(bool(value))
+    elif kind == EV_SPEED_OVR:   gs.set_speed(bool(value), gs.custom_speed)
+    elif kind == EV_SPEED:       gs.set_speed(gs.speed_override, value)
+
+
+class ReplayPlayer:
+    """Re-simulates a Replay into its own SnakeState.
+
+    ``run()`` goes straight to the end; ``step(dt)`` plays back at
+    ``speed`` times real time for the UI. Snapshots taken every
+    KEYFRAME_EVERY ticks on the way make ``seek()`` cheap in both directions.
+    """
+    def __init__(self, replay, clock=time.time):
+        from .snake import SnakeState
+        self.replay    = replay
+        self.gs        = SnakeState(clock=clock, seed=replay.seed, record=False)
+        self.t         = 0          # ticks played
+        self.ev        = 0          # next event index
+        self.acc       = 0.0
+        self.speed     = 1.0
+        self.paused    = False
+        self.keyframes = {0: self._snapshot()}
+
+    @property
+    def done(self):
+        return self.t >= self.replay.ticks and self.ev >= len(self.replay.events)
+
+    def _snapshot(self):
+        state = {k: v for k, v in self.gs.__dict__.items() if k != "clock"}
+        return self.ev, copy.deepcopy(state)
+
+    def _tick(self):
+        """Apply the events due now, then play one recorded tick."""
+        rp, gs = self.replay, self.gs
+        while self.ev < len(rp.events) and rp.events[self.ev][0] <= self.t:
+            _, kind, value = rp.events[self.ev]; self.ev += 1
+            apply_event(gs, kind, value)
+        if self.t >= rp.ticks: return
+        gs.next_dir = DIRS[rp.dir_at(self.t)]
+        gs.tick(); self.t += 1
+        if self.t % KEYFRAME_EVERY == 0 and self.t not in self.keyframes:
+            self.keyframes[self.t] = self._snapshot()
+
+    def run(self):
+        while not self.done: self._tick()
+        return self.gs
+
+    def seek(self, t):
+        t = max(0, min(t, self.replay.ticks))
+        k = max(kt for kt in self.keyframes if kt <= t)
+        if not (k <= self.t <= t):
+            self.ev, state = self.keyframes[k]
+            self.gs.__dict__.update(copy.deepcopy(state)); self.t = k
+        while self.t < t: self._tick()
+        self.acc = 0.0
+
+    def step(self, dt):
+        if self.paused or self.done: return
+        self.acc += dt * self.speed
+        while not self.done and self.acc + 1e-9 >= self.gs.interval():
+            self.acc -= self.gs.interval(); self._tick()
+
+
+def main(argv):
+    for path in argv:
+        rp = Replay.load(path)
+        t0 = time.perf_counter()
+        gs = ReplayPlayer(rp).run()
+        dt = time.perf_counter() - t0
+        print(f"{path}: seed {rp.seed:08x}  {rp.ticks} ticks  {len(rp.events)} events  "
+              f"score {gs.score}  {gs.death_reason or 'alive'}  "
+              f"({rp.ticks/max(dt, 1e-9):,.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
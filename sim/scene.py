@@ -0,0 +1,148 @@
+"""N-body scene files and procedural scene generators.
+
+File layout (little-endian, every array starts on a 64-byte boundary)::
+
+    header   "NBSC" u16 version, u16 flags, u64 n, u32 trail_cap, u32 pad,
+             f64 G, f64 softening, f64 time_step, f64 elapsed
+    x, y, vx, vy, mass   f64[n] each
+    color                u8[n]
+    if flags & SCENE_TRAILS:
+    trail_count          i32[n]
+    trail_pts            f32[n, trail_cap, 2], oldest → newest, newest at the end
+
+``SceneFile`` maps the arrays with numpy.memmap, so opening is O(1) whatever
+the size; data is only read when the scene is copied into a PhysicsState.
+Generators return (pos, vel, mass, color_idx) arrays ready for
+``PhysicsState.set_arrays``.
+"""
+import struct
+
+import numpy as np
+
+SCENE_MAGIC   = b"NBSC"
+SCENE_VERSION = 1
+SCENE_TRAILS  = 1        # flags bit: trail block present
+SCENE_EXT     = ".nbscene"
+_HEADER = struct.Struct("<4sHHQII4d")
+_ALIGN  = 64
+
+
+def _aligned(off):
+    return (off + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout(n, trail_cap, flags):
+    """(name, dtype, shape, offset) for every array, and the total file size."""
+    cols = [("x", "<f8", (n,)), ("y", "<f8", (n,)), ("vx", "<f8", (n,)), ("vy", "<f8", (n,)),
+            ("mass", "<f8", (n,)), ("color", "u1", (n,))]
+    if flags & SCENE_TRAILS:
+        cols += [("trail_count", "<i4", (n,)), ("trail_pts", "<f4", (n, trail_cap, 2))]
+    out, off = [], _aligned(_HEADER.size)
+    for name, dt, shape in cols:
+        out.append((name, dt, shape, off))
+        off = _aligned(off + int(np.prod(shape)) * np.dtype(dt).itemsize)
+    return out, off
+
+
+class SceneFile:
+    """Read-only, memory-mapped view of a scene file."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f: head = f.read(_HEADER.size)
+        if len(head) < _HEADER.size:
+            raise ValueError("truncated scene file")
+        (magic, ver, self.flags, self.n, self.trail_cap, _,
+         self.G, self.softening, self.time_step, self.elapsed) = _HEADER.unpack(head)
+        if magic != SCENE_MAGIC or ver != SCENE_VERSION:
+            raise ValueError("not an N-body scene (or an unsupported version)")
+        cols, self.size = _layout(self.n, self.trail_cap, self.flags)
+        for name, dt, shape, off in cols:
+            a = np.memmap(path, dt, "r", off, shape) if self.n else np.zeros(shape, dt)
+            setattr(self, name, a)
+
+    @property
+    def has_trails(self): return bool(self.flags & SCENE_TRAILS) and self.trail_cap > 0
+
+
+def write_scene(path, pos, vel, mass, color_idx, G, softening, time_step, elapsed=0.0,
+                trail_count=None, trail_pts=None):
+    """Write a scene; trail_pts is (n, cap, 2) oldest → newest, or None."""
+    n = len(mass)
+    cap = trail_pts.shape[1] if trail_pts is not None else 0
+    flags = SCENE_TRAILS if trail_pts is not None else 0
+    cols, size = _layout(n, cap, flags)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(SCENE_MAGIC, SCENE_VERSION, flags, n, cap, 0,
+                             G, softening, time_step, elapsed))
+        f.truncate(size)
+    if not n: return
+    data = {"x": pos[:, 0], "y": pos[:, 1], "vx": vel[:, 0], "vy": vel[:, 1], "mass": mass,
+            "color": color_idx, "trail_count": trail_count, "trail_pts": trail_pts}
+    for name, dt, shape, off in cols:
+        m = np.memmap(path, dt, "r+", off, shape)
+        m[...] = data[name]
+        m.flush(); del m
+
+
+# ── generators ─────────────────────────────────────────────────────
+def _circular_speed(r, m_in, G, soft):
+    return np.sqrt(G * m_in * r*r / (r*r + soft*soft) ** 1.5)
+
+
+def gen_disk(n, cx, cy, radius, G, softening, central=5000.0, disk_mass=2000.0,
+             spin=1, color=0, seed=None, vx=0.0, vy=0.0):
+    """Exponential-ish disk of n-1 light bodies on circular orbits about a heavy core."""
+    rng = np.random.default_rng(seed)
+    m = n - 1
+    r = radius * np.sqrt(rng.uniform(0.02, 1.0, m))
+    th = rng.uniform(0, 2*np.pi, m)
+    order = np.argsort(r); rank = np.empty(m); rank[order] = np.arange(m)
+    m_in = central + disk_mass * (rank + 1) / max(m, 1)    # mass inside each orbit
+    v = _circular_speed(r, m_in, G, softening) * spin
+    pos = np.empty((n, 2)); vel = np.empty((n, 2))
+    pos[0] = (cx, cy); vel[0] = (vx, vy)
+    pos[1:, 0] = cx + r*np.cos(th); pos[1:, 1] = cy + r*np.sin(th)
+    vel[1:, 0] = vx - v*np.sin(th); vel[1:, 1] = vy + v*np.cos(th)
+    mass = np.full(n, disk_mass / max(m, 1)); mass[0] = central
+    col = np.full(n, color, np.int32)
+    col[1:] = color + (r > radius * 0.6)
+    return pos, vel, mass, col
+
+
+def gen_plummer(n, cx, cy, scale, G, total_mass=8000.0, seed=None):
+    """Plummer sphere (Aarseth, Hénon & Wielen 1974 sampling) projected onto the plane."""
+    rng = np.random.default_rng(seed)
+    r = scale / np.sqrt(rng.uniform(1e-3, 1.0, n) ** (-2/3) - 1)
+    r = np.minimum(r, scale * 12)
+    # velocity magnitude by von Neumann rejection on q²(1-q²)^3.5
+    q = np.empty(n); todo = np.arange(n)
+    while len(todo):
+        x = rng.uniform(0, 1, len(todo)); y = rng.uniform(0, 0.1, len(todo))
+        ok = y < x*x * (1 - x*x) ** 3.5
+        q[todo[ok]] = x[ok]; todo = todo[~ok]
+    v = q * np.sqrt(2.0 * G * total_mass / scale) * (1 + (r/scale)**2) ** -0.25
+    def iso(mag):
+        u = rng.normal(size=(n, 3)); u /= np.linalg.norm(u, axis=1, keepdims=True)
+        return u[:, :2] * mag[:, None]
+    pos = iso(r) + (cx, cy)
+    vel = iso(v)
+    vel -= vel.mean(axis=0)
+    mass = np.full(n, total_mass / n)
+    col = np.minimum((r / scale).astype(np.int32), 4)
+    return pos, vel, mass, col
+
+
+def gen_galaxies(n, cx, cy, radius, G, softening, seed=None):
+    """Two disks, one counter-rotating, on a slow approach."""
+    rng = np.random.default_rng(seed)
+    half = n // 2
+    sep, v = radius * 1.6, 0.25 * _circular_speed(radius, 5000.0, G, softening)
+    a = gen_disk(half, cx - sep, cy - radius*0.4, radius*0.8, G, softening,
+                 spin=1, color=0, seed=rng.integers(1 << 31), vx=v, vy=0.0)
+    b = gen_disk(n - half, cx + sep, cy + radius*0.4, radius*0.8, G, softening,
+                 spin=-1, color=2, seed=rng.integers(1 << 31), vx=-v, vy=0.0)
+    return tuple(np.concatenate(p) for p in zip(a, b))
+
+
+GENERATORS = ["Disk", "Plummer Sphere", "Colliding Galaxies"]
+GEN_SIZES  = [1_000, 10_000, 100_000, 1_000_000]
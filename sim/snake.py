@@ -0,0 +1,222 @@
+"""Snake rules with no UI dependencies.
+
+Drive a game with ``step(dt)`` (accumulates time and ticks at the current
+speed) or ``tick()`` (exactly one move). Input arrives as ``Action`` values;
+the front end maps its own key codes onto them. Each game draws food from
+its own ``random.Random(seed)`` and records itself into ``self.replay``.
+"""
+import time
+import random
+from array import array
+from collections import deque
+from enum import IntEnum
+
+from .config import COLS, ROWS, RIGHT, DIRS
+from .replay import (Replay, EV_ADD_SCORE, EV_SPAWN_BONUS, EV_KILL,
+                     EV_GOD_MODE, EV_SPEED_OVR, EV_SPEED)
+from .eventlog import EventLog, EV_INFO, EV_GAME, EV_BONUS, EV_LEVEL, EV_ALERT
+
+
+class Action(IntEnum):
+    UP      = 0
+    DOWN    = 1
+    LEFT    = 2
+    RIGHT   = 3
+    PAUSE   = 4
+    RESTART = 5
+
+
+ACTION_DIRS = {Action(i): d for i, d in enumerate(DIRS)}
+DIR_CODES   = {d: i for i, d in enumerate(DIRS)}
+
+BONUS_TIME = 6.0
+
+_seed_source = random.SystemRandom()
+
+
+class SnakeState:
+    def __init__(self, clock=time.time, seed=None, record=True):
+        self.clock  = clock      # wall-clock source, only used for log timestamps
+        self.record = record
+        self.controller = None   # optional callable(state) run before each tick (autopilot)
+        self.high_score = 0
+        self.log = EventLog(clock=clock)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """New game; a fresh random seed unless one is given."""
+        self.seed   = _seed_source.getrandbits(32) if seed is None else seed
+        self.rng    = random.Random(self.seed)
+        self.replay = Replay(self.seed) if self.record else None
+        cx, cy = COLS // 2, ROWS // 2
+        self.snake         = deque([(cx, cy), (cx-1, cy), (cx-2, cy)])
+        # segments per cell (counts, not bits: god mode lets the body overlap)
+        self.occ           = array("I", bytes(4 * COLS * ROWS))
+        # free-cell index: free[] lists empty cells, slot[cell] is its position
+        # in free (or -1), so occupy/vacate are O(1) swap-removes/appends
+        self.free          = list(range(COLS * ROWS))
+        self.slot          = array("i", range(COLS * ROWS))
+        for c, r in self.snake: self._occupy(r*COLS + c)
+        self.won           = False
+        self.direction     = RIGHT
+        self.next_dir      = RIGHT
+        self.food          = self._spawn_food()
+        self.bonus_food    = None
+        self.bonus_timer   = 0.0
+        self.score         = 0
+        self.level         = 1
+        self.alive         = True
+        self.paused        = False
+        self.tick_interval = 0.15
+        self.tick_acc      = 0.0    # sim time since the last move
+        self.elapsed       = 0.0
+        self.move_count    = 0
+        self.food_eaten    = 0
+        self.death_reason  = ""
+        self.speed_override = False
+        self.custom_speed   = 0.15
+        self.god_mode       = False
+        self.show_grid      = True
+        self.show_hitboxes  = False
+        self.log.clear()
+        self.log.add(EV_INFO, "Snake game started!")
+
+    def _occupy(self, ci):
+        self.occ[ci] += 1
+        if self.occ[ci] == 1:
+            k = self.slot[ci]; last = self.free.pop()
+            if last != ci:
+                self.free[k] = last; self.slot[last] = k
+            self.slot[ci] = -1
+
+    def _vacate(self, ci):
+        self.occ[ci] -= 1
+        if self.occ[ci] == 0:
+            self.slot[ci] = len(self.free); self.free.append(ci)
+
+    def _spawn_food(self):
+        """Uniform pick among cells not covered by the snake; None if the board is full."""
+        if not self.free: return None
+        ci = self.free[self.rng.randrange(len(self.free))]
+        return (ci % COLS, ci // COLS)
+
+    def handle_input(self, action):
+        if action in ACTION_DIRS:
+            nd = ACTION_DIRS[action]
+            if (nd[0]+self.direction[0], nd[1]+self.direction[1]) != (0,0):
+                self.next_dir = nd
+        elif action == Action.PAUSE:
+            if self.alive:
+                self.paused = not self.paused
+                self.log.add(EV_INFO, "Paused." if self.paused else "Resumed.")
+        elif action == Action.RESTART:
+            self.reset()
+
+    def interval(self):
+        return self.custom_speed if self.speed_override else self.tick_interval
+
+    def step(self, dt):
+        """Advance dt seconds of game time, moving once the tick interval has elapsed."""
+        if not self.alive or self.paused: return
+        self.tick_acc += dt
+        interval = self.interval()
+        if self.tick_acc + 1e-9 < interval: return
+        # one move per step; a long stall does not turn into a burst of moves
+        self.tick_acc = min(self.tick_acc - interval, interval)
+        self.tick()
+
+    def tick(self):
+        """One game tick. Timers run in tick time so a game is a pure
+        function of its seed and input stream."""
+        if not self.alive or self.paused: return
+        interval = self.interval()
+        self.elapsed += interval
+        if self.controller: self.controller(self)
+        if self.bonus_food:
+            self.bonus_timer -= interval
+            if self.bonus_timer <= 0:
+                self.log.add(EV_BONUS, "Bonus food expired!")
+                self.bonus_food = None
+        self.direction = self.next_dir
+        if self.replay: self.replay.push_dir(DIR_CODES[self.direction])
+        if self.food is None:          # god mode filled the board earlier
+            self.food = self._spawn_food()
+        hx, hy = self.snake[0]
+        dx, dy = self.direction
+        nh = (hx+dx, hy+dy)
+        if not (0 <= nh[0] < COLS and 0 <= nh[1] < ROWS):
+            if not self.god_mode:
+                self.death_reason = "Hit the wall"; self._die(); return
+            else:
+                nh = (nh[0]%COLS, nh[1]%ROWS)
+        occ = self.occ
+        ni = nh[1]*COLS + nh[0]
+        # same as `nh in snake[:-1]`: the tail cell is about to be vacated
+        if occ[ni] - (nh == self.snake[-1]) > 0 and not self.god_mode:
+            self.death_reason = "Ate itself"; self._die(); return
+        self.snake.appendleft(nh)
+        self._occupy(ni)
+        self.move_count += 1
+        grew = False
+        if nh == self.food:
+            self.score += 10*self.level; self.food_eaten += 1
+            self.food = self._spawn_food(); grew = True
+            self.log.add(EV_GAME, "Food eaten! Score: {}", self.score)
+            if self.food is None and not self.god_mode:
+                if self.score > self.high_score: self.high_score = self.score
+                self.won = True
+                self.death_reason = "Board full"; self._die(); return
+            if self.food_eaten % 5 == 0 and not self.bonus_food:
+                self.bonus_food = self._spawn_food(); self.bonus_timer = BONUS_TIME
+                self.log.add(EV_BONUS, "Bonus food appeared! (6s)")
+            if self.food_eaten % 10 == 0:
+                self.level += 1
+                self.tick_interval = max(0.06, self.tick_interval - 0.01)
+                self.log.add(EV_LEVEL, "Level up! Now level {}", self.level)
+        if nh == self.bonus_food:
+            self.score += 50*self.level; self.bonus_food = None; grew = True
+            self.log.add(EV_BONUS, "Bonus food eaten! +{} pts", 50*self.level)
+        if not grew:
+            tc, tr = self.snake.pop()
+            self._vacate(tr*COLS + tc)
+        if self.score > self.high_score: self.high_score = self.score
+
+    # ── debug actions (recorded so replays stay faithful) ─────────
+    def _event(self, kind, value=0.0):
+        if self.replay: self.replay.event(kind, value)
+
+    def add_score(self, n):
+        self._event(EV_ADD_SCORE, n)
+        self.score += n
+        self.high_score = max(self.high_score, self.score)
+        self.log.add(EV_GAME, "Injected +{}", n)
+
+    def spawn_bonus(self):
+        if self.bonus_food: return
+        self._event(EV_SPAWN_BONUS)
+        self.bonus_food = self._spawn_food(); self.bonus_timer = BONUS_TIME
+        self.log.add(EV_BONUS, "Bonus spawned via debug.")
+
+    def kill(self):
+        if not self.alive: return
+        self._event(EV_KILL)
+        self.death_reason = "Debug kill"; self._die()
+
+    def set_god_mode(self, on):
+        if on == self.god_mode: return
+        self._event(EV_GOD_MODE, on)
+        self.god_mode = on
+
+    def set_speed(self, override, speed):
+        if override != self.speed_override:
+            self._event(EV_SPEED_OVR, override); self.speed_override = override
+        if speed != self.custom_speed:
+            self._event(EV_SPEED, speed); self.custom_speed = speed
+            self.log.add(EV_INFO, "Speed -> {:.3f}s", speed)
+
+    def _die(self):
+        self.alive = False
+        if self.won:
+            self.log.add(EV_LEVEL, "YOU WIN — {}. Score: {}", self.death_reason, self.score)
+        else:
+            self.log.add(EV_ALERT, "GAME OVER — {}. Score: {}", self.death_reason, self.score)
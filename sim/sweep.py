@@ -0,0 +1,107 @@
+"""Projectile parameter sweeps, one NumPy lane per shot.
+
+Grids are evaluated with the closed-form linear-drag solution in
+``sim.trajectory``. ``simulate_shots`` keeps a step-by-step integrator (semi-
+implicit Euler, landing interpolated within the last step, landed lanes
+compacted out every SWEEP_COMPACT steps) as a cross-check and for drag models
+without a closed form.
+"""
+import time
+
+import numpy as np
+
+from .trajectory import shot_metrics
+
+SWEEP_H       = 1/240   # integration step for simulate_shots (s)
+SWEEP_MAX_T   = 60.0    # lanes still airborne after this are reported as NaN
+SWEEP_COMPACT = 32      # steps between dropping landed lanes
+
+SWEEP_METRIC_RANGE  = 0
+SWEEP_METRIC_HEIGHT = 1
+SWEEP_METRIC_TIME   = 2
+SWEEP_METRIC_NAMES  = ["Range", "Max Height", "Flight Time"]
+
+
+def simulate_shots(angle_deg, speed, drag, gravity, h=SWEEP_H, max_t=SWEEP_MAX_T):
+    """Fly every lane until it returns to launch height.
+
+    Inputs broadcast together. Returns (range, max_height, flight_time) with
+    the broadcast shape, NaN where a shot never landed within max_t.
+    """
+    a, v, k, g = np.broadcast_arrays(*(np.asarray(p, np.float64) for p in
+                                       (angle_deg, speed, drag, gravity)))
+    shape = a.shape
+    n = a.size
+    rad = np.radians(a.ravel())
+    vx = v.ravel() * np.cos(rad)
+    vy = -v.ravel() * np.sin(rad)           # screen y points down
+    damp = 1.0 - k.ravel() * h
+    gh = g.ravel() * h
+    x = np.zeros(n); y = np.zeros(n); top = np.zeros(n)
+    lane = np.arange(n)
+    rng = np.full(n, np.nan); hgt = np.full(n, np.nan); tof = np.full(n, np.nan)
+    for step in range(1, int(max_t / h) + 1):
+        vx *= damp
+        vy *= damp; vy += gh
+        x += vx * h
+        y += vy * h
+        np.minimum(top, y, out=top)
+        hit = y >= 0
+        if hit.any():
+            j = np.flatnonzero(hit)
+            # back up to the crossing: y was y - vy*h one step ago
+            f = y[j] / (vy[j] * h)
+            lj = lane[j]
+            rng[lj] = x[j] - f * vx[j] * h
+            tof[lj] = (step - f) * h
+            hgt[lj] = -top[j]
+            y[j] = -np.inf; vy[j] = 0.0; gh[j] = 0.0
+        if step % SWEEP_COMPACT == 0:
+            live = np.isfinite(y)
+            if not live.any(): break
+            if not live.all():
+                lane, x, y, vx, vy, top, damp, gh = (arr[live] for arr in
+                                                    (lane, x, y, vx, vy, top, damp, gh))
+    return rng.reshape(shape), hgt.reshape(shape), tof.reshape(shape)
+
+
+class SweepResult:
+    """Outcome of a grid sweep; metric arrays are indexed [angle, speed, drag, gravity]."""
+    def __init__(self, angles, speeds, drags, gravities):
+        self.angles    = np.atleast_1d(np.asarray(angles, np.float64))
+        self.speeds    = np.atleast_1d(np.asarray(speeds, np.float64))
+        self.drags     = np.atleast_1d(np.asarray(drags, np.float64))
+        self.gravities = np.atleast_1d(np.asarray(gravities, np.float64))
+        grid = np.meshgrid(self.angles, self.speeds, self.drags, self.gravities, indexing="ij")
+        t0 = time.perf_counter()
+        self.range, self.height, self.flight = shot_metrics(*grid)
+        self.seconds = time.perf_counter() - t0
+        self.lanes = grid[0].size
+
+    def metric(self, which):
+        return (self.range, self.height, self.flight)[which]
+
+    def optimal_angles(self):
+        """Angle of longest range for every (speed, drag, gravity) column."""
+        r = np.where(np.isnan(self.range), -np.inf, self.range)
+        return self.angles[np.argmax(r, axis=0)]
+
+
+def best_angle(speed, drag, gravity, lo=0.5, hi=89.5, step=0.25, tol=1e-6):
+    """Launch angle (degrees) with the longest range, and that range.
+
+    Scans the angle at ``step`` resolution in one batch, then narrows the
+    bracket around the best sample by golden-section search.
+    """
+    angles = np.arange(lo, hi + step/2, step)
+    i = int(np.argmax(shot_metrics(angles, speed, drag, gravity)[0]))
+    a, b = angles[max(i-1, 0)], angles[min(i+1, len(angles)-1)]
+    inv = (5**0.5 - 1) / 2
+    def far(x): return float(shot_metrics(x, speed, drag, gravity)[0])
+    c, d = b - inv*(b - a), a + inv*(b - a)
+    fc, fd = far(c), far(d)
+    while b - a > tol:
+        if fc > fd: b, d, fd = d, c, fc; c = b - inv*(b - a); fc = far(c)
+        else:       a, c, fc = c, d, fd; d = a + inv*(b - a); fd = far(d)
+    best = float(a + b) / 2
+    return best, far(best)
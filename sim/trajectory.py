@@ -0,0 +1,122 @@
+"""Closed-form projectile motion under linear drag.
+
+With a = g - k·v (screen y points down, g > 0) the motion solves exactly:
+
+    x(t) = x0 + vx0·φ(t)
+    y(t) = y0 + vy0·φ(t) + g·ψ(t)
+    φ(t) = (1 - e^(-kt)) / k        ψ(t) = (t - φ(t)) / k
+
+with φ → t and ψ → t²/2 as k → 0. Height above launch is convex in t for an
+upward shot, so Newton from the right of the landing root converges
+monotonically. All helpers broadcast over NumPy arrays.
+"""
+import numpy as np
+
+SERIES_KT = 1e-3     # below this k·t, φ and ψ use their Taylor series
+LAND_ITERS = 40      # Newton iteration cap for the landing root
+
+
+def _phi_psi(k, t):
+    k, t = np.broadcast_arrays(np.asarray(k, np.float64), np.asarray(t, np.float64))
+    kt = k * t
+    small = np.abs(kt) < SERIES_KT
+    ks = np.where(small, 1.0, k)                       # keeps the exact branch finite
+    em = np.expm1(-np.where(small, 0.0, kt))
+    phi = np.where(small, t * (1 - kt/2 + kt*kt/6), -em / ks)
+    psi = np.where(small, t*t * (0.5 - kt/6 + kt*kt/24), (t + em/ks) / ks)
+    return phi, psi
+
+
+def drag_offset(t, vx0, vy0, g, k):
+    """Displacement (dx, dy) from the launch point after t seconds."""
+    phi, psi = _phi_psi(k, t)
+    return vx0 * phi, vy0 * phi + g * psi
+
+
+def drag_velocity(t, vx0, vy0, g, k):
+    e = np.exp(-np.asarray(k, np.float64) * t)
+    return vx0 * e, vy0 * e + g * _phi_psi(k, t)[0]
+
+
+def apex_time(vy0, g, k):
+    """Time of the highest point (0 for shots that start level or downwards)."""
+    vy0, g, k = np.broadcast_arrays(*(np.asarray(p, np.float64) for p in (vy0, g, k)))
+    up = np.maximum(-vy0, 0.0)
+    r = k * up / g
+    return np.where(r < SERIES_KT, up / g * (1 - r/2 + r*r/3), np.log1p(r) / np.where(k > 0, k, 1.0))
+
+
+def landing_time(vy0, g, k):
+    """First t > 0 at which the shot is back at launch height (0 if never above it)."""
+    vy0, g, k = np.broadcast_arrays(*(np.asarray(p, np.float64) for p in (vy0, g, k)))
+    up = vy0 < 0
+    t = np.where(up, -2.0 * vy0 / g, 0.0)               # the vacuum flight time
+    # Newton needs to start right of the root; widen until the shot is down
+    for _ in range(64):
+        late = up & (drag_offset(t, 0.0, vy0, g, k)[1] < 0)
+        if not late.any(): break
+        t = np.where(late, t * 2.0, t)
+    for _ in range(LAND_ITERS):
+        phi, psi = _phi_psi(k, t)
+        dy = vy0 * phi + g * psi
+        vy = vy0 * np.exp(-k * t) + g * phi
+        step = np.where(up & (vy > 0), dy / np.where(vy > 0, vy, 1.0), 0.0)
+        t = t - step
+        if np.all(np.abs(step) <= 1e-12 * np.maximum(t, 1.0)): break
+    return t
+
+
+def shot_metrics(angle_deg, speed, drag, gravity):
+    """Exact (range, max_height, flight_time) for every broadcast lane."""
+    rad = np.radians(np.asarray(angle_deg, np.float64))
+    vx0 = np.asarray(speed) * np.cos(rad)
+    vy0 = -np.asarray(speed) * np.sin(rad)
+    t_land = landing_time(vy0, gravity, drag)
+    dx = drag_offset(t_land, vx0, vy0, gravity, drag)[0]
+    height = -drag_offset(apex_time(vy0, gravity, drag), vx0, vy0, gravity, drag)[1]
+    return np.abs(dx), height, t_land
+
+
+class DragTrajectory:
+    """One shot from (x0, y0). Positions are evaluated on demand; nothing is
+    integrated. ``path()`` samples the flown arc evenly in screen space."""
+    DENSE = 256      # samples used to measure arc length before resampling
+
+    def __init__(self, x0, y0, vx0, vy0, g, k):
+        self.x0, self.y0, self.vx0, self.vy0, self.g, self.k = x0, y0, vx0, vy0, g, k
+        self.t_land = float(landing_time(vy0, g, k))
+        self.t_apex = float(apex_time(vy0, g, k))
+        self._key = None
+        self._path = None
+
+    @classmethod
+    def launch(cls, x0, y0, angle_deg, speed, g, k):
+        rad = np.radians(angle_deg)
+        return cls(x0, y0, speed*np.cos(rad), -speed*np.sin(rad), g, k)
+
+    def pos(self, t):
+        dx, dy = drag_offset(t, self.vx0, self.vy0, self.g, self.k)
+        return self.x0 + dx, self.y0 + dy
+
+    @property
+    def range(self):
+        return abs(float(self.pos(self.t_land)[0]) - self.x0)
+
+    @property
+    def height(self):
+        return self.y0 - float(self.pos(self.t_apex)[1])
+
+    def path(self, t_end=None, spacing=2.0, max_points=4096):
+        """(n, 2) float32 points along [0, t_end], about ``spacing`` px apart."""
+        t_end = self.t_land if t_end is None else min(t_end, self.t_land)
+        key = (t_end, spacing)
+        if key == self._key: return self._path
+        td = np.linspace(0.0, t_end, self.DENSE)
+        xs, ys = self.pos(td)
+        seg = np.hypot(np.diff(xs), np.diff(ys))
+        s = np.concatenate(([0.0], np.cumsum(seg)))
+        n = int(min(max(s[-1] / spacing, 1), max_points - 1)) + 1
+        t = np.interp(np.linspace(0.0, s[-1], n), s, td) if s[-1] > 0 else td[:1]
+        xs, ys = self.pos(t)
+        self._key, self._path = key, np.stack([xs, ys], -1).astype(np.float32)
+        return self._path
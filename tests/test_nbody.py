@@ -0,0 +1,86 @@
+"""Vectorized N-body kernels against the pairwise loop they replaced."""
+import math
+
+import numpy as np
+import pytest
+
+import sim.physics as physics
+from sim.physics import (PhysicsState, nbody_accel, nbody_energy, bh_accel,
+                         INTEG_EULER, INTEG_LEAPFROG, INTEG_YOSHIDA4, INTEG_RK45)
+
+G, SOFT = 500.0, 5.0
+
+
+def _scene(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 800, (n, 2)), rng.normal(0, 20, (n, 2)), rng.uniform(1, 200, n)
+
+
+def _loop_accel(pos, mass, G, softening):
+    # the double loop PhysicsState.update_nbody used before the array backend
+    n = len(mass); acc = [[0.0, 0.0] for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            dx = pos[j][0] - pos[i][0]; dy = pos[j][1] - pos[i][1]
+            dist2 = dx*dx + dy*dy + softening**2
+            dist = math.sqrt(dist2)
+            force = G * mass[i] * mass[j] / dist2
+            fx = force * dx/dist; fy = force * dy/dist
+            acc[i][0] += fx/mass[i]; acc[i][1] += fy/mass[i]
+            acc[j][0] -= fx/mass[j]; acc[j][1] -= fy/mass[j]
+    return np.array(acc)
+
+
+def _loop_energy(pos, vel, mass, G, softening):
+    n = len(mass)
+    e = sum(0.5 * mass[i] * (vel[i][0]**2 + vel[i][1]**2) for i in range(n))
+    for i in range(n):
+        for j in range(i + 1, n):
+            dx = pos[j][0] - pos[i][0]; dy = pos[j][1] - pos[i][1]
+            e -= G * mass[i] * mass[j] / math.sqrt(dx*dx + dy*dy + softening**2)
+    return e
+
+
+def test_accel_matches_pairwise_loop():
+    pos, _, mass = _scene(80)
+    ref = _loop_accel(pos.tolist(), mass.tolist(), G, SOFT)
+    np.testing.assert_allclose(nbody_accel(pos, mass, G, SOFT), ref, rtol=1e-9, atol=1e-9)
+
+
+def test_accel_chunks_and_row_ranges(monkeypatch):
+    pos, _, mass = _scene(150)
+    full = nbody_accel(pos, mass, G, SOFT)
+    monkeypatch.setattr(physics, "NBODY_CHUNK_ELEMS", 300)    # a couple of rows per chunk
+    np.testing.assert_allclose(nbody_accel(pos, mass, G, SOFT), full, rtol=1e-12, atol=1e-12)
+    out = np.full((150, 2), np.nan)
+    nbody_accel(pos, mass, G, SOFT, out, lo=40, hi=90)
+    np.testing.assert_allclose(out[40:90], full[40:90], rtol=1e-12, atol=1e-12)
+    assert np.isnan(out[:40]).all() and np.isnan(out[90:]).all()
+
+
+def test_energy_matches_pairwise_loop():
+    pos, vel, mass = _scene(60)
+    ref = _loop_energy(pos.tolist(), vel.tolist(), mass.tolist(), G, SOFT)
+    assert nbody_energy(pos, vel, mass, G, SOFT) == pytest.approx(ref, rel=1e-10)
+
+
+def test_barnes_hut_converges_to_direct():
+    pos, _, mass = _scene(300)
+    direct = nbody_accel(pos, mass, G, SOFT)
+    approx = bh_accel(pos, mass, G, SOFT, 0.3)
+    err = np.linalg.norm(approx - direct, axis=1) / np.linalg.norm(direct, axis=1)
+    assert np.median(err) < 1e-2
+    np.testing.assert_allclose(bh_accel(pos, mass, G, SOFT, 0.0), direct, rtol=1e-6, atol=1e-9)
+
+
+@pytest.mark.parametrize("integ", [INTEG_EULER, INTEG_LEAPFROG, INTEG_YOSHIDA4, INTEG_RK45])
+def test_body_views_follow_the_arrays(integ):
+    ps = PhysicsState(clock=lambda: 0.0)
+    ps.integrator = integ
+    for _ in range(20): ps.update_nbody(1/60)
+    st = ps.store
+    assert len(ps.bodies) == st.n
+    for b in ps.bodies:
+        assert (b.x, b.y) == tuple(st.pos[b.i]) and b.mass == st.mass[b.i]
+    assert ps.elapsed == pytest.approx(20/60 * ps.time_step)
+
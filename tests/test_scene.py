@@ -0,0 +1,59 @@
+"""Scene files round-trip bodies, settings and trails."""
+import numpy as np
+import pytest
+
+from sim.physics import PhysicsState
+from sim.scene import SceneFile, write_scene, SCENE_EXT
+
+
+def _run(n=40, frames=30):
+    ps = PhysicsState(clock=lambda: 0.0)
+    ps.generate(1, n, seed=4)
+    ps.G, ps.softening, ps.time_step = 321.0, 3.5, 1.5
+    for _ in range(frames): ps.update_nbody(1/60); ps.sample_trails()
+    return ps
+
+
+def _trails(ps):
+    tb = ps.trails; n = ps.store.n
+    return tb.count[:n].copy(), tb.pts[:n, tb.head:tb.head + tb.cap].copy()
+
+
+def test_state_round_trips_through_a_scene(tmp_path):
+    ps = _run()
+    path = str(tmp_path / f"a{SCENE_EXT}")
+    ps.save_scene(path)
+    back = PhysicsState(clock=lambda: 0.0)
+    back.load_scene(path)
+    st, bt = ps.store, back.store
+    assert bt.n == st.n
+    for col in ("pos", "vel", "mass", "color_idx"):
+        np.testing.assert_array_equal(getattr(bt, col)[:bt.n], getattr(st, col)[:st.n])
+    assert (back.G, back.softening, back.time_step, back.elapsed) == \
+           (ps.G, ps.softening, ps.time_step, ps.elapsed)
+    (c0, p0), (c1, p1) = _trails(ps), _trails(back)
+    np.testing.assert_array_equal(c1, c0)
+    valid = np.arange(p0.shape[1]) >= (p0.shape[1] - c0)[:, None]
+    np.testing.assert_array_equal(p1[valid], p0[valid])
+    # the loaded scene keeps evolving exactly like the original
+    for _ in range(10): ps.update_nbody(1/60); back.update_nbody(1/60)
+    np.testing.assert_array_equal(bt.pos[:bt.n], st.pos[:st.n])
+
+
+def test_scene_without_trails(tmp_path):
+    rng = np.random.default_rng(0)
+    pos, vel, mass = rng.normal(size=(5, 2)), rng.normal(size=(5, 2)), rng.uniform(1, 9, 5)
+    path = str(tmp_path / f"b{SCENE_EXT}")
+    write_scene(path, pos, vel, mass, np.arange(5, dtype=np.uint8), 1.0, 2.0, 3.0, 4.0)
+    sf = SceneFile(path)
+    assert not sf.has_trails and (sf.n, sf.G, sf.softening, sf.time_step, sf.elapsed) == (5, 1.0, 2.0, 3.0, 4.0)
+    np.testing.assert_array_equal(np.stack([sf.x, sf.y], -1), pos)
+    np.testing.assert_array_equal(np.stack([sf.vx, sf.vy], -1), vel)
+    np.testing.assert_array_equal(sf.mass, mass)
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / f"c{SCENE_EXT}"
+    path.write_bytes(b"SNKR" + bytes(100))
+    with pytest.raises(ValueError):
+        SceneFile(str(path))
@@ -0,0 +1,110 @@
+"""Headless Snake core, and SnakeBatch following the same rules as SnakeState."""
+import random
+import subprocess
+import sys
+from collections import deque
+
+import numpy as np
+import pytest
+
+from sim.config import COLS
+from sim.snake import SnakeState, Action, DIR_CODES
+from sim.batch import SnakeBatch
+from sim.bot import SnakeBot, BOT_HYBRID
+
+
+def test_snake_core_imports_without_ui_or_numpy():
+    code = ("import sys, sim.snake; "
+            "print(sorted({'pygame', 'imgui', 'OpenGL', 'numpy'} & set(sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def _play(seed, inputs):
+    gs = SnakeState(clock=lambda: 0.0, seed=seed)
+    gs.set_god_mode(True)
+    for a in inputs:
+        gs.handle_input(a); gs.tick()
+    return gs
+
+
+def test_game_is_a_function_of_seed_and_inputs():
+    rng = random.Random(3)
+    inputs = [Action(rng.randrange(4)) for _ in range(2000)]
+    a, b = _play(7, inputs), _play(7, inputs)
+    assert (list(a.snake), a.food, a.score, a.level, a.elapsed) == \
+           (list(b.snake), b.food, b.score, b.level, b.elapsed)
+    assert a.replay.to_bytes() == b.replay.to_bytes()
+
+
+def test_step_moves_once_per_interval():
+    gs = SnakeState(clock=lambda: 0.0, seed=1)
+    for _ in range(10): gs.step(gs.interval() / 4)
+    assert gs.move_count == 2
+    gs.step(10.0)                       # a long stall is still one move
+    assert gs.move_count == 3
+
+
+def _cell(xy):
+    return -1 if xy is None else xy[1]*COLS + xy[0]
+
+
+def _lockstep(gs, ticks, choose):
+    """Run gs and a one-game SnakeBatch side by side, the batch placing food
+    where gs did (only the RNG streams differ), and compare after every tick."""
+    spawned = deque()
+    spawn = gs._spawn_food
+    def record():
+        xy = spawn(); spawned.append(_cell(xy)); return xy
+    gs._spawn_food = record
+    sb = SnakeBatch(1, god_mode=gs.god_mode, auto_reset=False)
+    sb._spawn = lambda idx: np.array([spawned.popleft() for _ in idx], np.int32)
+    sb.food[0] = _cell(gs.food)
+    for t in range(ticks):
+        action = choose(t)
+        if action is not None: gs.handle_input(action)
+        gs.tick()
+        sb.step(DIR_CODES[gs.direction] if action is None else action)
+        assert sb.cells(0) == list(gs.snake), t
+        assert (int(sb.score[0]), int(sb.level[0]), bool(sb.alive[0]), bool(sb.won[0])) == \
+               (gs.score, gs.level, gs.alive, gs.won), t
+        assert (int(sb.food[0]), int(sb.bonus_food[0])) == (_cell(gs.food), _cell(gs.bonus_food)), t
+        assert sb.tick_interval[0] == pytest.approx(gs.tick_interval)
+        assert sb.elapsed[0] == pytest.approx(gs.elapsed)
+        if not gs.alive: break
+    assert not spawned
+    return gs
+
+
+def test_batch_matches_state_under_bot_play():
+    # long enough for level-ups, bonus food and its expiry
+    gs = SnakeState(clock=lambda: 0.0, seed=11, record=False)
+    gs.controller = SnakeBot(BOT_HYBRID)
+    gs = _lockstep(gs, 4000, lambda t: None)
+    assert gs.level > 3
+
+
+def test_batch_matches_state_in_god_mode():
+    rng = random.Random(5)
+    gs = SnakeState(clock=lambda: 0.0, seed=12, record=False)
+    gs.god_mode = True
+    _lockstep(gs, 3000, lambda t: Action(rng.randrange(4)) if rng.random() < 0.2 else None)
+
+
+def test_batch_matches_state_until_death():
+    rng = random.Random(6)
+    for seed in range(20):
+        gs = SnakeState(clock=lambda: 0.0, seed=seed, record=False)
+        gs = _lockstep(gs, 2000, lambda t: Action(rng.randrange(4)) if rng.random() < 0.3 else None)
+        assert not gs.alive
+
+
+def test_batch_auto_reset_records_outcomes():
+    sb = SnakeBatch(64, seed=0)
+    done_any = False
+    for _ in range(200):
+        reward, done = sb.step(np.full(64, Action.UP))
+        if done.any():
+            done_any = True
+            assert sb.alive[done].all() and (sb.length[done] == 3).all()
+    assert done_any and sb.games >= 64
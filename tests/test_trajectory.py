@@ -0,0 +1,72 @@
+"""Closed-form linear-drag flight against the step integrator it replaced."""
+import numpy as np
+import pytest
+
+from sim.trajectory import DragTrajectory, shot_metrics, drag_offset, drag_velocity
+from sim.sweep import simulate_shots, best_angle
+from sim.physics import PhysicsState
+
+ANGLES = np.array([5.0, 30.0, 45.0, 60.0, 85.0])[:, None]
+DRAGS  = np.array([0.0, 1e-4, 0.05, 0.5, 2.0])
+
+
+def test_vacuum_matches_textbook():
+    v, g = 300.0, 200.0
+    rng, height, t = shot_metrics(ANGLES, v, 0.0, g)
+    rad = np.radians(ANGLES)
+    np.testing.assert_allclose(rng, v*v*np.sin(2*rad)/g, rtol=1e-12)
+    np.testing.assert_allclose(height, (v*np.sin(rad))**2/(2*g), rtol=1e-12)
+    np.testing.assert_allclose(t, 2*v*np.sin(rad)/g, rtol=1e-12)
+
+
+def test_matches_step_integration():
+    exact = shot_metrics(ANGLES, 300.0, DRAGS, 200.0)
+    stepped = simulate_shots(ANGLES, 300.0, DRAGS, 200.0, h=1/20000)
+    for e, s in zip(exact, stepped):
+        np.testing.assert_allclose(s, e, rtol=2e-3, atol=1e-2)
+
+
+def test_landing_is_back_at_launch_height():
+    _, _, t = shot_metrics(ANGLES, 300.0, DRAGS, 200.0)
+    dy = drag_offset(t, 0.0, -300.0*np.sin(np.radians(ANGLES)), 200.0, DRAGS)[1]
+    np.testing.assert_allclose(dy, 0.0, atol=1e-7)
+
+
+def test_small_drag_series_is_continuous():
+    # either side of the Taylor-series switch at k·t = SERIES_KT
+    t = 2.0
+    for k in (4.9e-4, 5.1e-4):
+        dx, dy = drag_offset(t, 100.0, -100.0, 200.0, k)
+        vx, vy = drag_velocity(t, 100.0, -100.0, 200.0, k)
+        ref = [100.0*(1 - np.exp(-k*t))/k,
+               -100.0*(1 - np.exp(-k*t))/k + 200.0*(t - (1 - np.exp(-k*t))/k)/k]
+        assert (float(dx), float(dy)) == pytest.approx(ref, rel=1e-9)
+        assert float(vx) == pytest.approx(100.0*np.exp(-k*t), rel=1e-12)
+
+
+def test_path_ends_at_the_landing_point():
+    tr = DragTrajectory.launch(50.0, 600.0, 50.0, 350.0, 200.0, 0.3)
+    p = tr.path(spacing=2.0)
+    assert p[0].tolist() == pytest.approx([50.0, 600.0])
+    assert p[-1].tolist() == pytest.approx([50.0 + tr.range, 600.0], abs=1e-3)
+    step = np.hypot(*np.diff(p, axis=0).T)
+    assert step.max() < 2.5
+
+
+def test_best_angle():
+    assert best_angle(300.0, 0.0, 200.0)[0] == pytest.approx(45.0, abs=1e-3)
+    a, r = best_angle(300.0, 0.5, 200.0)
+    assert a < 45.0
+    assert r == pytest.approx(shot_metrics(a, 300.0, 0.5, 200.0)[0])
+    assert r >= shot_metrics(np.arange(1.0, 89.0, 0.5), 300.0, 0.5, 200.0)[0].max()
+
+
+def test_projectile_lands_at_the_exact_range():
+    ps = PhysicsState(clock=lambda: 0.0)
+    ps.proj_air_resist = 0.2
+    ps.launch_projectile()
+    expect = ps.proj_traj.range
+    for _ in range(10000):
+        if not ps.proj_running: break
+        ps.update_projectile(1/60)
+    assert ps.proj_landed and ps.proj_range == pytest.approx(expect, rel=1e-12)